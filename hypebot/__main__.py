@@ -0,0 +1,4 @@
+import sys
+from hypebot.cli import main
+
+sys.exit(main())
@@ -0,0 +1,203 @@
+import json
+import shlex
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+import paramiko
+from hypebot.core.logger import Logger
+from hypebot.benchmark.result_protocol import ResultFrameParser, framed_result_command, parse_benchmark_payload
+from hypebot.benchmark.benchmark_tiers import BENCHMARK_TIERS, flatten_metrics
+from hypebot.benchmark.detached_run import DetachedRun
+from hypebot.core.raw_log import RawLogWriter
+
+logger = Logger()
+
+BENCHMARK_DIR = "benchmarking"
+RESULT_FILE = "parse_output.json"
+SETUP_COMPLETE = "=== SETUP COMPLETE ==="
+
+
+def benchmark_dir(gpu_index: int = None) -> str:
+    """Working copy of the suite; each GPU of a multi-GPU run gets its own so logs and results don't collide."""
+    return BENCHMARK_DIR if gpu_index is None else f"{BENCHMARK_DIR}-gpu{gpu_index}"
+
+
+def run_gpu_benchmarks(ssh_manager, session, tier: str = "full", gpu_count: int = 1,
+                       setup: bool = True, timeout: float = None, env: dict = None) -> bool:
+    """
+    Clones and runs the benchmarking suite at the given tier, storing parsed results in session.benchmarks.
+    With gpu_count > 1 one suite process per GPU runs concurrently, pinned with CUDA_VISIBLE_DEVICES.
+    setup=False reuses a suite already cloned on the instance by an earlier run; env is exported to benchmarks.sh.
+    Returns whether the suite is set up on the instance, so a later run knows whether it can skip setup.
+    """
+    logger.log("Starting benchmarking process...")
+    suite_ready = not setup
+    try:
+        # Earlier steps may have lost the connection; everything from here on can reconnect
+        if not ssh_manager.is_connected() and not ssh_manager.reconnect():
+            raise Exception("SSH connection lost before benchmarking and could not be re-established")
+
+        # Setup benchmarking environment
+        setup_commands = """
+        rm -rf benchmarking benchmarking-gpu* && \
+        git clone https://github.com/Quok-it/benchmarking && \
+        cd benchmarking && \
+        chmod +x benchmarks.sh
+        """
+        if gpu_count > 1:
+            copies = " && ".join(f"cp -r ../{BENCHMARK_DIR} ../{benchmark_dir(i)}" for i in range(gpu_count))
+            setup_commands = f"{setup_commands.rstrip()} && {copies}"
+        # The shell's exit status isn't returned, so a marker printed only if every step succeeded stands in for it
+        setup_commands = f'{setup_commands.rstrip()} && echo "{SETUP_COMPLETE}"'
+
+        if setup:
+            # Setup starts by wiping the suite, so it is safe to rerun once after a dropped connection
+            for attempt in range(2):
+                try:
+                    stdout, stderr = ssh_manager.run_command(setup_commands)
+                    break
+                except paramiko.ssh_exception.SSHException:
+                    if attempt or not ssh_manager.reconnect():
+                        raise
+            if stderr:
+                logger.log(f"Warning during benchmark setup: {stderr}")
+            if SETUP_COMPLETE not in stdout:
+                raise Exception(f"Benchmark suite setup failed: {stderr.strip() or 'no output'}")
+            suite_ready = True
+
+        estimated_minutes = BENCHMARK_TIERS[tier]["estimated_seconds"] / 60
+        logger.log(f"Running {tier} benchmarks on {gpu_count} GPU(s) (this will take approximately {estimated_minutes:.0f} minutes)...")
+
+        if gpu_count == 1:
+            benchmark_results = _run_benchmark_process(ssh_manager, session, tier, timeout=timeout, env=env)
+            if benchmark_results is not None:
+                session.benchmarks["gpu_benchmarks"] = benchmark_results
+            return suite_ready
+
+        # Channels share the one SSH connection, so the per-GPU runs only cost a thread each
+        with ThreadPoolExecutor(max_workers=gpu_count) as executor:
+            runs = list(executor.map(
+                lambda gpu_index: _run_benchmark_process(ssh_manager, session, tier, gpu_index, timeout, env),
+                range(gpu_count),
+            ))
+
+        per_gpu = [{"gpu_index": i, "results": results} for i, results in enumerate(runs) if results is not None]
+        session.benchmarks["per_gpu_benchmarks"] = per_gpu
+        if per_gpu:
+            aggregate = aggregate_gpu_results([run["results"] for run in per_gpu])
+            session.benchmarks["gpu_benchmarks"] = aggregate["mean"]
+            session.benchmarks["gpu_benchmark_spread"] = aggregate["spread"]
+            logger.log(f"Aggregated benchmark results from {len(per_gpu)}/{gpu_count} GPUs")
+
+    except Exception as e:
+        logger.log("Benchmarking process failed")
+        session.add_error(f"Benchmarking failed: {str(e)}")
+        print(str(e))
+    return suite_ready
+
+
+def _run_benchmark_process(ssh_manager, session, tier: str, gpu_index: int = None, timeout: float = None,
+                           env: dict = None):
+    """Runs one suite process (optionally pinned to a GPU) and returns its validated results, or None."""
+    label = "" if gpu_index is None else f"[GPU {gpu_index}] "
+    workdir = benchmark_dir(gpu_index)
+    pin = "" if gpu_index is None else f"CUDA_VISIBLE_DEVICES={gpu_index} "
+    pin += "".join(f"{name}={shlex.quote(str(value))} " for name, value in (env or {}).items())
+    # Results come back in a checksummed frame so they can be picked out of the stream as it arrives
+    benchmark_cmd = (
+        f"{pin}BENCHMARK_TIER={tier} ./benchmarks.sh 2>&1 | tee benchmark_output.log && "
+        f'echo "=== BENCHMARK COMPLETE ===" && '
+        f"python3 parse.py > {RESULT_FILE} && "
+        f"{framed_result_command(RESULT_FILE)}"
+    )
+
+    frame_parser = ResultFrameParser()
+    raw_log = RawLogWriter()
+
+    def on_output(chunk: bytes):
+        raw_log.write(chunk)
+        frame_parser.feed(chunk)
+
+    # Detached so an SSH drop doesn't kill the run; follow() reconnects and resumes the log
+    run = DetachedRun(ssh_manager, workdir, benchmark_cmd)
+    try:
+        run.launch()
+        exit_status = run.follow(on_output, timeout=timeout)
+    except Exception as e:
+        logger.log(f"{label}Benchmark command failed: {e}")
+        session.add_error(f"{label}Benchmarking failed: {str(e)}")
+        _store_raw_log(raw_log, session, label)
+        return None
+    logger.log(f"{label}Benchmark command completed (exit status {exit_status}, {run.reconnects} reconnects)")
+    if run.reconnects:
+        session.add_error(f"{label}SSH dropped {run.reconnects} time(s) during the benchmark; run resumed")
+
+    # The full output (stderr is merged into the run log) goes to the artifact store; the log gets an excerpt
+    record = _store_raw_log(raw_log, session, label)
+    logger.log(f"{label}Benchmark output ({record['lines']} lines, stored as {record['path']}):")
+    logger.log(raw_log.excerpt())
+
+    # Validate the framed result before storing it
+    try:
+        if frame_parser.complete:
+            benchmark_results = parse_benchmark_payload(frame_parser.payload)
+            logger.log(f"{label}Successfully parsed benchmark results!")
+        else:
+            for error in frame_parser.errors:
+                logger.log(f"[WARN] {label}{error}")
+            # Frame missing or corrupt: fetch the result file directly over SFTP
+            payload = ssh_manager.read_remote_file(f"{workdir}/{RESULT_FILE}")
+            benchmark_results = parse_benchmark_payload(payload)
+            logger.log(f"{label}Successfully parsed benchmark results from file!")
+        return benchmark_results
+
+    except (json.JSONDecodeError, UnicodeDecodeError, ValueError, OSError) as e:
+        logger.log(f"{label}Error parsing benchmark results: {e}")
+        logger.log(f"Raw output ends with: {record['tail']}")
+        session.add_error(f"{label}Failed to parse benchmark results")
+        return None
+
+
+def _store_raw_log(raw_log: RawLogWriter, session, label: str) -> dict:
+    try:
+        record = raw_log.close(label.strip())
+    except OSError as e:
+        record = {"label": label.strip(), "lines": raw_log.lines, "path": None, "tail": raw_log.excerpt()}
+        session.add_error(f"{label}Could not store raw benchmark output: {e}")
+    session.raw_logs.append(record)
+    return record
+
+
+def aggregate_gpu_results(per_gpu_results: list) -> dict:
+    """
+    Node-level view of per-GPU results: "mean" has the same shape as a single GPU's
+    results (so history and tier logic treat it like any other run), "spread" lists
+    each numeric metric's min/max across GPUs.
+    """
+    def mean_tree(trees):
+        merged = {}
+        for key, value in trees[0].items():
+            values = [tree.get(key) for tree in trees]
+            if isinstance(value, dict) and all(isinstance(v, dict) for v in values):
+                merged[key] = mean_tree(values)
+            elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                merged[key] = statistics.fmean(values)
+            else:
+                merged[key] = value
+        return merged
+
+    series = {}
+    for results in per_gpu_results:
+        for metric, value in flatten_metrics(results).items():
+            series.setdefault(metric, []).append(value)
+
+    spread = []
+    for metric, values in series.items():
+        mean = statistics.fmean(values)
+        spread.append({
+            "metric": metric,
+            "min": min(values),
+            "max": max(values),
+            "spread_pct": (max(values) - min(values)) / abs(mean) * 100 if mean else 0.0,
+        })
+
+    return {"mean": mean_tree(per_gpu_results), "spread": spread}
@@ -0,0 +1,101 @@
+import shlex
+import socket
+import time
+import paramiko
+
+# Written next to the suite in the run's working directory
+RUN_LOG = "run.log"
+RUN_PID = "run.pid"
+RUN_EXIT = "run.exit"
+
+
+class DetachedRun:
+    """
+    A command started on the remote host under setsid/nohup, so it keeps running
+    if the SSH session drops. Its output goes to RUN_LOG; follow() tails the log
+    from the last byte received and, after a dropped connection, reconnects and
+    resumes from that offset instead of losing the run.
+    """
+
+    def __init__(self, ssh_manager, workdir: str, command: str, max_reconnects: int = 5):
+        self.ssh_manager = ssh_manager
+        self.workdir = workdir
+        self.command = command
+        self.max_reconnects = max_reconnects
+        self.offset = 0  # bytes of RUN_LOG already passed to on_output
+        self.reconnects = 0
+        self.pid = None
+
+    def launch(self) -> int:
+        """Starts the command in its own session and returns its remote PID."""
+        script = f"{self.command}; echo $? > {RUN_EXIT}"
+        # Any earlier run in this directory (e.g. a launch whose reply was lost) is killed first
+        launch_cmd = (
+            f"cd {self.workdir} && {{ [ -f {RUN_PID} ] && kill -- -$(cat {RUN_PID}) 2>/dev/null; "
+            f"rm -f {RUN_LOG} {RUN_PID} {RUN_EXIT}; }} && "
+            f"{{ setsid nohup bash -c {shlex.quote(script)} > {RUN_LOG} 2>&1 < /dev/null & "
+            f"echo $! > {RUN_PID}; cat {RUN_PID}; }}"
+        )
+        for attempt in range(2):
+            out, err = self._run_command(launch_cmd)
+            try:
+                self.pid = int(out.strip().splitlines()[-1])
+                return self.pid
+            except (ValueError, IndexError):
+                # An empty reply from a connection that just dropped is worth one relaunch
+                if attempt or self.ssh_manager.is_connected() or not self.ssh_manager.reconnect():
+                    raise Exception(f"Failed to launch detached run in {self.workdir}: {err.strip() or out.strip()}")
+                self.reconnects += 1
+
+    def follow(self, on_output, timeout: float = None):
+        """
+        Streams RUN_LOG to on_output until the process exits, resuming after dropped
+        connections. Returns the command's exit status (None if it never wrote one).
+        """
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            tail_cmd = f"cd {self.workdir} && tail -c +{self.offset + 1} --pid={self.pid} -f {RUN_LOG}"
+
+            def counted(chunk: bytes):
+                self.offset += len(chunk)
+                on_output(chunk)
+
+            try:
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise socket.timeout(f"Detached run did not finish within {timeout}s")
+                if not self.ssh_manager.is_connected():
+                    raise paramiko.ssh_exception.SSHException("SSH connection is down")
+                self.ssh_manager.run_command_streaming(tail_cmd, counted, timeout=remaining)
+                return self.exit_status()
+            except socket.timeout:
+                # Deadline or silence limit hit: stop the run itself, not just the tail following it
+                self.ssh_manager.kill_process_group(self.pid)
+                raise
+            except (paramiko.ssh_exception.SSHException, EOFError, OSError) as e:
+                if self.reconnects >= self.max_reconnects:
+                    raise
+                self.reconnects += 1
+                print(f"[WARN] Lost connection while following {self.workdir}/{RUN_LOG} ({e}); "
+                      f"resuming from byte {self.offset}")
+                if not self.ssh_manager.reconnect():
+                    raise
+
+    def _run_command(self, command: str) -> tuple[str, str]:
+        """Short bookkeeping command; retried once after reconnecting if the connection is down."""
+        for attempt in range(2):
+            try:
+                if not self.ssh_manager.is_connected():
+                    raise paramiko.ssh_exception.SSHException("SSH connection is down")
+                return self.ssh_manager.run_command(command, timeout=60)
+            except (paramiko.ssh_exception.SSHException, EOFError, OSError):
+                if attempt or not self.ssh_manager.reconnect():
+                    raise
+                self.reconnects += 1
+
+    def exit_status(self):
+        out, _ = self._run_command(f"cat {self.workdir}/{RUN_EXIT} 2>/dev/null")
+        try:
+            return int(out.strip())
+        except ValueError:
+            return None
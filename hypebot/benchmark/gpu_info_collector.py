@@ -1,7 +1,14 @@
 import re
 
+# Each GPU's block in nvidia-smi -q starts with its PCI bus id, e.g. "GPU 00000000:18:00.0"
+GPU_BLOCK_HEADER = re.compile(r"^GPU ([0-9A-Fa-f]+:[0-9A-Fa-f]+:[0-9A-Fa-f]+\.[0-9A-Fa-f]+)\s*$", re.MULTILINE)
+
 def collect_gpu_health_snapshot(ssh_manager) -> dict:
-    """Collects a full GPU health snapshot by parsing nvidia-smi -q output."""
+    """Collects a full GPU health snapshot of the first GPU by parsing nvidia-smi -q output."""
+    return collect_gpu_health_snapshots(ssh_manager)[0]
+
+def collect_gpu_health_snapshots(ssh_manager) -> list:
+    """Collects one health snapshot per GPU from a single nvidia-smi -q run."""
 
     # Step 1: Run nvidia-smi -q remotely
     out, err = ssh_manager.run_command("sudo nvidia-smi -q")
@@ -11,9 +18,30 @@ def collect_gpu_health_snapshot(ssh_manager) -> dict:
     # print("\n[DEBUG] Raw nvidia-smi -q Output:")
     # print(out)
 
+    snapshots = []
+    for gpu_index, (pci_bus_id, block) in enumerate(split_gpu_blocks(out)):
+        snapshot = parse_gpu_snapshot(block)
+        snapshot["gpu_index"] = gpu_index
+        snapshot["pci_bus_id"] = pci_bus_id
+        snapshots.append(snapshot)
+    return snapshots
+
+def split_gpu_blocks(output: str) -> list:
+    """Splits nvidia-smi -q output into [(pci_bus_id, block)], one per GPU in nvidia-smi order."""
+    headers = list(GPU_BLOCK_HEADER.finditer(output))
+    if not headers:
+        return [(None, output)]
+    blocks = []
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(output)
+        blocks.append((header.group(1), output[header.end():end]))
+    return blocks
+
+def parse_gpu_snapshot(output: str) -> dict:
+    """Parses the nvidia-smi -q block of a single GPU into a flat snapshot."""
     snapshot = {"snapshot_version": 1}  # Always version your snapshots
 
-    lines = out.splitlines()
+    lines = output.splitlines()
     current_section = None
 
 
@@ -78,14 +106,25 @@ def collect_gpu_health_snapshot(ssh_manager) -> dict:
             snapshot["gpu_max_operating_temp_celsius"] = extract_number(line)
         if line.startswith("GPU Target Temperature")and current_section=="Temperature":
             snapshot["gpu_target_temp_celsius"] = extract_number(line)
+        # Newer drivers report thresholds relative to T.Limit; this is the current headroom
+        if line.startswith("GPU T.Limit Temp") and current_section=="Temperature":
+            snapshot["gpu_tlimit_temp_celsius"] = extract_number(line)
+
+        # Clock event (throttle) reasons that are currently active
+        if current_section in ("Clocks Event Reasons", "Clocks Throttle Reasons") and ":" in line:
+            if extract_after_colon(line) == "Active":
+                snapshot.setdefault("clocks_event_reasons_active", []).append(line.split(":", 1)[0].strip())
 
         # ECC mode and errors
         if line.startswith("Current") and current_section=="ECC Mode":
             snapshot["ecc_mode"] = extract_after_colon(line)
-        if line.startswith("DRAM Correctable") and current_section == "ECC Errors":
+        # ECC counters sit in "Volatile" / "Aggregate" subsections of "ECC Errors"
+        if line.startswith("DRAM Correctable") and current_section == "Volatile":
             snapshot["ecc_errors_correctable_dram"] = extract_number(line)
-        if line.startswith("DRAM Uncorrectable") and current_section == "ECC Errors":
+        if line.startswith("DRAM Uncorrectable") and current_section == "Volatile":
             snapshot["ecc_errors_uncorrectable_dram"] = extract_number(line)
+        if line.startswith("DRAM Uncorrectable") and current_section == "Aggregate":
+            snapshot["ecc_errors_uncorrectable_dram_aggregate"] = extract_number(line)
 
         # Clocks
         if line.startswith("Graphics") and "MHz" in line and current_section == "Clocks":
@@ -154,7 +193,7 @@ def collect_gpu_health_snapshot(ssh_manager) -> dict:
 # ---------------------- #
 def extract_number(line: str) -> float:
     """Extracts a number (float or int) from a 'Key : Value' line."""
-    match = re.search(r"[-+]?\d*\.\d+|\d+", line)
+    match = re.search(r"[-+]?(?:\d*\.\d+|\d+)", line)
     return float(match.group()) if match else None
 
 def extract_after_colon(line: str) -> str:
@@ -0,0 +1,103 @@
+import re
+from hypebot.config.config import (
+    HEALTH_GATE_CHECK_PRODUCT_NAME,
+    HEALTH_GATE_MAX_UNCORRECTABLE_ECC,
+    HEALTH_GATE_MIN_POWER_LIMIT_RATIO,
+    HEALTH_GATE_SLOWDOWN_MARGIN_CELSIUS,
+)
+
+# Clock event reasons that mean the GPU is being held below its normal clocks
+THROTTLE_REASONS = {"HW Slowdown", "HW Thermal Slowdown", "HW Power Brake Slowdown", "SW Thermal Slowdown"}
+
+# Short run used instead of the full benchmark when a host fails the gate
+DIAGNOSTIC_COMMANDS = {
+    "nvidia_smi": "sudo nvidia-smi -q -d ECC,TEMPERATURE,POWER,CLOCK,PERFORMANCE",
+    "xid_events": "sudo dmesg 2>/dev/null | grep -i xid | tail -n 50",
+}
+
+
+def model_key(model_name: str) -> str:
+    """
+    Reduces a marketplace or nvidia-smi model name to its distinguishing token, e.g.
+    'NVIDIA-H100-80GB-HBM3' -> 'H100', 'geforcertx3090-pcie-24gb' -> 'GEFORCERTX3090'.
+    """
+    for token in re.split(r"[^A-Za-z0-9]+", model_name.upper()):
+        if re.search(r"\d", token) and not re.fullmatch(r"\d+GB", token):
+            return token
+    return re.sub(r"[^A-Z0-9]", "", model_name.upper())
+
+
+def slowdown_headroom_celsius(snapshot: dict):
+    """Degrees left before thermal slowdown, or None if the snapshot doesn't say."""
+    slowdown = snapshot.get("gpu_slowdown_temp_celsius")
+    if slowdown is None:
+        return None
+    # Newer drivers report thresholds as T.Limit offsets alongside the current T.Limit headroom
+    tlimit_headroom = snapshot.get("gpu_tlimit_temp_celsius")
+    if tlimit_headroom is not None:
+        return tlimit_headroom - slowdown
+    temperature = snapshot.get("temperature_gpu_celsius")
+    if temperature is None:
+        return None
+    return slowdown - temperature
+
+
+def evaluate_health_gate(snapshot: dict, expected_model: str = None) -> list:
+    """Returns the reasons a host should not get the full benchmark (empty list = pass)."""
+    if not snapshot:
+        return ["No GPU health snapshot available"]
+
+    failures = []
+    product_name = snapshot.get("product_name")
+    if HEALTH_GATE_CHECK_PRODUCT_NAME and expected_model and product_name:
+        expected = model_key(expected_model)
+        if expected not in re.sub(r"[^A-Z0-9]", "", product_name.upper()):
+            failures.append(f"Product name mismatch: rented {expected_model}, host reports {product_name}")
+
+    uncorrectable = snapshot.get("ecc_errors_uncorrectable_dram")
+    if uncorrectable is not None and uncorrectable > HEALTH_GATE_MAX_UNCORRECTABLE_ECC:
+        failures.append(f"Uncorrectable DRAM ECC errors: {uncorrectable:.0f}")
+
+    if snapshot.get("xid_errors"):
+        failures.append(f"XID errors reported: {snapshot['xid_errors']}")
+
+    current_limit = snapshot.get("current_power_limit_watts")
+    default_limit = snapshot.get("default_power_limit_watts")
+    if current_limit and default_limit and current_limit < default_limit * HEALTH_GATE_MIN_POWER_LIMIT_RATIO:
+        failures.append(f"Power limit {current_limit:.0f} W is below default {default_limit:.0f} W")
+
+    headroom = slowdown_headroom_celsius(snapshot)
+    if headroom is not None and headroom <= HEALTH_GATE_SLOWDOWN_MARGIN_CELSIUS:
+        failures.append(f"Temperature within {headroom:.0f} C of thermal slowdown")
+
+    throttled = THROTTLE_REASONS.intersection(snapshot.get("clocks_event_reasons_active", []))
+    if throttled:
+        failures.append(f"Clocks throttled: {sorted(throttled)}")
+
+    return failures
+
+
+def evaluate_node_health_gate(snapshots: list, expected_model: str = None, expected_gpu_count: int = None) -> list:
+    """Runs the gate on every GPU of a node; failures are prefixed with the GPU index on multi-GPU nodes."""
+    if not snapshots:
+        return ["No GPU health snapshot available"]
+
+    failures = []
+    if expected_gpu_count and len(snapshots) != expected_gpu_count:
+        failures.append(f"GPU count mismatch: rented {expected_gpu_count}, host reports {len(snapshots)}")
+    for snapshot in snapshots:
+        prefix = f"GPU {snapshot.get('gpu_index')}: " if len(snapshots) > 1 else ""
+        failures.extend(prefix + failure for failure in evaluate_health_gate(snapshot, expected_model))
+    return failures
+
+
+def run_diagnostics(ssh_manager) -> dict:
+    """Collects a short diagnostic dump from a host that failed the gate."""
+    diagnostics = {}
+    for name, command in DIAGNOSTIC_COMMANDS.items():
+        try:
+            out, err = ssh_manager.run_command(command, timeout=60)
+            diagnostics[name] = out.strip() or err.strip()
+        except Exception as e:
+            diagnostics[name] = f"failed: {e}"
+    return diagnostics
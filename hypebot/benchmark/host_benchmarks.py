@@ -0,0 +1,112 @@
+import json
+import re
+import statistics
+import time
+from hypebot.benchmark.host_probe import split_probe_sections
+
+# dd's summary line, e.g. "1073741824 bytes (1.1 GB, 1.0 GiB) copied, 1.23 s, 870 MB/s"
+DD_SUMMARY = re.compile(r"(\d+) bytes .*?copied, ([\d.]+) s")
+
+DISK_TEST_FILE = "qci-disk-test.bin"
+
+
+def disk_benchmark_script(size_mb: int, random_seconds: int) -> str:
+    """
+    Sequential write/read with dd (O_DIRECT, so the page cache doesn't flatter the disk) and,
+    if fio is installed, 4k random read/write at queue depth 32. One round trip; the test
+    file is written to the login directory, which is where the benchmark suite runs.
+    """
+    fio = (
+        f"fio --filename={DISK_TEST_FILE} --bs=4k --direct=1 --ioengine=libaio --iodepth=32 "
+        f"--runtime={random_seconds} --time_based --output-format=json"
+    )
+    return f"""
+echo "@@QCI-PROBE seq_write@@"
+dd if=/dev/zero of={DISK_TEST_FILE} bs=1M count={size_mb} oflag=direct conv=fdatasync 2>&1 | tail -n 1
+echo "@@QCI-PROBE seq_read@@"
+dd if={DISK_TEST_FILE} of=/dev/null bs=1M iflag=direct 2>&1 | tail -n 1
+if command -v fio >/dev/null 2>&1; then
+  echo "@@QCI-PROBE rand_read@@"
+  {fio} --name=randread --rw=randread 2>/dev/null
+  echo "@@QCI-PROBE rand_write@@"
+  {fio} --name=randwrite --rw=randwrite 2>/dev/null
+fi
+rm -f {DISK_TEST_FILE}
+true
+"""
+
+
+def run_disk_benchmark(ssh_manager, size_mb: int = 1024, random_seconds: int = 15) -> dict:
+    """Returns sequential throughput in MB/s and random 4k IOPS (None where a test couldn't run)."""
+    out, err = ssh_manager.run_command(disk_benchmark_script(size_mb, random_seconds))
+    sections = split_probe_sections(out)
+    if not sections:
+        raise Exception(f"[ERROR] Disk benchmark produced no output: {err.strip()}")
+
+    results = {
+        "test_size_mb": size_mb,
+        "seq_write_mbps": parse_dd_throughput(sections.get("seq_write", "")),
+        "seq_read_mbps": parse_dd_throughput(sections.get("seq_read", "")),
+        "rand_read": parse_fio_result(sections.get("rand_read", ""), "read"),
+        "rand_write": parse_fio_result(sections.get("rand_write", ""), "write"),
+    }
+    if "rand_read" not in sections:
+        results["note"] = "fio not installed; random I/O not measured"
+    return results
+
+
+def parse_dd_throughput(text: str):
+    """MB/s (10^6 bytes) from dd's summary line, computed from bytes and seconds rather than dd's rounded rate."""
+    match = DD_SUMMARY.search(text)
+    if not match or not float(match.group(2)):
+        return None
+    return int(match.group(1)) / float(match.group(2)) / 1e6
+
+
+def parse_fio_result(text: str, direction: str):
+    if not text.strip():
+        return None
+    try:
+        job = json.loads(text[text.index("{"):])["jobs"][0][direction]
+    except (ValueError, KeyError, IndexError):
+        return None
+    return {
+        "iops": job.get("iops"),
+        "bandwidth_mbps": job.get("bw", 0) * 1024 / 1e6,  # fio reports KiB/s
+        "mean_latency_us": job.get("clat_ns", {}).get("mean", 0) / 1000,
+    }
+
+
+def run_network_benchmark(ssh_manager, transfer_mb: int = 64, rtt_samples: int = 10) -> dict:
+    """
+    Throughput and latency between this orchestrator and the instance, over the SSH
+    connection already open (so it measures the path the bot actually uses, not the
+    host's uplink to the internet). Throughput is in Gbps from the instance's side,
+    under the same keys as the marketplace's advertised speeds.
+    """
+    rtts = ssh_manager.measure_round_trips(rtt_samples)
+    transfer_bytes = transfer_mb * 1024 * 1024
+
+    received = 0
+
+    def count(chunk: bytes):
+        nonlocal received
+        received += len(chunk)
+
+    start = time.time()
+    ssh_manager.run_command_streaming(f"head -c {transfer_bytes} /dev/zero", count)
+    download_seconds = time.time() - start
+
+    start = time.time()
+    ssh_manager.run_command_with_input("cat > /dev/null", b"\0" * transfer_bytes)
+    upload_seconds = time.time() - start
+
+    return {
+        "rtt_ms_median": statistics.median(rtts) if rtts else None,
+        "rtt_ms_min": min(rtts) if rtts else None,
+        "rtt_ms_max": max(rtts) if rtts else None,
+        "transfer_mb": transfer_mb,
+        # The orchestrator's upload is the instance's download, and vice versa
+        "download_gbps": transfer_bytes * 8 / upload_seconds / 1e9 if upload_seconds else None,
+        "upload_gbps": received * 8 / download_seconds / 1e9 if download_seconds else None,
+    }
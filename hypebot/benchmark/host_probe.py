@@ -0,0 +1,192 @@
+import re
+import shlex
+
+# Every source the probe reads is printed after one of these markers
+SECTION_MARKER = re.compile(r"^@@QCI-PROBE (\w+)@@$", re.MULTILINE)
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+
+# Sent as the command itself, so the whole probe costs one SSH round trip. Only
+# coreutils/util-linux are assumed; anything missing just leaves its section empty.
+# /proc/cpuinfo repeats the flags line for every logical CPU, so only the first is kept.
+HOST_PROBE_SCRIPT = r"""
+echo "@@QCI-PROBE cpuinfo@@"
+awk '/^flags/ { if (!seen++) print; next } /^(processor|model name|physical id|core id|cpu MHz)[[:space:]]*:/' /proc/cpuinfo 2>/dev/null
+echo "@@QCI-PROBE meminfo@@"
+cat /proc/meminfo 2>/dev/null
+echo "@@QCI-PROBE lsblk@@"
+lsblk -b -d -P -o NAME,SIZE,ROTA,TYPE,TRAN,MODEL 2>/dev/null
+echo "@@QCI-PROBE df@@"
+df -P -B1 -x tmpfs -x devtmpfs -x squashfs 2>/dev/null
+echo "@@QCI-PROBE kernel@@"
+uname -r 2>/dev/null
+echo "@@QCI-PROBE os@@"
+. /etc/os-release 2>/dev/null && echo "$PRETTY_NAME"
+echo "@@QCI-PROBE driver@@"
+nvidia-smi --query-gpu=driver_version --format=csv,noheader 2>/dev/null | head -n 1
+echo "@@QCI-PROBE topology@@"
+nvidia-smi topo -m 2>/dev/null
+true
+"""
+
+# CPU features that matter for the host-side parts of the benchmarks
+NOTABLE_CPU_FLAGS = ["avx2", "avx512f", "avx512_bf16", "amx_tile", "amx_bf16", "sha_ni"]
+
+
+def collect_host_info(ssh_manager) -> dict:
+    """
+    Runs the host probe in a single round trip and returns
+    {"cpu": {...}, "ram": {...}, "storage": {...}, "system": {...}}.
+    """
+    out, err = ssh_manager.run_command(f"bash -c {shlex.quote(HOST_PROBE_SCRIPT)}")
+    if "@@QCI-PROBE" not in out:
+        raise Exception(f"[ERROR] Host probe produced no output: {err.strip()}")
+    return parse_host_probe(out)
+
+
+def parse_host_probe(output: str) -> dict:
+    sections = split_probe_sections(output)
+    return {
+        "cpu": parse_cpuinfo(sections.get("cpuinfo", "")),
+        "ram": parse_meminfo(sections.get("meminfo", "")),
+        "storage": {
+            "disks": parse_lsblk(sections.get("lsblk", "")),
+            "filesystems": parse_df(sections.get("df", "")),
+        },
+        "system": {
+            "kernel": sections.get("kernel", "").strip() or None,
+            "os": sections.get("os", "").strip() or None,
+            "driver_version": sections.get("driver", "").strip() or None,
+            "gpu_topology": parse_gpu_topology(sections.get("topology", "")),
+        },
+    }
+
+
+def split_probe_sections(output: str) -> dict:
+    """{section name: text printed after its marker}"""
+    markers = list(SECTION_MARKER.finditer(output))
+    sections = {}
+    for index, marker in enumerate(markers):
+        end = markers[index + 1].start() if index + 1 < len(markers) else len(output)
+        sections[marker.group(1)] = output[marker.end():end].strip("\n")
+    return sections
+
+
+def parse_cpuinfo(text: str) -> dict:
+    logical_cores, cores, sockets, mhz = 0, set(), set(), []
+    model_name, flags = None, []
+    physical_id = None
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        key, value = key.strip(), value.strip()
+        if key == "processor":
+            logical_cores += 1
+            physical_id = None
+        elif key == "model name" and model_name is None:
+            model_name = value
+        elif key == "physical id":
+            physical_id = value
+            sockets.add(value)
+        elif key == "core id":
+            cores.add((physical_id, value))
+        elif key == "cpu MHz":
+            mhz.append(float(value))
+        elif key == "flags":
+            flags = value.split()
+
+    physical_cores = len(cores) or logical_cores
+    return {
+        "model_name": model_name,
+        "sockets": len(sockets) or (1 if logical_cores else 0),
+        "physical_cores": physical_cores,
+        "logical_cores": logical_cores,
+        "threads_per_core": logical_cores // physical_cores if physical_cores else None,
+        "mhz_mean": sum(mhz) / len(mhz) if mhz else None,
+        "notable_flags": [flag for flag in NOTABLE_CPU_FLAGS if flag in flags],
+    }
+
+
+def parse_meminfo(text: str) -> dict:
+    """/proc/meminfo sizes are in kB; reported in MB like the GPU snapshot."""
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(":")
+        fields = value.split()
+        if fields and fields[0].isdigit():
+            values[key.strip()] = int(fields[0])
+
+    def mb(key):
+        return values[key] / 1024 if key in values else None
+
+    return {
+        "total_mb": mb("MemTotal"),
+        "available_mb": mb("MemAvailable"),
+        "swap_total_mb": mb("SwapTotal"),
+        "hugepages_total": values.get("HugePages_Total"),
+        "hugepage_size_kb": values.get("Hugepagesize"),
+    }
+
+
+def parse_lsblk(text: str) -> list:
+    """`lsblk -P` prints one device per line as KEY="value" pairs."""
+    disks = []
+    for line in text.splitlines():
+        try:
+            fields = dict(pair.split("=", 1) for pair in shlex.split(line) if "=" in pair)
+        except ValueError:
+            continue
+        if fields.get("TYPE") != "disk":
+            continue
+        disks.append({
+            "name": fields.get("NAME"),
+            "size_bytes": int(fields["SIZE"]) if fields.get("SIZE", "").isdigit() else None,
+            "rotational": fields.get("ROTA") == "1",
+            "transport": fields.get("TRAN") or None,
+            "model": (fields.get("MODEL") or "").strip() or None,
+        })
+    return disks
+
+
+def parse_df(text: str) -> list:
+    filesystems = []
+    for line in text.splitlines()[1:]:  # skip the header
+        fields = line.split()
+        if len(fields) < 6 or not fields[1].isdigit():
+            continue
+        filesystems.append({
+            "filesystem": fields[0],
+            "mount": " ".join(fields[5:]),
+            "size_bytes": int(fields[1]),
+            "used_bytes": int(fields[2]),
+            "available_bytes": int(fields[3]),
+        })
+    return filesystems
+
+
+def parse_gpu_topology(text: str) -> dict:
+    """
+    Parses the `nvidia-smi topo -m` matrix into links between devices (NV#, PIX, SYS, ...)
+    and each GPU's CPU / NUMA affinity. Returns None if nvidia-smi printed nothing.
+    """
+    lines = [ANSI_ESCAPE.sub("", line) for line in text.splitlines()]
+    header_index = next((i for i, line in enumerate(lines) if "\t" in line and line.strip()), None)
+    if header_index is None:
+        return None
+
+    columns = [column.strip() for column in lines[header_index].split("\t")]
+    if columns and not columns[0]:
+        columns = columns[1:]  # the header row starts with an empty cell above the row names
+    links, affinity = {}, {}
+    for line in lines[header_index + 1:]:
+        if not line.strip() or line.startswith("Legend"):
+            break
+        cells = [cell.strip() for cell in line.split("\t")]
+        device, values = cells[0], cells[1:]
+        device_links = {}
+        for column, value in zip(columns, values):
+            if "Affinity" in column or "NUMA" in column:
+                affinity.setdefault(device, {})[column.lower().replace(" ", "_")] = value
+            elif column != device:
+                device_links[column] = value
+        links[device] = device_links
+
+    return {"links": links, "affinity": affinity}
@@ -1,11 +1,46 @@
 import requests
 import time
-from hypebot.config.config  import HYPERBOLIC_API_KEY
+from hypebot.config.config  import HYPERBOLIC_API_KEY, HYPERBOLIC_API_URL
+from hypebot.config.config import API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST, API_MAX_RETRIES
+from hypebot.clients.rate_limiter import get_rate_limiter, retry_after_seconds, RETRYABLE_STATUS_CODES
+from hypebot.clients.rental_profiles import RENTAL_PROFILES, DEFAULT_RENTAL_PROFILE
+from hypebot.core.metrics import API_REQUESTS, API_SECONDS
 import json
+
+# Per-endpoint budgets; background endpoints can't drain the shared bucket below its reserve
+ENDPOINT_BUDGETS = {
+    "offers": {"rate_per_second": 0.5, "burst": 2, "background": True},
+    "instances": {"rate_per_second": 1.0, "burst": 3, "background": True},
+    "create": {"rate_per_second": 1.0, "burst": 2},
+    "terminate": {"rate_per_second": 1.0, "burst": 4},
+}
+
 class MarketplaceClient:
     def __init__(self):
-        self.marketplace_url = "https://api.hyperbolic.xyz/v1/marketplace"
+        self.marketplace_url = f"{HYPERBOLIC_API_URL}/marketplace"
+        self.rate_limiter = get_rate_limiter(
+            "Hyperbolic", API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST, ENDPOINT_BUDGETS
+        )
+
+    def _request(self, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a rate-limited request, backing off on 429/503 and honouring Retry-After."""
+        with API_SECONDS.time(endpoint=endpoint):
+            for attempt in range(API_MAX_RETRIES + 1):
+                self.rate_limiter.acquire(endpoint)
+                try:
+                    response = requests.request(method, url, **kwargs)
+                except requests.RequestException:
+                    API_REQUESTS.inc(endpoint=endpoint, status="error")
+                    raise
+                API_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == API_MAX_RETRIES:
+                    break
+                delay = retry_after_seconds(response, attempt)
+                print(f"[WARN] {endpoint} returned {response.status_code}, backing off {delay:.1f}s (attempt {attempt+1})")
+                self.rate_limiter.back_off(delay)
 
+        response.raise_for_status()
+        return response
 
     # Lists available GPUs with optional API filters and optional name 
     def list_available_gpus(self, filters: dict = None, gpu_name_filter: str = None) -> list:
@@ -14,8 +49,7 @@ class MarketplaceClient:
             "Content-Type": "application/json"
         }
 
-        response = requests.post(self.marketplace_url, json=payload, headers=headers)
-        response.raise_for_status()
+        response = self._request("offers", "POST", self.marketplace_url, json=payload, headers=headers)
 
         # get instances
         instances = response.json().get("instances", [])
@@ -38,6 +72,7 @@ class MarketplaceClient:
                             "cluster_name": instance["cluster_name"],
                             "gpu_model": gpu_model,
                             "gpu_ram": instance["hardware"]["gpus"][0]["ram"] if instance["hardware"]["gpus"] else None,
+                            "available_count": instance["gpus_total"] - instance["gpus_reserved"],
                             "price_per_hour": instance["pricing"]["price"]["amount"]/100,
                             "region": instance["location"]["region"]
                         })
@@ -45,8 +80,8 @@ class MarketplaceClient:
 
         return available_instances
     
-    def rent_gpu(self, cluster_name: str, node_name: str, gpu_count: int = 1) -> dict:
-            url = "https://api.hyperbolic.xyz/v1/marketplace/instances/create"
+    def rent_gpu(self, cluster_name: str, node_name: str, gpu_count: int = 1, profile: dict = None) -> dict:
+            url = f"{self.marketplace_url}/instances/create"
             headers = {
                 "Authorization": f"Bearer {HYPERBOLIC_API_KEY}",
                 "Content-Type": "application/json"
@@ -55,26 +90,20 @@ class MarketplaceClient:
                 "cluster_name": cluster_name,
                     "node_name": node_name,
                 "gpu_count": gpu_count,
-                "image": {
-                    "name": "nvidia/cuda",
-                    "tag": "12.3.1-devel-ubuntu22.04",
-                    "port": 22
-                }
+                "image": (profile or RENTAL_PROFILES[DEFAULT_RENTAL_PROFILE])["image"]
             }
 
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
+            response = self._request("create", "POST", url, json=payload, headers=headers)
 
             return response.json()  # Should contain instance ID, credentials (or ID to fetch them)
     
     def list_user_instances(self) -> list:
-        url = "https://api.hyperbolic.xyz/v1/marketplace/instances"
+        url = f"{self.marketplace_url}/instances"
         headers = {
             "Authorization": f"Bearer {HYPERBOLIC_API_KEY}",
             "Content-Type": "application/json"
         }
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
+        response = self._request("instances", "GET", url, headers=headers)
 
         full_response = response.json()
 
@@ -120,7 +149,7 @@ class MarketplaceClient:
         raise Exception(f"Instance {instance_name} not ready after {max_attempts} attempts.")
     
     def terminate_instance(self, instance_id: str): 
-        url = "https://api.hyperbolic.xyz/v1/marketplace/instances/terminate"
+        url = f"{self.marketplace_url}/instances/terminate"
         headers = {
             "Authorization": f"Bearer {HYPERBOLIC_API_KEY}",
             "Content-Type": "application/json"
@@ -129,8 +158,7 @@ class MarketplaceClient:
             "id": instance_id
         }
 
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
+        response = self._request("terminate", "POST", url, headers=headers, json=payload)
 
         full_response = response.json()
 
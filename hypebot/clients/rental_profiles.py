@@ -0,0 +1,52 @@
+from hypebot.config.config import RENTAL_PROFILE, RENTAL_PROFILE_MIN_SAMPLES, RENTAL_PREBAKED_IMAGE
+
+# Named images to rent with. "benchmark_env" is passed to benchmarks.sh, e.g. to skip
+# installing dependencies an image already ships with.
+RENTAL_PROFILES = {
+    "cuda-devel": {
+        "description": "Stock CUDA devel image; the suite installs its own dependencies",
+        "image": {"name": "nvidia/cuda", "tag": "12.3.1-devel-ubuntu22.04", "port": 22},
+        "benchmark_env": {},
+    },
+    "cuda-runtime": {
+        "description": "Smaller CUDA runtime image for a faster pull",
+        "image": {"name": "nvidia/cuda", "tag": "12.3.1-runtime-ubuntu22.04", "port": 22},
+        "benchmark_env": {},
+    },
+}
+
+# Our own image with the suite's dependencies installed, given as "name:tag"
+if RENTAL_PREBAKED_IMAGE:
+    prebaked_name, _, prebaked_tag = RENTAL_PREBAKED_IMAGE.partition(":")
+    RENTAL_PROFILES["prebaked"] = {
+        "description": "Pre-baked image with the suite's dependencies already installed",
+        "image": {"name": prebaked_name, "tag": prebaked_tag or "latest", "port": 22},
+        "benchmark_env": {"BENCHMARK_SKIP_DEPS": "1"},
+    }
+
+DEFAULT_RENTAL_PROFILE = "cuda-devel"
+
+
+def select_rental_profile(requested: str = RENTAL_PROFILE, boot_stats: list = None) -> tuple[str, dict]:
+    """
+    Resolves RENTAL_PROFILE to (name, profile). "fastest" picks the profile with the
+    lowest average boot time among those with enough sessions in boot_stats
+    (docs of {_id: profile, avg_boot_time_ms, count}); unknown names fall back to the default.
+    """
+    requested = requested or DEFAULT_RENTAL_PROFILE
+    if requested == "fastest":
+        candidates = [
+            stat for stat in boot_stats or []
+            if stat["_id"] in RENTAL_PROFILES and stat["count"] >= RENTAL_PROFILE_MIN_SAMPLES
+        ]
+        # Profiles without enough samples yet get tried before settling on one
+        untried = [name for name in RENTAL_PROFILES if name not in {stat["_id"] for stat in candidates}]
+        if untried:
+            requested = untried[0]
+        elif candidates:
+            requested = min(candidates, key=lambda stat: stat["avg_boot_time_ms"])["_id"]
+
+    if requested not in RENTAL_PROFILES:
+        print(f"[WARN] Unknown rental profile '{requested}', using '{DEFAULT_RENTAL_PROFILE}'")
+        requested = DEFAULT_RENTAL_PROFILE
+    return requested, RENTAL_PROFILES[requested]
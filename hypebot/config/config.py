@@ -10,4 +10,160 @@ MONGODB_URI = os.getenv("MONGODB_URI")
 
 HYPERBOLIC_API_KEY = os.getenv("HYPERBOLIC_API_KEY")
 
-PRIVATE_KEY_PATH= os.getenv("PRIVATE_KEY_PATH")
\ No newline at end of file
+# Override to point the bot at a local mock marketplace (see loadtest/)
+HYPERBOLIC_API_URL = os.getenv("HYPERBOLIC_API_URL", "https://api.hyperbolic.xyz/v1")
+
+PRIVATE_KEY_PATH= os.getenv("PRIVATE_KEY_PATH")
+
+# Orphaned-instance reaper
+REAPER_INTERVAL_SECONDS = int(os.getenv("REAPER_INTERVAL_SECONDS", "300"))
+
+REAPER_GRACE_SECONDS = int(os.getenv("REAPER_GRACE_SECONDS", "900"))
+
+# Instances this bot rented and hasn't seen terminated; the reaper never touches anything else
+INSTANCE_LEDGER_DIR = os.getenv("INSTANCE_LEDGER_DIR", os.path.expanduser("~/.cache/qci/hypebot_instances"))
+
+# Marketplace API rate limiting (shared by all workers in the process)
+API_RATE_LIMIT_PER_SECOND = float(os.getenv("API_RATE_LIMIT_PER_SECOND", "2"))
+
+API_RATE_LIMIT_BURST = float(os.getenv("API_RATE_LIMIT_BURST", "10"))
+
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "5"))
+
+# Pre-flight health gate evaluated before the full benchmark
+HEALTH_GATE_ENABLED = os.getenv("HEALTH_GATE_ENABLED", "1") == "1"
+
+HEALTH_GATE_CHECK_PRODUCT_NAME = os.getenv("HEALTH_GATE_CHECK_PRODUCT_NAME", "1") == "1"
+
+HEALTH_GATE_MAX_UNCORRECTABLE_ECC = int(os.getenv("HEALTH_GATE_MAX_UNCORRECTABLE_ECC", "0"))
+
+HEALTH_GATE_MIN_POWER_LIMIT_RATIO = float(os.getenv("HEALTH_GATE_MIN_POWER_LIMIT_RATIO", "0.95"))
+
+HEALTH_GATE_SLOWDOWN_MARGIN_CELSIUS = float(os.getenv("HEALTH_GATE_SLOWDOWN_MARGIN_CELSIUS", "5"))
+
+# Adaptive benchmark depth (quick / standard / full) per node
+BENCHMARK_RECENT_DAYS = int(os.getenv("BENCHMARK_RECENT_DAYS", "7"))
+
+BENCHMARK_STABLE_CV = float(os.getenv("BENCHMARK_STABLE_CV", "0.05"))
+
+BENCHMARK_MIN_STABLE_RUNS = int(os.getenv("BENCHMARK_MIN_STABLE_RUNS", "2"))
+
+BENCHMARK_DEVIATION_TOLERANCE = float(os.getenv("BENCHMARK_DEVIATION_TOLERANCE", "0.10"))
+
+# Local cache of recently benchmarked nodes, used to skip re-benchmarking them
+NODE_CACHE_PATH = os.getenv("NODE_CACHE_PATH", os.path.expanduser("~/.cache/qci/hypebot_node_cache.json"))
+
+NODE_CACHE_TTL_HOURS = float(os.getenv("NODE_CACHE_TTL_HOURS", "24"))
+
+# Circuit breaker for nodes (and clusters/regions) that keep failing to boot or accept SSH
+NODE_BREAKER_PATH = os.getenv("NODE_BREAKER_PATH", os.path.expanduser("~/.cache/qci/hypebot_node_breaker.json"))
+
+NODE_BREAKER_FAILURES = int(os.getenv("NODE_BREAKER_FAILURES", "3"))
+
+NODE_BREAKER_GROUP_FAILURES = int(os.getenv("NODE_BREAKER_GROUP_FAILURES", "6"))
+
+NODE_BREAKER_COOLDOWN_SECONDS = float(os.getenv("NODE_BREAKER_COOLDOWN_SECONDS", "900"))
+
+NODE_BREAKER_MAX_COOLDOWN_SECONDS = float(os.getenv("NODE_BREAKER_MAX_COOLDOWN_SECONDS", str(7 * 24 * 3600)))
+
+# GPUs to rent per node; each one is benchmarked in parallel on the same instance
+GPUS_PER_RENTAL = int(os.getenv("GPUS_PER_RENTAL", "1"))
+
+# Job-queue mode: run several benchmark jobs on one rental, e.g. "auto,quick*3,soak:600" (empty = one run)
+BENCHMARK_JOB_QUEUE = os.getenv("BENCHMARK_JOB_QUEUE", "")
+
+INSTANCE_TIME_BUDGET_SECONDS = float(os.getenv("INSTANCE_TIME_BUDGET_SECONDS", "3600"))
+
+# Pipelined mode: rent and boot the next offer while the current benchmark is still running
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "0") == "1"
+
+PREFETCH_DEFAULT_BOOT_SECONDS = float(os.getenv("PREFETCH_DEFAULT_BOOT_SECONDS", "120"))
+
+PREFETCH_LEAD_SECONDS = float(os.getenv("PREFETCH_LEAD_SECONDS", "30"))
+
+# Image / cloud-init profile to rent with (see clients/rental_profiles.py); "fastest" picks by average boot time
+RENTAL_PROFILE = os.getenv("RENTAL_PROFILE", "")
+
+RENTAL_PROFILE_MIN_SAMPLES = int(os.getenv("RENTAL_PROFILE_MIN_SAMPLES", "5"))
+
+RENTAL_PREBAKED_IMAGE = os.getenv("RENTAL_PREBAKED_IMAGE", "")
+
+# Command watchdog: per-stage hard deadlines and output-silence limit for remote commands
+WATCHDOG_SILENCE_SECONDS = float(os.getenv("WATCHDOG_SILENCE_SECONDS", "600"))
+
+HEALTH_STAGE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_STAGE_TIMEOUT_SECONDS", "180"))
+
+DIAGNOSTICS_STAGE_TIMEOUT_SECONDS = float(os.getenv("DIAGNOSTICS_STAGE_TIMEOUT_SECONDS", "180"))
+
+BENCHMARK_SETUP_TIMEOUT_SECONDS = float(os.getenv("BENCHMARK_SETUP_TIMEOUT_SECONDS", "600"))
+
+BENCHMARK_DEADLINE_FACTOR = float(os.getenv("BENCHMARK_DEADLINE_FACTOR", "2.0"))
+
+# Silence limit for the benchmark stage as a fraction of its estimated duration (never below
+# WATCHDOG_SILENCE_SECONDS), so long quiet phases aren't killed as hung; 0 disables it for that stage
+BENCHMARK_SILENCE_FRACTION = float(os.getenv("BENCHMARK_SILENCE_FRACTION", "0.5"))
+
+# Host-level disk and network microbenchmarks, run after the health gate
+HOST_BENCHMARKS_ENABLED = os.getenv("HOST_BENCHMARKS_ENABLED", "1") == "1"
+
+HOST_BENCHMARK_TIMEOUT_SECONDS = float(os.getenv("HOST_BENCHMARK_TIMEOUT_SECONDS", "300"))
+
+DISK_BENCHMARK_SIZE_MB = int(os.getenv("DISK_BENCHMARK_SIZE_MB", "1024"))
+
+DISK_BENCHMARK_RANDOM_SECONDS = int(os.getenv("DISK_BENCHMARK_RANDOM_SECONDS", "15"))
+
+NETWORK_BENCHMARK_MB = int(os.getenv("NETWORK_BENCHMARK_MB", "64"))
+
+# Run remote commands through a small Python agent on the instance (one multiplexed channel)
+REMOTE_AGENT_ENABLED = os.getenv("REMOTE_AGENT_ENABLED", "0") == "1"
+
+# Artifacts pulled off the instance before termination (comma separated globs relative to the login directory)
+ARTIFACT_PATHS = [path.strip() for path in os.getenv(
+    "ARTIFACT_PATHS", "benchmarking*/benchmark_output.log,benchmarking*/parse_output.json,benchmarking*/run.log"
+).split(",") if path.strip()]
+
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+ARTIFACT_PARALLELISM = int(os.getenv("ARTIFACT_PARALLELISM", "4"))
+
+ARTIFACT_STAGE_TIMEOUT_SECONDS = float(os.getenv("ARTIFACT_STAGE_TIMEOUT_SECONDS", "600"))
+
+ARTIFACT_STORE_DIR = os.getenv("ARTIFACT_STORE_DIR", os.path.expanduser("~/.cache/qci/hypebot_artifacts"))
+
+# Raw benchmark output is stored gzip-compressed in the artifact store; only this many head/tail lines are logged
+RAW_LOG_EXCERPT_LINES = int(os.getenv("RAW_LOG_EXCERPT_LINES", "40"))
+
+RAW_LOG_LINES_PER_MEMBER = int(os.getenv("RAW_LOG_LINES_PER_MEMBER", "2000"))
+
+# Longer excerpt lines (e.g. \r progress bars that never print \n) keep only their start and end
+RAW_LOG_EXCERPT_LINE_BYTES = int(os.getenv("RAW_LOG_EXCERPT_LINE_BYTES", "2048"))
+
+# Prometheus /metrics endpoint (0 disables it)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Profile the orchestrator's pipeline stages (also enabled by --profile)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.expanduser("~/.cache/qci/hypebot_profiles"))
+
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_SECONDS", "0.01"))
+
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "25"))
+
+# Watcher mode: rent matching offers as soon as they appear (comma separated substrings; empty regions = any)
+WATCH_GPU_MODELS = [model.strip() for model in os.getenv("WATCH_GPU_MODELS", "H100").split(",") if model.strip()]
+
+WATCH_REGIONS = [region.strip() for region in os.getenv("WATCH_REGIONS", "").split(",") if region.strip()]
+
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "2"))
+
+WATCH_MAX_RENTALS = int(os.getenv("WATCH_MAX_RENTALS", "1"))
+
+# Delta-encoded price/availability history of every offers poll (see core/market_history.py)
+MARKET_HISTORY_ENABLED = os.getenv("MARKET_HISTORY_ENABLED", "1") == "1"
+
+MARKET_HISTORY_DIR = os.getenv("MARKET_HISTORY_DIR", os.path.expanduser("~/.cache/qci/hypebot_market_history"))
+
+MARKET_HISTORY_KEYFRAME_EVERY = int(os.getenv("MARKET_HISTORY_KEYFRAME_EVERY", "500"))
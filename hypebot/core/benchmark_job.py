@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+class BenchmarkJob:
+    """One job run on a rented instance; stored as a child record of its RentalSession."""
+
+    def __init__(self, session_id: str, kind: str, tier: Optional[str] = None,
+                 soak_seconds: Optional[float] = None, trial: int = 1):
+        self.job_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.kind = kind  # "suite" or "soak"
+        self.tier = tier
+        self.soak_seconds = soak_seconds
+        self.trial = trial
+        # Optional fields that will be populated over time
+        self.status: str = "pending"  # pending -> completed / failed / skipped
+        self.start_time: Optional[str] = None
+        self.end_time: Optional[str] = None
+        self.duration_seconds: Optional[float] = None
+        self.benchmarks = {}
+        self.raw_logs: List[Dict[str, Any]] = []
+        self.errors: List[str] = []
+
+    def add_error(self, error_message: str):
+        self.errors.append(error_message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the job to a MongoDB-insertable dictionary."""
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "kind": self.kind,
+            "tier": self.tier,
+            "soak_seconds": self.soak_seconds,
+            "trial": self.trial,
+            "status": self.status,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_seconds": self.duration_seconds,
+            "benchmarks": self.benchmarks,
+            "raw_logs": self.raw_logs,
+            "errors": self.errors,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Short form kept on the parent session."""
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "tier": self.tier,
+            "trial": self.trial,
+            "status": self.status,
+            "duration_seconds": self.duration_seconds,
+        }
+
+    @staticmethod
+    def now() -> str:
+        return datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,113 @@
+import shlex
+import time
+import uuid
+from contextlib import contextmanager
+from hypebot.core.ssh_manager import CommandTimeout
+from hypebot.core.metrics import STAGE_SECONDS, STAGE_TIMEOUTS
+from hypebot.core.profiler import PROFILER
+from hypebot.config.config import WATCHDOG_SILENCE_SECONDS
+
+
+class CommandWatchdog:
+    """
+    Wraps an SSHManager so every command runs under the current stage's hard
+    deadline and output-silence limit. Each command is started in its own
+    remote process group; when a limit is hit the group is killed, the timeout
+    is recorded on the session and CommandTimeout is raised so the worker can
+    give up on the rental.
+
+    run_command_with_input and read_remote_file get the same deadline. Anything else is passed straight
+    through, so the watchdog can be handed to code that expects an SSHManager.
+    """
+
+    def __init__(self, ssh_manager, session=None, silence_seconds: float = WATCHDOG_SILENCE_SECONDS):
+        self.ssh_manager = ssh_manager
+        self.session = session
+        self.silence_seconds = silence_seconds
+        self.stage_name = None
+        self.stage_deadline = None
+        self.stage_silence = silence_seconds
+
+    def __getattr__(self, name):
+        return getattr(self.ssh_manager, name)
+
+    @contextmanager
+    def stage(self, name: str, deadline_seconds: float = None, silence_seconds: float = None):
+        """
+        Commands run inside the block share one deadline (seconds from now) and a silence limit
+        (the watchdog's default when None; 0 turns silence detection off for the stage).
+        """
+        previous = (self.stage_name, self.stage_deadline, self.stage_silence)
+        self.stage_name = name
+        self.stage_deadline = time.time() + deadline_seconds if deadline_seconds else None
+        self.stage_silence = self.silence_seconds if silence_seconds is None else silence_seconds
+        try:
+            session_id = self.session.session_id if self.session is not None else None
+            with STAGE_SECONDS.time(stage=name), PROFILER.stage(name, session_id):
+                yield self
+        finally:
+            self.stage_name, self.stage_deadline, self.stage_silence = previous
+
+    def _time_left(self, timeout: float = None):
+        limits = [limit for limit in (timeout, self.stage_deadline and self.stage_deadline - time.time()) if limit]
+        if not limits:
+            return None
+        left = min(limits)
+        if left <= 0:
+            error = CommandTimeout(f"Stage '{self.stage_name}' deadline passed before the command started", "deadline", 0)
+            self._record_timeout(error)
+            raise error
+        return left
+
+    def run_command_streaming(self, command: str, on_output, timeout: float = None,
+                              chunk_size: int = 32768, idle_timeout: float = None) -> tuple[str, int]:
+        time_left = self._time_left(timeout)
+        pid_file = f"/tmp/qci-watchdog-{uuid.uuid4().hex}.pid"
+        # setsid gives the command its own process group, so expiry can kill everything it spawned
+        wrapped = (
+            f"setsid bash -c {shlex.quote(command)} & echo $! > {pid_file}; "
+            f"wait $!; status=$?; rm -f {pid_file}; exit $status"
+        )
+        try:
+            return self.ssh_manager.run_command_streaming(
+                wrapped, on_output, timeout=time_left, chunk_size=chunk_size,
+                idle_timeout=idle_timeout or self.stage_silence or None,
+            )
+        except CommandTimeout as e:
+            self._record_timeout(e)
+            self.ssh_manager.kill_process_group(f"$(cat {pid_file})")
+            raise
+
+    def run_command(self, command: str, timeout: float = None) -> tuple[str, str]:
+        """Same (stdout, stderr) contract as SSHManager.run_command, under the watchdog's limits."""
+        stdout_chunks = []
+        stderr, _ = self.run_command_streaming(command, stdout_chunks.append, timeout=timeout)
+        return b"".join(stdout_chunks).decode(errors="replace"), stderr
+
+    def run_command_with_input(self, command: str, data: bytes, timeout: float = None) -> tuple[str, int]:
+        try:
+            return self.ssh_manager.run_command_with_input(command, data, timeout=self._time_left(timeout))
+        except CommandTimeout as e:
+            self._record_timeout(e)
+            raise
+
+    def read_remote_file(self, remote_path: str, timeout: float = None) -> bytes:
+        try:
+            return self.ssh_manager.read_remote_file(remote_path, timeout=self._time_left(timeout))
+        except CommandTimeout as e:
+            self._record_timeout(e)
+            raise
+
+    def _record_timeout(self, error: CommandTimeout):
+        print(f"[WARN] Watchdog: stage '{self.stage_name}' hit its {error.reason} limit: {error}")
+        STAGE_TIMEOUTS.inc(stage=self.stage_name, reason=error.reason)
+        if self.session is None:
+            return
+        self.session.timeouts.append({
+            "stage": self.stage_name,
+            "reason": error.reason,
+            "elapsed_seconds": error.elapsed_seconds,
+            "message": str(error),
+        })
+        if not self.session.termination_status:
+            self.session.termination_status = f"{self.stage_name}_timeout"
@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from hypebot.config.config import REAPER_INTERVAL_SECONDS, REAPER_GRACE_SECONDS
+
+# Statuses for which a terminate call would be redundant
+TERMINAL_STATUSES = {"terminated", "terminating", "deleted", "stopped"}
+
+
+class InstanceReaper:
+    """
+    Background thread that terminates instances this bot rented but no live session owns.
+
+    Every interval it lists the account's instances. Only instances in the
+    registry's InstanceLedger are candidates, i.e. ones this bot rented; the rest
+    of the account is never touched. A candidate that is not registered in this
+    process's SessionRegistry, and whose renting process is not still running, is
+    treated as an orphan (process died mid-rental, terminate call failed, ...) once
+    the grace period passes, and terminated in parallel with retries.
+    """
+
+    def __init__(self, marketplace_client, live_sessions, db_interface=None,
+                 interval_seconds: int = REAPER_INTERVAL_SECONDS,
+                 grace_seconds: int = REAPER_GRACE_SECONDS,
+                 max_workers: int = 4, max_retries: int = 3):
+        self.marketplace_client = marketplace_client
+        self.live_sessions = live_sessions
+        self.db_interface = db_interface
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.first_seen = {}  # instance id -> epoch seconds it was first seen unowned
+        self.reclaimed = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="instance-reaper", daemon=True)
+        self._thread.start()
+        print(f"[INFO] Instance reaper started (interval={self.interval_seconds}s, grace={self.grace_seconds}s)")
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.reap_once()
+            except Exception as e:
+                print(f"[ERROR] Reaper pass failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def find_orphans(self, instances: list, now: float) -> list:
+        """Returns instances that have been unowned for longer than the grace period."""
+        orphans = []
+        seen = set()
+        ledger = self.live_sessions.ledger
+        owners = ledger.owners() if ledger else {}
+        for inst in instances:
+            instance_id = inst.get("id")
+            instance_name = inst.get("instance", {}).get("id")
+            status = inst.get("instance", {}).get("status", "").lower()
+            if not instance_id or status in TERMINAL_STATUSES:
+                continue
+            seen.add(instance_id)
+
+            # Not rented by this bot, still in use here, or still in use by another bot process
+            entry = owners.get(instance_id) or owners.get(instance_name)
+            if entry is None or self.live_sessions.is_live(instance_id, instance_name) \
+                    or ledger.owned_by_other_live_process(entry):
+                self.first_seen.pop(instance_id, None)
+                continue
+
+            first_seen = self.first_seen.setdefault(instance_id, now)
+            if now - first_seen >= self.grace_seconds:
+                orphans.append({
+                    "instance_id": instance_id,
+                    "instance_name": instance_name,
+                    "status": status,
+                    "session_id": entry["session_id"],
+                    "unowned_seconds": now - first_seen,
+                })
+
+        # Forget instances that disappeared on their own
+        for instance_id in list(self.first_seen):
+            if instance_id not in seen:
+                del self.first_seen[instance_id]
+
+        return orphans
+
+    def reap_once(self) -> list:
+        """Runs a single reaper pass and returns the records of what it reclaimed."""
+        instances = self.marketplace_client.list_user_instances()
+        orphans = self.find_orphans(instances, time.time())
+        if not orphans:
+            return []
+
+        print(f"[INFO] Reaper found {len(orphans)} orphaned instance(s): {[o['instance_id'] for o in orphans]}")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(orphans))) as pool:
+            records = list(pool.map(self._terminate_with_retries, orphans))
+
+        for record in records:
+            if record["reaped"]:
+                self.first_seen.pop(record["instance_id"], None)
+                self.live_sessions.forget(record["instance_id"], record["instance_name"])
+                self.reclaimed.append(record)
+            if self.db_interface:
+                self.db_interface.save_reaped_instance(record)
+        return records
+
+    def _terminate_with_retries(self, orphan: dict) -> dict:
+        record = dict(orphan, marketplace="Hyperbolic", reaped=False, attempts=0, error=None)
+        for attempt in range(1, self.max_retries + 1):
+            record["attempts"] = attempt
+            try:
+                self.marketplace_client.terminate_instance(orphan["instance_id"])
+                record["reaped"] = True
+                record["error"] = None
+                print(f"[INFO] Reaper terminated orphaned instance {orphan['instance_id']}")
+                break
+            except Exception as e:
+                record["error"] = str(e)
+                print(f"[ERROR] Reaper failed to terminate {orphan['instance_id']} (attempt {attempt}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(2 ** attempt)
+        record["reaped_at"] = datetime.now(timezone.utc).isoformat()
+        return record
@@ -0,0 +1,153 @@
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from hypebot.config.config import PROFILING_ENABLED, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL_SECONDS, PROFILE_TOP_FUNCTIONS
+
+
+class ProfiledStage:
+    """Handle yielded by StageProfiler.stage(); session_id can be filled in once the stage knows it."""
+
+    def __init__(self, name: str, session_id: str = None):
+        self.name = name
+        self.session_id = session_id
+
+
+class StageProfiler:
+    """
+    Opt-in profiling of the orchestrator's own CPU time, one pipeline stage at a time.
+
+    Each stage runs under cProfile, and its stats are written to
+    <output_dir>/<session_id>/<stage>.prof (open with pstats or snakeviz) and added
+    to a merged profile. A sampling thread also records the stack of every thread
+    that is inside a stage, prefixed with the stage name, into
+    <output_dir>/merged.folded (collapsed stacks, for flamegraph.pl or speedscope).
+    report() writes the merged files and prints the hottest functions; enable()
+    arranges for it to run at interpreter exit.
+
+    Disabled, stage() is a no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = False, output_dir: str = PROFILE_DIR,
+                 sample_interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS, top_functions: int = PROFILE_TOP_FUNCTIONS):
+        self.enabled = False
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.top_functions = top_functions
+        self.merged = None
+        self.stacks = Counter()
+        self.stage_seconds = Counter()
+        self._active = {}  # thread id -> name of the outermost stage it is in
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._reported = False
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        os.makedirs(self.output_dir, exist_ok=True)
+        threading.Thread(target=self._sample_loop, daemon=True, name="stage-profiler").start()
+        atexit.register(self.report)
+        print(f"[INFO] Profiling pipeline stages into {self.output_dir}")
+
+    @contextmanager
+    def stage(self, name: str, session_id: str = None):
+        stage = ProfiledStage(name, session_id)
+        # Nested stages are covered by the outer one's profile
+        if not self.enabled or getattr(self._local, "stage", None) is not None:
+            yield stage
+            return
+
+        thread_id = threading.get_ident()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            profile = None  # another profiler owns this interpreter; the sampler still sees the stage
+        self._local.stage = stage
+        with self._lock:
+            self._active[thread_id] = name
+        started = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            if profile is not None:
+                profile.disable()
+            self._local.stage = None
+            with self._lock:
+                self._active.pop(thread_id, None)
+                self.stage_seconds[name] += time.perf_counter() - started
+            if profile is not None:
+                self._save(stage, profile)
+
+    def _save(self, stage: ProfiledStage, profile: cProfile.Profile):
+        session_dir = os.path.join(self.output_dir, stage.session_id or "no-session")
+        try:
+            os.makedirs(session_dir, exist_ok=True)
+            profile.dump_stats(os.path.join(session_dir, f"{stage.name}.prof"))
+        except OSError as e:
+            print(f"[WARN] Could not write profile for stage '{stage.name}': {e}")
+        stats = pstats.Stats(profile)
+        with self._lock:
+            if self.merged is None:
+                self.merged = stats
+            else:
+                self.merged.add(stats)
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.sample_interval)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stage_name in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                    names.append(f"{module}:{getattr(code, 'co_qualname', code.co_name)}")
+                    frame = frame.f_back
+                names.append(stage_name)
+                with self._lock:
+                    self.stacks[";".join(reversed(names))] += 1
+
+    def report(self):
+        """Writes the merged profile and collapsed stacks, and prints the hottest functions."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        with self._lock:
+            merged, stacks, stage_seconds = self.merged, dict(self.stacks), dict(self.stage_seconds)
+
+        folded_path = os.path.join(self.output_dir, "merged.folded")
+        with open(folded_path, "w") as f:
+            for stack, count in sorted(stacks.items()):
+                f.write(f"{stack} {count}\n")
+        print(f"[INFO] Profiling: {sum(stacks.values())} stack samples written to {folded_path}")
+        for name, seconds in sorted(stage_seconds.items(), key=lambda item: -item[1]):
+            print(f"[INFO] Profiling: stage {name} {seconds:.1f}s wall")
+
+        if merged is None:
+            return
+        merged.dump_stats(os.path.join(self.output_dir, "merged.prof"))
+        out = io.StringIO()
+        merged.stream = out
+        merged.sort_stats("tottime").print_stats(self.top_functions)
+        print(f"[INFO] Profiling: top {self.top_functions} functions by own time\n{out.getvalue()}")
+
+
+PROFILER = StageProfiler(enabled=PROFILING_ENABLED)
@@ -0,0 +1,131 @@
+import io
+import zlib
+from collections import deque
+from hypebot.core.artifact_store import ArtifactStore
+from hypebot.config.config import RAW_LOG_EXCERPT_LINE_BYTES, RAW_LOG_EXCERPT_LINES, RAW_LOG_LINES_PER_MEMBER
+
+
+class RawLogWriter:
+    """
+    Streams a command's raw output into a gzip blob in the artifact store instead of
+    the console log. Every lines_per_member lines are written as a separate gzip
+    member (concatenated members are still one valid .gz file), and the record keeps
+    the byte offset of each member, so a line range can later be read back by
+    decompressing only the members that hold it. Output is compressed as it
+    arrives, so memory stays bounded even for a line that never ends; only a
+    head and tail of the output, each line clipped to excerpt_line_bytes, are
+    kept for the log and the session document.
+    """
+
+    def __init__(self, store: ArtifactStore = None, lines_per_member: int = RAW_LOG_LINES_PER_MEMBER,
+                 excerpt_lines: int = RAW_LOG_EXCERPT_LINES, excerpt_line_bytes: int = RAW_LOG_EXCERPT_LINE_BYTES):
+        self.writer = (store or ArtifactStore()).writer(suffix=".log.gz")
+        self.lines_per_member = lines_per_member
+        self.excerpt_lines = excerpt_lines
+        self.excerpt_line_bytes = excerpt_line_bytes
+        self.head = []
+        self.tail = deque(maxlen=excerpt_lines)
+        self.index = []  # [first line number, byte offset] of each gzip member
+        self.lines = 0
+        self.raw_bytes = 0
+        self._member = None  # compressor of the open gzip member
+        self._member_lines = 0
+        # Excerpt of the line being received: its first and last excerpt_line_bytes / 2 bytes
+        self._line_start = b""
+        self._line_end = b""
+        self._line_bytes = 0
+
+    def write(self, chunk: bytes):
+        self.raw_bytes += len(chunk)
+        start = 0
+        newline = chunk.find(b"\n")
+        while newline >= 0:
+            self._write_piece(chunk[start:newline + 1])
+            self._end_line()
+            start = newline + 1
+            newline = chunk.find(b"\n", start)
+        if start < len(chunk):
+            self._write_piece(chunk[start:])
+
+    def _write_piece(self, piece: bytes):
+        if self._member is None:
+            # Members always start on a line boundary, so the index can point at them
+            self.index.append([self.lines, self.writer.size])
+            # zlib's gzip header has mtime 0, so identical output gives an identical blob and is stored once
+            self._member = zlib.compressobj(9, zlib.DEFLATED, 31)
+        self.writer.write(self._member.compress(piece))
+        half = self.excerpt_line_bytes // 2
+        room = max(half - len(self._line_start), 0)
+        self._line_start += piece[:room]
+        if len(piece) > room:
+            self._line_end = (self._line_end + piece[room:])[-half:] if half else b""
+        self._line_bytes += len(piece)
+
+    def _end_line(self):
+        omitted = self._line_bytes - len(self._line_start) - len(self._line_end)
+        marker = b" ... [%d bytes omitted] ... " % omitted if omitted else b""
+        line = self._line_start + marker + self._line_end
+        self._line_start, self._line_end, self._line_bytes = b"", b"", 0
+        if len(self.head) < self.excerpt_lines:
+            self.head.append(line)
+        else:
+            self.tail.append(line)
+        self.lines += 1
+        self._member_lines += 1
+        if self._member_lines >= self.lines_per_member:
+            self._flush_member()
+
+    def _flush_member(self):
+        if self._member is None:
+            return
+        self.writer.write(self._member.flush())
+        self._member = None
+        self._member_lines = 0
+
+    def close(self, label: str = "") -> dict:
+        """Stores the blob and returns the record kept on the session."""
+        if self._line_bytes:
+            self._end_line()
+        self._flush_member()
+        record = {
+            "label": label,
+            "lines": self.lines,
+            "raw_bytes": self.raw_bytes,
+            "index": self.index,
+            "head": b"".join(self.head).decode(errors="replace"),
+            "tail": b"".join(self.tail).decode(errors="replace"),
+        }
+        if not self.lines:
+            self.writer.discard()
+            return dict(record, sha256=None, path=None, bytes=0)
+        return dict(record, **self.writer.commit())
+
+    def excerpt(self) -> str:
+        """Head and tail of the output so far, with a marker where lines were left out."""
+        head = b"".join(self.head).decode(errors="replace")
+        if not self.tail:
+            return head
+        skipped = self.lines - len(self.head) - len(self.tail)
+        marker = f"... [{skipped} lines omitted] ...\n" if skipped else ""
+        return head + marker + b"".join(self.tail).decode(errors="replace")
+
+
+def read_log_lines(record: dict, start: int, end: int = None) -> list:
+    """Lines [start, end) of a stored raw log, decompressing only the gzip members that hold them."""
+    end = record["lines"] if end is None else min(end, record["lines"])
+    index = record["index"]
+    lines = []
+    with open(record["path"], "rb") as f:
+        for position, (first_line, offset) in enumerate(index):
+            next_first = index[position + 1][0] if position + 1 < len(index) else record["lines"]
+            if next_first <= start or first_line >= end:
+                continue
+            next_offset = index[position + 1][1] if position + 1 < len(index) else None
+            f.seek(offset)
+            member = f.read(next_offset - offset) if next_offset is not None else f.read()
+            # Split on b"\n" only, as the writer counts lines: str.splitlines() also breaks on \r and friends
+            member_lines = io.BytesIO(zlib.decompress(member, wbits=31)).readlines()
+            for number, line in enumerate(member_lines, start=first_line):
+                if start <= number < end:
+                    lines.append(line.decode(errors="replace"))
+    return lines
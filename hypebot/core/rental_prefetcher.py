@@ -0,0 +1,81 @@
+import statistics
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hypebot.config.config import PREFETCH_DEFAULT_BOOT_SECONDS, PREFETCH_LEAD_SECONDS
+from hypebot.core.metrics import QUEUE_DEPTH
+
+
+class RentalPrefetcher:
+    """
+    Rents and boots the next instance in the background while the current one is
+    benchmarking, so the next benchmark can start as soon as this one ends.
+
+    schedule() is called when a benchmark starts with its estimated duration; the
+    next acquire starts once the estimated time left drops below the typical boot
+    time for this marketplace plus a lead for SSH setup and the health check.
+    """
+
+    def __init__(self, acquire_fn, default_boot_seconds: float = PREFETCH_DEFAULT_BOOT_SECONDS,
+                 lead_seconds: float = PREFETCH_LEAD_SECONDS, boot_samples: int = 20):
+        self.acquire_fn = acquire_fn
+        self.default_boot_seconds = default_boot_seconds
+        self.lead_seconds = lead_seconds
+        self.boot_times = deque(maxlen=boot_samples)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rental-prefetch")
+        self._lock = threading.Lock()
+        self._timer = None
+        self._future = None
+        QUEUE_DEPTH.set_function(lambda: int(self._future is not None), queue="prefetched_rentals")
+
+    def record_boot(self, seconds: float):
+        if seconds is not None:
+            self.boot_times.append(seconds)
+
+    def typical_boot_seconds(self) -> float:
+        """Median of recently observed boot times, or the configured default before any were seen."""
+        return statistics.median(self.boot_times) if self.boot_times else self.default_boot_seconds
+
+    def schedule(self, estimated_seconds: float, *args, **kwargs) -> float:
+        """Arms the prefetch for a benchmark that just started. Returns the delay before it fires."""
+        delay = max(0.0, estimated_seconds - self.typical_boot_seconds() - self.lead_seconds)
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.start_now, args, kwargs)
+            self._timer.daemon = True
+            self._timer.start()
+        print(f"[INFO] Next rental will be prefetched in {delay:.0f}s "
+              f"(typical boot {self.typical_boot_seconds():.0f}s, benchmark ~{estimated_seconds:.0f}s)")
+        return delay
+
+    def start_now(self, *args, **kwargs):
+        with self._lock:
+            self._timer = None
+            if self._future is None:
+                print("[INFO] Prefetching next rental")
+                self._future = self._executor.submit(self.acquire_fn, *args, **kwargs)
+
+    def take(self):
+        """
+        Returns the prefetched rental (waiting for it to finish booting), or None if
+        no prefetch had started yet or it failed; the caller then acquires inline.
+        """
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            future, self._future = self._future, None
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"[ERROR] Prefetched rental failed: {e}")
+            return None
+
+    def shutdown(self):
+        """Cancels any pending prefetch and returns a rental that was prefetched but never used."""
+        leftover = self.take()
+        self._executor.shutdown(wait=False)
+        return leftover
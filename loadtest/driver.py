@@ -0,0 +1,173 @@
+"""
+Load-test driver: runs the rent -> boot -> hold -> terminate part of the orchestrator
+against the mock marketplace with N concurrent rentals and reports throughput.
+
+    python -m loadtest.driver --marketplace hyperbolic --concurrency 1 10 100 --boot-delay 2 5
+
+The bot's own MarketplaceClient (including its rate limiter) is used, so the
+numbers reflect the real client code paths; only the remote side is mocked.
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest.fixtures import DEFAULT_TENSORDOCK_FIXTURE, load_tensordock_hostnodes
+from loadtest.mock_marketplace import MockMarketplace, start_mock_marketplace
+
+MOCK_SSH_PUBLIC_KEY = "ssh-ed25519 AAAAC3NzaC1lZDI1NTE5AAAAIMockMockMockMockMockMockMockMockMockMock loadtest"
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_hyperbolic_session(client, hold_seconds: float, poll_seconds: float) -> dict:
+    offer = random.choice(client.list_available_gpus())
+    start = time.time()
+    rental_info = client.rent_gpu(cluster_name=offer["cluster_name"], node_name=offer["node_id"], gpu_count=1)
+    details = client.poll_instance_until_ready(rental_info["instance_name"], max_attempts=1000, wait_seconds=poll_seconds)
+    boot_seconds = time.time() - start
+    time.sleep(hold_seconds)  # stands in for SSH + health check + benchmark
+    client.terminate_instance(details["id"])
+    return {"boot_seconds": boot_seconds}
+
+
+def run_tensordock_session(client, hold_seconds: float, poll_seconds: float) -> dict:
+    offer = random.choice(client.list_available_gpus())
+    start = time.time()
+    rental_info = client.rent_gpu(hostnode_id=offer["node_id"], gpu_model=offer["gpu_model"], ssh_key=MOCK_SSH_PUBLIC_KEY)
+    instance_id = rental_info["data"]["id"]
+    client.poll_instance_until_ready(instance_id, max_attempts=1000, wait_seconds=poll_seconds)
+    boot_seconds = time.time() - start
+    time.sleep(hold_seconds)
+    client.terminate_instance(instance_id)
+    return {"boot_seconds": boot_seconds}
+
+
+SESSION_RUNNERS = {
+    "hyperbolic": ("hypebot.clients.marketplace_client", run_hyperbolic_session),
+    "tensordock": ("tensorbot.clients.marketplace_client", run_tensordock_session),
+}
+
+
+def run_level(client_module, runner, marketplace: MockMarketplace, concurrency: int,
+              sessions_per_worker: int, hold_seconds: float, poll_seconds: float) -> dict:
+    marketplace.reset_stats()
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def worker(_):
+        client = client_module.MarketplaceClient()
+        for _ in range(sessions_per_worker):
+            session_start = time.time()
+            try:
+                result = runner(client, hold_seconds, poll_seconds)
+                result["session_seconds"] = time.time() - session_start
+                with lock:
+                    results.append(result)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+
+    wall_start = time.time()
+    # The bot clients print every poll; keep the report readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(worker, range(concurrency)))
+    wall_seconds = time.time() - wall_start
+
+    stats = marketplace.stats()
+    sessions = len(results)
+    boot = [r["boot_seconds"] for r in results]
+    session_times = [r["session_seconds"] for r in results]
+    return {
+        "concurrency": concurrency,
+        "sessions_ok": sessions,
+        "sessions_failed": len(errors),
+        "wall_seconds": wall_seconds,
+        "sessions_per_minute": sessions / wall_seconds * 60 if wall_seconds else 0.0,
+        "api_calls": stats["total_calls"],
+        "api_calls_per_session": stats["total_calls"] / sessions if sessions else None,
+        "calls_by_endpoint": stats["calls"],
+        "responses": stats["responses"],
+        "boot_p50": statistics.median(boot) if boot else 0.0,
+        "boot_p95": percentile(boot, 95),
+        "session_p50": statistics.median(session_times) if session_times else 0.0,
+        "session_p95": percentile(session_times, 95),
+        "sample_errors": errors[:3],
+    }
+
+
+def print_report(report: dict):
+    per_session = report["api_calls_per_session"]
+    per_session = f"{per_session:.1f}" if per_session is not None else "n/a"
+    print(
+        f"[RESULT] concurrency={report['concurrency']:>3} "
+        f"ok={report['sessions_ok']} failed={report['sessions_failed']} "
+        f"wall={report['wall_seconds']:.1f}s "
+        f"throughput={report['sessions_per_minute']:.1f} sessions/min "
+        f"api_calls/session={per_session} "
+        f"boot p50/p95={report['boot_p50']:.1f}/{report['boot_p95']:.1f}s "
+        f"session p50/p95={report['session_p50']:.1f}/{report['session_p95']:.1f}s"
+    )
+    print(f"         calls={report['calls_by_endpoint']} responses={report['responses']}")
+    for error in report["sample_errors"]:
+        print(f"         error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure orchestrator throughput against the mock marketplace.")
+    parser.add_argument("--marketplace", choices=sorted(SESSION_RUNNERS), default="hyperbolic")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--sessions-per-worker", type=int, default=2)
+    parser.add_argument("--hold", type=float, default=1.0, help="seconds each instance is held (benchmark stand-in)")
+    parser.add_argument("--poll-seconds", type=float, default=1.0, help="wait between readiness polls")
+    parser.add_argument("--fixture", default=DEFAULT_TENSORDOCK_FIXTURE)
+    parser.add_argument("--boot-delay", type=float, nargs=2, default=[2.0, 5.0], metavar=("MIN", "MAX"))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--boot-failure-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="server-side requests/second before 429s")
+    parser.add_argument("--api-latency", type=float, default=0.0)
+    parser.add_argument("--client-rate", type=float, default=None, help="override API_RATE_LIMIT_PER_SECOND")
+    args = parser.parse_args()
+
+    marketplace = MockMarketplace(
+        load_tensordock_hostnodes(args.fixture),
+        boot_delay=tuple(args.boot_delay),
+        error_rate=args.error_rate,
+        boot_failure_rate=args.boot_failure_rate,
+        rate_limit_per_second=args.rate_limit,
+        api_latency=args.api_latency,
+    )
+    server = start_mock_marketplace(marketplace)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Config is read at import time, so point the bots at the mock before importing them
+    os.environ["HYPERBOLIC_API_URL"] = f"{base}/hyperbolic/v1"
+    os.environ["TENSORDOCK_API_URL"] = f"{base}/tensordock/api/v2"
+    if args.client_rate:
+        os.environ["API_RATE_LIMIT_PER_SECOND"] = str(args.client_rate)
+    module_name, runner = SESSION_RUNNERS[args.marketplace]
+    client_module = importlib.import_module(module_name)
+
+    print(f"[INFO] Mock marketplace on {base}, {len(marketplace.hostnodes)} hostnodes loaded")
+    for concurrency in args.concurrency:
+        report = run_level(client_module, runner, marketplace, concurrency,
+                           args.sessions_per_worker, args.hold, args.poll_seconds)
+        print_report(report)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
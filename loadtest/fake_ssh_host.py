@@ -0,0 +1,497 @@
+"""
+Local paramiko SSH server that impersonates a rented GPU instance.
+
+It understands just enough of the commands the bots send to exercise
+SSHManager, collect_gpu_health_snapshot and the benchmark stage:
+  - `nvidia-smi -q` replays model.txt (or a synthetic N-GPU variant)
+  - `nvidia-smi --query-gpu` (telemetry soak) returns a few CSV samples per GPU
+  - the host probe replays host_probe.txt (an 8x H100 host)
+  - the disk benchmark answers with fixed dd / fio results, `head -c N` streams
+    N bytes and `cat > /dev/null` swallows its stdin (network benchmark)
+  - `benchmarks.sh` streams a configurable amount of log output over a
+    configurable duration, and `parse.py` answers with a framed JSON result
+  - commands wrapped by a CommandWatchdog (`setsid bash -c '...'`) are unwrapped
+  - detached runs (`setsid nohup ... &`) keep producing that output across
+    connections, and `tail -c +N --pid` follows it from a byte offset
+  - SFTP reads of parse_output.json return the same result
+  - `tar -czf -` artifact pulls return a real tar.gz of the fake benchmark log
+  - the remote agent (`python3 -c '# qci-remote-agent ...'`) is answered in its
+    framed protocol, each exec request handled like a separate command
+  - anything else succeeds with no output
+Latency and dropped connections can be injected per command.
+
+    python -m loadtest.fake_ssh_host --port 2222 --gpus 8 --benchmark-seconds 30
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import re
+import shlex
+import socket
+import struct
+import tarfile
+import threading
+import time
+
+import paramiko
+
+from loadtest.fixtures import REPO_ROOT
+
+DEFAULT_NVIDIA_SMI_FIXTURE = os.path.join(REPO_ROOT, "model.txt")
+DEFAULT_HOST_PROBE_FIXTURE = os.path.join(REPO_ROOT, "loadtest", "host_probe.txt")
+
+# Server-side transports log every client hang-up as an error; keep that out of benchmark output
+TRANSPORT_LOG_CHANNEL = "loadtest.fake_ssh_host.transport"
+logging.getLogger(TRANSPORT_LOG_CHANNEL).setLevel(logging.CRITICAL)
+
+# Remote agent protocol (see core/remote_agent.py in the bots)
+AGENT_MESSAGE = struct.Struct(">BII")
+AGENT_STDOUT, AGENT_EXIT, AGENT_RESULT, AGENT_HEARTBEAT, AGENT_ERROR = 1, 3, 4, 5, 6
+
+WATCHDOG_WRAPPER = re.compile(r"^setsid bash -c (.+) & echo \$! > /tmp/qci-watchdog-", re.DOTALL)
+
+BENCHMARK_RESULT = {
+    "gemm_fp16_tflops": 742.3,
+    "gemm_fp32_tflops": 51.2,
+    "memory_bandwidth_gbps": 3012.8,
+    "pcie_h2d_gbps": 52.1,
+    "pcie_d2h_gbps": 51.7,
+}
+
+
+def load_nvidia_smi_output(path: str = DEFAULT_NVIDIA_SMI_FIXTURE) -> str:
+    """Reads a captured `nvidia-smi -q` dump (model.txt is UTF-16 with CRLF line endings)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    encoding = "utf-16" if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8"
+    return raw.decode(encoding).replace("\r\n", "\n")
+
+
+def synthesize_multi_gpu_output(single_gpu_output: str, gpu_count: int) -> str:
+    """Repeats the per-GPU block of a single-GPU dump gpu_count times with distinct bus ids and UUIDs."""
+    match = re.search(r"^GPU [0-9A-Fa-f:.]+$", single_gpu_output, re.MULTILINE)
+    if not match or gpu_count <= 1:
+        return single_gpu_output
+
+    header = single_gpu_output[:match.start()]
+    block = single_gpu_output[match.start():]
+    header = re.sub(r"(Attached GPUs\s*:\s*)\d+", rf"\g<1>{gpu_count}", header)
+
+    blocks = []
+    for index in range(gpu_count):
+        gpu_block = re.sub(r"^GPU [0-9A-Fa-f:.]+$", f"GPU 00000000:{0x18 + index * 0x10:02X}:00.0",
+                           block, count=1, flags=re.MULTILINE)
+        gpu_block = re.sub(r"(GPU UUID\s*:\s*GPU-[0-9a-f-]+?)[0-9a-f]{2}$", rf"\g<1>{index:02x}",
+                           gpu_block, count=1, flags=re.MULTILINE)
+        gpu_block = re.sub(r"(Minor Number\s*:\s*)\d+", rf"\g<1>{index}", gpu_block, count=1)
+        blocks.append(gpu_block.rstrip("\n") + "\n\n")
+    return header + "".join(blocks)
+
+
+class FakeHostBehaviour:
+    """Knobs shared by every connection to the fake host."""
+
+    def __init__(self, nvidia_smi_output: str, benchmark_seconds: float = 1.0,
+                 benchmark_output_bytes: int = 64 * 1024, command_latency: float = 0.0,
+                 disconnect_rate: float = 0.0, corrupt_result_rate: float = 0.0):
+        self.nvidia_smi_output = nvidia_smi_output
+        self.benchmark_seconds = benchmark_seconds
+        self.benchmark_output_bytes = benchmark_output_bytes
+        self.command_latency = command_latency
+        self.disconnect_rate = disconnect_rate
+        self.corrupt_result_rate = corrupt_result_rate
+        self.result_bytes = json.dumps(BENCHMARK_RESULT).encode()
+        with open(DEFAULT_HOST_PROBE_FIXTURE, encoding="utf-8") as f:
+            self.host_probe_output = f.read()
+        self.detached_runs = {}  # workdir -> {"started": epoch, "output": str}; shared by every connection
+        self.commands_served = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def count(self, sent: int):
+        with self._lock:
+            self.commands_served += 1
+            self.bytes_sent += sent
+
+
+class FakeGPUServer(paramiko.ServerInterface):
+    """Accepts any key or password and records exec requests per channel."""
+
+    def __init__(self):
+        self.commands = {}
+        self.command_ready = threading.Condition()
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def get_allowed_auths(self, username):
+        return "publickey,password"
+
+    def check_auth_publickey(self, username, key):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_exec_request(self, channel, command):
+        with self.command_ready:
+            self.commands[channel.get_id()] = command.decode(errors="replace")
+            self.command_ready.notify_all()
+        return True
+
+    def wait_for_command(self, channel, timeout: float = 30.0) -> str:
+        with self.command_ready:
+            self.command_ready.wait_for(lambda: channel.get_id() in self.commands, timeout)
+            return self.commands.pop(channel.get_id(), None)
+
+
+class FakeResultFileHandle(paramiko.SFTPHandle):
+    def __init__(self, data: bytes):
+        super().__init__()
+        self.data = data
+
+    def read(self, offset, length):
+        return self.data[offset:offset + length]
+
+    def stat(self):
+        attr = paramiko.SFTPAttributes()
+        attr.st_size = len(self.data)
+        return attr
+
+
+class FakeSFTPServer(paramiko.SFTPServerInterface):
+    """Read-only SFTP that only knows about the benchmark result file."""
+
+    def __init__(self, server, behaviour, *args, **kwargs):
+        super().__init__(server, *args, **kwargs)
+        self.behaviour = behaviour
+
+    def open(self, path, flags, attr):
+        if not path.endswith("parse_output.json"):
+            return paramiko.SFTP_NO_SUCH_FILE
+        return FakeResultFileHandle(self.behaviour.result_bytes)
+
+    def stat(self, path):
+        if not path.endswith("parse_output.json"):
+            return paramiko.SFTP_NO_SUCH_FILE
+        return FakeResultFileHandle(self.behaviour.result_bytes).stat()
+
+    lstat = stat
+
+
+class FakeSSHHost:
+    """Threaded SSH server; start() binds and returns immediately."""
+
+    def __init__(self, behaviour: FakeHostBehaviour, host: str = "127.0.0.1", port: int = 0):
+        self.behaviour = behaviour
+        self.host = host
+        self.port = port
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self._sock = None
+        self._stop = threading.Event()
+
+    def start(self) -> "FakeSSHHost":
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(100)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, name="fake-ssh-accept", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._sock:
+            self._sock.close()
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve_connection, args=(client,), daemon=True).start()
+
+    def _serve_connection(self, client: socket.socket):
+        transport = paramiko.Transport(client)
+        transport.set_log_channel(TRANSPORT_LOG_CHANNEL)
+        transport.add_server_key(self.host_key)
+        transport.set_subsystem_handler("sftp", paramiko.SFTPServer, FakeSFTPServer, self.behaviour)
+        server = FakeGPUServer()
+        try:
+            transport.start_server(server=server)
+        except paramiko.SSHException:
+            return
+
+        while transport.is_active() and not self._stop.is_set():
+            channel = transport.accept(timeout=1)
+            if channel is None:
+                continue
+            threading.Thread(target=self._serve_channel, args=(transport, server, channel), daemon=True).start()
+
+    def _serve_channel(self, transport, server: FakeGPUServer, channel):
+        command = server.wait_for_command(channel)
+        if command is None:
+            channel.close()
+            return
+
+        if "qci-remote-agent" in command:
+            self._serve_agent(transport, channel)
+            return
+
+        behaviour = self.behaviour
+        if behaviour.command_latency:
+            time.sleep(behaviour.command_latency)
+
+        # Decide per command whether the network drops, and after how many output chunks
+        drop_after = random.randint(0, 20) if random.random() < behaviour.disconnect_rate else None
+        sent = 0
+        try:
+            if command == "cat > /dev/null":
+                while channel.recv(65536):
+                    pass  # upload throughput test: discard everything until EOF
+            for index, chunk in enumerate(self._respond(command)):
+                if index == drop_after:
+                    transport.close()
+                    return
+                channel.sendall(chunk if isinstance(chunk, bytes) else chunk.encode())
+                sent += len(chunk)
+            channel.send_exit_status(0)
+        except (OSError, EOFError, paramiko.SSHException):
+            return
+        finally:
+            behaviour.count(sent)
+            channel.close()
+
+    def _serve_agent(self, transport, channel):
+        """Answers agent requests on one long-lived channel; drops and latency apply per request."""
+        behaviour = self.behaviour
+        send_lock = threading.Lock()
+
+        def send(kind, task, payload=b""):
+            with send_lock:
+                channel.sendall(AGENT_MESSAGE.pack(kind, task, len(payload)) + payload)
+
+        def run(task, command):
+            if behaviour.command_latency:
+                time.sleep(behaviour.command_latency)
+            drop_after = random.randint(0, 20) if random.random() < behaviour.disconnect_rate else None
+            sent = 0
+            try:
+                for index, chunk in enumerate(self._respond(command)):
+                    if index == drop_after:
+                        transport.close()
+                        return
+                    send(AGENT_STDOUT, task, chunk if isinstance(chunk, bytes) else chunk.encode())
+                    sent += len(chunk)
+                send(AGENT_EXIT, task, b'{"status": 0}')
+            except (OSError, EOFError, paramiko.SSHException):
+                return
+            finally:
+                behaviour.count(sent)
+
+        def recv_exact(size):
+            data = b""
+            while len(data) < size:
+                chunk = channel.recv(size - len(data))
+                if not chunk:
+                    return None
+                data += chunk
+            return data
+
+        try:
+            send(AGENT_HEARTBEAT, 0, json.dumps({"time": time.time(), "loadavg": [0.1, 0.1, 0.1]}).encode())
+            while True:
+                header = recv_exact(4)
+                if header is None:
+                    return
+                request = json.loads(recv_exact(struct.unpack(">I", header)[0]))
+                if request["op"] == "exec":
+                    threading.Thread(target=run, args=(request["task"], request["command"]), daemon=True).start()
+                elif request["op"] == "read":
+                    if request["path"].endswith("parse_output.json"):
+                        send(AGENT_RESULT, request["task"], behaviour.result_bytes)
+                        send(AGENT_EXIT, request["task"], b'{"status": 0}')
+                    else:
+                        send(AGENT_ERROR, request["task"], b"No such file or directory")
+                        send(AGENT_EXIT, request["task"], b'{"status": 1}')
+                elif request["op"] == "exit":
+                    return
+        except (OSError, EOFError, paramiko.SSHException):
+            return
+        finally:
+            channel.close()
+
+    def _respond(self, command: str):
+        """Yields stdout chunks for a command, emulating the scripts the bots run."""
+        behaviour = self.behaviour
+        watchdog = WATCHDOG_WRAPPER.match(command)
+        if watchdog:
+            # Commands run under a CommandWatchdog arrive wrapped in their own process group
+            command = shlex.split(watchdog.group(1))[0]
+        if "@@QCI-PROBE cpuinfo" in command:
+            yield behaviour.host_probe_output
+            return
+        if "@@QCI-PROBE seq_write" in command:
+            yield self._disk_benchmark_output(command)
+            return
+        if "tar -czf -" in command:
+            archive = self._artifact_archive(command)
+            for offset in range(0, len(archive), 1 << 16):
+                yield archive[offset:offset + (1 << 16)]
+            return
+        head = re.match(r"head -c (\d+) /dev/zero", command)
+        if head:
+            remaining = int(head.group(1))
+            while remaining > 0:
+                chunk = min(remaining, 1 << 20)
+                yield "\0" * chunk
+                remaining -= chunk
+            return
+        if "nvidia-smi -q" in command:
+            yield behaviour.nvidia_smi_output
+            return
+        if "--query-gpu" in command:
+            # Telemetry soak: a few CSV samples per GPU rather than one per interval
+            gpu_count = max(1, len(re.findall(r"^GPU [0-9A-Fa-f:.]+$", behaviour.nvidia_smi_output, re.MULTILINE)))
+            for sample in range(3):
+                yield "".join(f"{index}, {40 + sample}, {70.5 + sample}, 1980, 2619, 0\n" for index in range(gpu_count))
+            return
+
+        if "setsid nohup" in command:
+            yield self._launch_detached(command)
+            return
+        if "tail -c +" in command:
+            yield from self._tail_detached(command)
+            return
+        if "run.exit" in command:
+            run = behaviour.detached_runs.get(self._workdir(command))
+            if run and time.time() - run["started"] >= behaviour.benchmark_seconds:
+                yield "0\n"
+            return
+
+        result = behaviour.result_bytes.decode() + "\n"
+        if "benchmarks.sh" in command:
+            log_lines = self._benchmark_log_lines()
+            delay = behaviour.benchmark_seconds / max(1, len(log_lines))
+            for line in log_lines:
+                time.sleep(delay)
+                yield line
+            if "BENCHMARK COMPLETE" in command:
+                yield "=== BENCHMARK COMPLETE ===\n"
+            if "SETUP COMPLETE" in command:
+                yield "=== SETUP COMPLETE ===\n"
+            if "cat benchmark_output.log" in command:
+                yield "".join(log_lines)
+        if "QCI-RESULT-BEGIN" in command:
+            yield self._result_frame()
+        elif "parse.py" in command or "parse_output.json" in command:
+            # `python3 parse.py | tee parse_output.json && cat parse_output.json` prints it twice
+            yield result
+            if "tee parse_output.json" in command and "cat parse_output.json" in command:
+                yield result
+
+    @staticmethod
+    def _workdir(command: str) -> str:
+        match = re.search(r"cd (\S+)", command)
+        return match.group(1) if match else "."
+
+    def _launch_detached(self, command: str) -> str:
+        """Records a detached run; its whole log becomes readable over benchmark_seconds."""
+        output = "".join(self._benchmark_log_lines()) + "=== BENCHMARK COMPLETE ===\n"
+        if "QCI-RESULT-BEGIN" in command:
+            output += self._result_frame()
+        with self.behaviour._lock:
+            self.behaviour.detached_runs[self._workdir(command)] = {"started": time.time(), "output": output}
+        return f"{random.randint(1000, 60000)}\n"
+
+    def _tail_detached(self, command: str):
+        run = self.behaviour.detached_runs.get(self._workdir(command))
+        if run is None:
+            return
+        offset = int(re.search(r"tail -c \+(\d+)", command).group(1)) - 1
+        output, duration = run["output"], max(self.behaviour.benchmark_seconds, 1e-6)
+        while offset < len(output):
+            available = int(len(output) * min(1.0, (time.time() - run["started"]) / duration))
+            if available > offset:
+                yield output[offset:available]
+                offset = available
+            else:
+                time.sleep(0.05)
+
+    def _artifact_archive(self, command: str) -> bytes:
+        """A tar.gz holding one file named after the requested glob: the result JSON or the benchmark log."""
+        pattern = re.search(r"for f in (\S+);", command).group(1)
+        data = self.behaviour.result_bytes if pattern.endswith(".json") else "".join(self._benchmark_log_lines()).encode()
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            member = tarfile.TarInfo(pattern.replace("*", "-gpu0"))
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+        return buffer.getvalue()
+
+    @staticmethod
+    def _disk_benchmark_output(command: str) -> str:
+        """NVMe-like numbers: ~2 GB/s sequential, ~400k random read IOPS."""
+        size = int(re.search(r"count=(\d+)", command).group(1)) * 1024 * 1024
+        fio = lambda direction, iops: json.dumps(
+            {"jobs": [{direction: {"iops": iops, "bw": iops * 4, "clat_ns": {"mean": 32e9 / iops}}}]}
+        )
+        return (
+            f"@@QCI-PROBE seq_write@@\n{size} bytes copied, {size / 1.9e9:.4f} s, 1.9 GB/s\n"
+            f"@@QCI-PROBE seq_read@@\n{size} bytes copied, {size / 2.6e9:.4f} s, 2.6 GB/s\n"
+            f"@@QCI-PROBE rand_read@@\n{fio('read', 412000.0)}\n"
+            f"@@QCI-PROBE rand_write@@\n{fio('write', 188000.0)}\n"
+        )
+
+    def _result_frame(self) -> str:
+        payload = self.behaviour.result_bytes
+        checksum = hashlib.sha256(payload).hexdigest()
+        if random.random() < self.behaviour.corrupt_result_rate:
+            checksum = "0" * len(checksum)
+        return f"\n@@QCI-RESULT-BEGIN v1 {len(payload)} {checksum}@@\n{payload.decode()}\n@@QCI-RESULT-END@@\n"
+
+    def _benchmark_log_lines(self) -> list:
+        line_count = max(1, self.behaviour.benchmark_output_bytes // 100)
+        return [f"[bench] step {i:07d} " + "." * 78 + "\n" for i in range(line_count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake GPU host that answers the bots' SSH commands.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2222)
+    parser.add_argument("--nvidia-smi-fixture", default=DEFAULT_NVIDIA_SMI_FIXTURE)
+    parser.add_argument("--gpus", type=int, default=1, help="synthesize an N-GPU nvidia-smi dump")
+    parser.add_argument("--benchmark-seconds", type=float, default=1.0)
+    parser.add_argument("--benchmark-output-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--command-latency", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="chance per command of dropping the connection")
+    parser.add_argument("--corrupt-result-rate", type=float, default=0.0, help="chance of a bad result frame checksum")
+    args = parser.parse_args()
+
+    behaviour = FakeHostBehaviour(
+        synthesize_multi_gpu_output(load_nvidia_smi_output(args.nvidia_smi_fixture), args.gpus),
+        benchmark_seconds=args.benchmark_seconds,
+        benchmark_output_bytes=args.benchmark_output_bytes,
+        command_latency=args.command_latency,
+        disconnect_rate=args.disconnect_rate,
+        corrupt_result_rate=args.corrupt_result_rate,
+    )
+    host = FakeSSHHost(behaviour, args.host, args.port).start()
+    print(f"[INFO] Fake GPU host listening on {args.host}:{host.port} ({args.gpus} GPU(s))")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"[INFO] Fake host served {behaviour.commands_served} commands, {behaviour.bytes_sent} bytes")
+    except KeyboardInterrupt:
+        host.stop()
+
+
+if __name__ == "__main__":
+    main()
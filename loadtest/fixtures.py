@@ -0,0 +1,54 @@
+import json
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TENSORDOCK_FIXTURE = os.path.join(REPO_ROOT, "td.json")
+
+
+def load_tensordock_hostnodes(path: str = DEFAULT_TENSORDOCK_FIXTURE) -> list:
+    """
+    Loads the hostnodes list from a captured TensorDock /hostnodes response.
+
+    Captures are often cut off mid-write (td.json is), so hostnodes are decoded
+    one at a time and decoding stops at the first incomplete entry.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    start = text.index("[", text.index('"hostnodes"')) + 1
+    decoder = json.JSONDecoder()
+    hostnodes = []
+    pos = start
+    while pos < len(text):
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            node, pos = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        hostnodes.append(node)
+    return hostnodes
+
+
+def hyperbolic_nodes_from_hostnodes(hostnodes: list) -> list:
+    """Builds Hyperbolic-style marketplace nodes from TensorDock hostnodes (one node per GPU type)."""
+    nodes = []
+    for hostnode in hostnodes:
+        location = hostnode.get("location", {})
+        for gpu in hostnode.get("available_resources", {}).get("gpus", []):
+            nodes.append({
+                "id": f"{hostnode['id'][:8]}-{gpu['v0Name']}",
+                "cluster_name": f"{location.get('city', 'unknown').lower().replace(' ', '-')}-cluster",
+                "status": "node_ready",
+                "reserved": False,
+                "gpus_total": gpu["availableCount"],
+                "gpus_reserved": 0,
+                "hardware": {
+                    "gpus": [{"model": f"NVIDIA-{gpu['v0Name'].upper()}", "ram": 81559}],
+                },
+                "pricing": {"price": {"amount": int(gpu["price_per_hr"] * 100)}},
+                "location": {"region": location.get("country", "unknown")},
+            })
+    return nodes
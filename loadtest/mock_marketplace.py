@@ -0,0 +1,338 @@
+"""
+Local stand-in for the Hyperbolic and TensorDock endpoints used by MarketplaceClient.
+
+One server answers both marketplaces:
+    http://<host>:<port>/hyperbolic/v1/marketplace/...   (HYPERBOLIC_API_URL=http://<host>:<port>/hyperbolic/v1)
+    http://<host>:<port>/tensordock/api/v2/...           (TENSORDOCK_API_URL=http://<host>:<port>/tensordock/api/v2)
+
+Run standalone with:
+    python -m loadtest.mock_marketplace --port 8080 --boot-delay 5 15 --error-rate 0.02 --rate-limit 5
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loadtest.fixtures import DEFAULT_TENSORDOCK_FIXTURE, load_tensordock_hostnodes, hyperbolic_nodes_from_hostnodes
+
+HYPERBOLIC_PREFIX = "/hyperbolic/v1/marketplace"
+TENSORDOCK_PREFIX = "/tensordock/api/v2"
+
+
+class MockMarketplace:
+    """In-memory marketplace state plus the knobs used to make it misbehave."""
+
+    def __init__(self, hostnodes: list, boot_delay: tuple = (2.0, 5.0), error_rate: float = 0.0,
+                 boot_failure_rate: float = 0.0, rate_limit_per_second: float = None,
+                 api_latency: float = 0.0, ssh_host: str = "127.0.0.1", ssh_port: int = 2222):
+        self.hostnodes = hostnodes
+        self.hyperbolic_nodes = hyperbolic_nodes_from_hostnodes(hostnodes)
+        self.boot_delay = boot_delay
+        self.error_rate = error_rate
+        self.boot_failure_rate = boot_failure_rate
+        self.rate_limit_per_second = rate_limit_per_second
+        self.api_latency = api_latency
+        self.ssh_host = ssh_host
+        self.ssh_port = ssh_port
+
+        self.instances = {}  # instance id -> instance record
+        self.calls = Counter()  # "<marketplace> <endpoint>" -> count
+        self.responses = Counter()  # status code -> count
+        self._lock = threading.Lock()
+        self._tokens = {}  # marketplace -> (tokens, updated)
+
+    # ---------------------- #
+    # Failure injection
+    # ---------------------- #
+    def allow_request(self, marketplace: str) -> bool:
+        """Server-side token bucket per marketplace; False means answer 429."""
+        if not self.rate_limit_per_second:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._tokens.get(marketplace, (self.rate_limit_per_second, now))
+            tokens = min(self.rate_limit_per_second, tokens + (now - updated) * self.rate_limit_per_second)
+            if tokens < 1:
+                self._tokens[marketplace] = (tokens, now)
+                return False
+            self._tokens[marketplace] = (tokens - 1, now)
+            return True
+
+    def record(self, marketplace: str, endpoint: str, status: int):
+        with self._lock:
+            self.calls[f"{marketplace} {endpoint}"] += 1
+            self.responses[status] += 1
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.responses.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "responses": dict(self.responses),
+                "live_instances": len(self.instances),
+            }
+
+    # ---------------------- #
+    # Instance lifecycle
+    # ---------------------- #
+    def _create_instance(self, marketplace: str, node_id: str, gpu_model: str, gpu_count: int, name: str) -> dict:
+        now = time.time()
+        never_boots = random.random() < self.boot_failure_rate
+        instance = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "marketplace": marketplace,
+            "node_id": node_id,
+            "gpu_model": gpu_model,
+            "gpu_count": gpu_count,
+            "created_at": now,
+            "ready_at": None if never_boots else now + random.uniform(*self.boot_delay),
+        }
+        with self._lock:
+            self.instances[instance["id"]] = instance
+        return instance
+
+    def _is_ready(self, instance: dict) -> bool:
+        return instance["ready_at"] is not None and time.time() >= instance["ready_at"]
+
+    def _release_capacity(self, instance: dict):
+        if instance["marketplace"] == "hyperbolic":
+            for node in self.hyperbolic_nodes:
+                if node["id"] == instance["node_id"]:
+                    node["gpus_reserved"] = max(0, node["gpus_reserved"] - instance["gpu_count"])
+        else:
+            for hostnode in self.hostnodes:
+                if hostnode["id"] == instance["node_id"]:
+                    for gpu in hostnode["available_resources"]["gpus"]:
+                        if gpu["v0Name"] == instance["gpu_model"]:
+                            gpu["availableCount"] += instance["gpu_count"]
+
+    def terminate(self, instance_id: str) -> bool:
+        with self._lock:
+            instance = self.instances.pop(instance_id, None)
+            if instance:
+                self._release_capacity(instance)
+        return instance is not None
+
+    # ---------------------- #
+    # Hyperbolic
+    # ---------------------- #
+    def hyperbolic_list(self) -> dict:
+        with self._lock:
+            return {"instances": json.loads(json.dumps(self.hyperbolic_nodes))}
+
+    def hyperbolic_create(self, payload: dict) -> tuple:
+        gpu_count = payload.get("gpu_count", 1)
+        with self._lock:
+            node = next((n for n in self.hyperbolic_nodes if n["id"] == payload.get("node_name")), None)
+            if node is None or node["gpus_total"] - node["gpus_reserved"] < gpu_count:
+                return 400, {"error": "node has no free capacity"}
+            node["gpus_reserved"] += gpu_count
+        name = f"mock-{uuid.uuid4().hex[:12]}"
+        instance = self._create_instance("hyperbolic", node["id"], node["hardware"]["gpus"][0]["model"], gpu_count, name)
+        return 200, {"instance_name": instance["name"]}
+
+    def hyperbolic_instances(self) -> dict:
+        with self._lock:
+            instances = [i for i in self.instances.values() if i["marketplace"] == "hyperbolic"]
+        return {"instances": [{
+            "id": i["id"],
+            "created": datetime.fromtimestamp(i["created_at"], timezone.utc).isoformat(),
+            "sshCommand": f"ssh ubuntu@{self.ssh_host} -p {self.ssh_port}",
+            "instance": {"id": i["name"], "status": "online" if self._is_ready(i) else "starting"},
+        } for i in instances]}
+
+    # ---------------------- #
+    # TensorDock
+    # ---------------------- #
+    def tensordock_hostnodes(self) -> dict:
+        with self._lock:
+            return {"data": {"hostnodes": json.loads(json.dumps(self.hostnodes))}}
+
+    def tensordock_create(self, payload: dict) -> tuple:
+        attributes = payload.get("data", {}).get("attributes", {})
+        gpus = attributes.get("resources", {}).get("gpus", {})
+        if not gpus:
+            return 400, {"error": "no gpus requested"}
+        gpu_model, spec = next(iter(gpus.items()))
+        gpu_count = spec.get("count", 1)
+        with self._lock:
+            hostnode = next((h for h in self.hostnodes if h["id"] == attributes.get("hostnode_id")), None)
+            gpu = next((g for g in (hostnode or {}).get("available_resources", {}).get("gpus", [])
+                        if g["v0Name"] == gpu_model), None)
+            if gpu is None or gpu["availableCount"] < gpu_count:
+                return 400, {"error": "hostnode has no free capacity"}
+            gpu["availableCount"] -= gpu_count
+        instance = self._create_instance("tensordock", hostnode["id"], gpu_model, gpu_count, attributes.get("name"))
+        return 200, {"data": {"type": "virtualmachine", "id": instance["id"], "name": instance["name"]}}
+
+    def tensordock_instance(self, instance: dict) -> dict:
+        return {
+            "id": instance["id"],
+            "name": instance["name"],
+            "status": "running" if self._is_ready(instance) else "starting",
+            "attributes": {
+                "ip_address": self.ssh_host,
+                "port_forwards": [{"internal_port": 22, "external_port": self.ssh_port}],
+            },
+        }
+
+    def tensordock_instances(self) -> dict:
+        with self._lock:
+            instances = [i for i in self.instances.values() if i["marketplace"] == "tensordock"]
+        return {"data": [self.tensordock_instance(i) for i in instances]}
+
+
+class MockMarketplaceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _payload(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def _route(self, method: str) -> tuple:
+        """Returns (marketplace, endpoint, handler) for the request path."""
+        market = self.server.marketplace
+        path = self.path.split("?", 1)[0].rstrip("/")
+
+        if path.startswith(HYPERBOLIC_PREFIX):
+            rest = path[len(HYPERBOLIC_PREFIX):]
+            routes = {
+                ("POST", ""): ("offers", lambda p: (200, market.hyperbolic_list())),
+                ("POST", "/instances/create"): ("create", market.hyperbolic_create),
+                ("GET", "/instances"): ("instances", lambda p: (200, market.hyperbolic_instances())),
+                ("POST", "/instances/terminate"): ("terminate", lambda p: (
+                    (200, {"status": "success"}) if market.terminate(p.get("id")) else (404, {"error": "not found"}))),
+            }
+            endpoint, handler = routes.get((method, rest), (None, None))
+            return "hyperbolic", endpoint, handler
+
+        if path.startswith(TENSORDOCK_PREFIX):
+            rest = path[len(TENSORDOCK_PREFIX):]
+            if (method, rest) == ("GET", "/hostnodes"):
+                return "tensordock", "offers", lambda p: (200, market.tensordock_hostnodes())
+            if (method, rest) == ("POST", "/instances"):
+                return "tensordock", "create", market.tensordock_create
+            if (method, rest) == ("GET", "/instances"):
+                return "tensordock", "instances", lambda p: (200, market.tensordock_instances())
+            if rest.startswith("/instances/"):
+                instance_id = rest[len("/instances/"):]
+                if method == "GET":
+                    def get_instance(p):
+                        instance = market.instances.get(instance_id)
+                        if instance is None:
+                            return 404, {"error": "not found"}
+                        return 200, {"data": market.tensordock_instance(instance)}
+                    return "tensordock", "instances", get_instance
+                if method == "DELETE":
+                    return "tensordock", "terminate", lambda p: (
+                        (200, {"status": "success"}) if market.terminate(instance_id) else (404, {"error": "not found"}))
+            return "tensordock", None, None
+
+        return None, None, None
+
+    def _handle(self, method: str):
+        market = self.server.marketplace
+        payload = self._payload()
+        marketplace, endpoint, handler = self._route(method)
+        if handler is None:
+            self._send(404, {"error": f"no mock route for {method} {self.path}"})
+            return
+
+        if market.api_latency:
+            time.sleep(market.api_latency)
+
+        if not market.allow_request(marketplace):
+            market.record(marketplace, endpoint, 429)
+            self._send(429, {"error": "rate limited"}, {"Retry-After": "1"})
+            return
+        if random.random() < market.error_rate:
+            market.record(marketplace, endpoint, 500)
+            self._send(500, {"error": "injected failure"})
+            return
+
+        status, body = handler(payload)
+        market.record(marketplace, endpoint, status)
+        self._send(status, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def start_mock_marketplace(marketplace: MockMarketplace, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Starts the server on a daemon thread and returns it; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), MockMarketplaceHandler)
+    server.daemon_threads = True
+    server.marketplace = marketplace
+    threading.Thread(target=server.serve_forever, name="mock-marketplace", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock Hyperbolic/TensorDock marketplace.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--fixture", default=DEFAULT_TENSORDOCK_FIXTURE, help="td.json-style hostnodes capture")
+    parser.add_argument("--boot-delay", type=float, nargs=2, default=[2.0, 5.0], metavar=("MIN", "MAX"))
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--boot-failure-rate", type=float, default=0.0, help="fraction of instances that never boot")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests/second per marketplace before 429s")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--ssh-host", default="127.0.0.1")
+    parser.add_argument("--ssh-port", type=int, default=2222)
+    args = parser.parse_args()
+
+    marketplace = MockMarketplace(
+        load_tensordock_hostnodes(args.fixture),
+        boot_delay=tuple(args.boot_delay),
+        error_rate=args.error_rate,
+        boot_failure_rate=args.boot_failure_rate,
+        rate_limit_per_second=args.rate_limit,
+        api_latency=args.api_latency,
+        ssh_host=args.ssh_host,
+        ssh_port=args.ssh_port,
+    )
+    server = start_mock_marketplace(marketplace, args.host, args.port)
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"[INFO] Mock marketplace listening on {base}")
+    print(f"[INFO]   HYPERBOLIC_API_URL={base}/hyperbolic/v1")
+    print(f"[INFO]   TENSORDOCK_API_URL={base}/tensordock/api/v2")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"[INFO] Mock marketplace stats: {marketplace.stats()}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+End-to-end benchmark of the SSH and parsing hot paths against the fake GPU host.
+
+Runs connect -> health snapshot -> host probe -> host benchmarks -> benchmark
+stage -> artifact pull with the bot's own SSHManager (or RemoteAgent with --agent) under a
+CommandWatchdog, as main.py runs it, collect_gpu_health_snapshots, collect_host_info, the disk / network
+microbenchmarks, run_gpu_benchmarks (one suite process per GPU when
+--gpus > 1) and collect_artifacts, and reports per-stage latencies:
+
+    python -m loadtest.ssh_bench --bot hypebot --iterations 20 --gpus 8 --benchmark-output-bytes 1000000
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import statistics
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from loadtest.fake_ssh_host import (
+    DEFAULT_NVIDIA_SMI_FIXTURE,
+    FakeHostBehaviour,
+    FakeSSHHost,
+    load_nvidia_smi_output,
+    synthesize_multi_gpu_output,
+)
+from loadtest.driver import percentile
+
+
+def write_client_key(directory: str) -> str:
+    """SSHManager only loads Ed25519 keys, so generate a throwaway one."""
+    path = os.path.join(directory, "id_ed25519")
+    key = Ed25519PrivateKey.generate()
+    with open(path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.OpenSSH,
+            serialization.NoEncryption(),
+        ))
+    os.chmod(path, 0o600)
+    return path
+
+
+def timed(samples: dict, stage: str, fn, *args):
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        samples.setdefault(stage, []).append((time.perf_counter() - start) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SSH/parsing pipeline against a fake GPU host.")
+    parser.add_argument("--bot", choices=["hypebot", "tensorbot"], default="hypebot")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--gpus", type=int, default=1)
+    parser.add_argument("--nvidia-smi-fixture", default=DEFAULT_NVIDIA_SMI_FIXTURE)
+    parser.add_argument("--benchmark-seconds", type=float, default=0.5)
+    parser.add_argument("--benchmark-output-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--command-latency", type=float, default=0.0)
+    parser.add_argument("--disconnect-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-result-rate", type=float, default=0.0)
+    parser.add_argument("--agent", action="store_true", help="run commands through the remote agent")
+    parser.add_argument("--verbose", action="store_true", help="show the bot's own log output")
+    args = parser.parse_args()
+
+    # Raw benchmark logs and artifacts are written to the bots' artifact store; keep them out of ~/.cache
+    os.environ.setdefault("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "qci-ssh-bench-artifacts"))
+    ssh_manager_module = importlib.import_module(f"{args.bot}.core.ssh_manager")
+    collector = importlib.import_module(f"{args.bot}.benchmark.gpu_info_collector")
+    host_probe = importlib.import_module(f"{args.bot}.benchmark.host_probe")
+    host_benchmarks = importlib.import_module(f"{args.bot}.benchmark.host_benchmarks")
+    runner = importlib.import_module(f"{args.bot}.benchmark.benchmark_runner")
+    rental_session = importlib.import_module(f"{args.bot}.core.rental_session")
+    command_watchdog = importlib.import_module(f"{args.bot}.core.command_watchdog")
+    remote_agent = importlib.import_module(f"{args.bot}.core.remote_agent")
+    artifact_store = importlib.import_module(f"{args.bot}.core.artifact_store")
+    artifact_collector = importlib.import_module(f"{args.bot}.benchmark.artifact_collector")
+
+    behaviour = FakeHostBehaviour(
+        synthesize_multi_gpu_output(load_nvidia_smi_output(args.nvidia_smi_fixture), args.gpus),
+        benchmark_seconds=args.benchmark_seconds,
+        benchmark_output_bytes=args.benchmark_output_bytes,
+        command_latency=args.command_latency,
+        disconnect_rate=args.disconnect_rate,
+        corrupt_result_rate=args.corrupt_result_rate,
+    )
+    host = FakeSSHHost(behaviour).start()
+    print(f"[INFO] Fake GPU host on 127.0.0.1:{host.port} ({args.gpus} GPU(s))")
+
+    samples, failures = {}, []
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = write_client_key(tmp)
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+        with quiet:
+            for _ in range(args.iterations):
+                session = rental_session.RentalSession(
+                    client_id="fake-node", cluster_name="fake-cluster", marketplace="Fake", model="fake"
+                )
+                ssh_manager = ssh_manager_module.SSHManager(
+                    ip="127.0.0.1", username="ubuntu", private_key_path=key_path, port=host.port
+                )
+                try:
+                    if timed(samples, "connect", ssh_manager.connect_and_measure_latency) == -1:
+                        failures.append("connect failed")
+                        continue
+                    remote = ssh_manager
+                    if args.agent:
+                        remote = timed(samples, "agent_start", remote_agent.RemoteAgent(ssh_manager).start)
+                    watchdog = command_watchdog.CommandWatchdog(remote, session)
+                    with watchdog.stage("health", 60):
+                        snapshots = timed(samples, "health_snapshot", collector.collect_gpu_health_snapshots, watchdog)
+                    if len(snapshots) != args.gpus:
+                        failures.append(f"parsed {len(snapshots)} GPU snapshots, expected {args.gpus}")
+                    with watchdog.stage("host_probe", 60):
+                        host_info = timed(samples, "host_probe", host_probe.collect_host_info, watchdog)
+                    if not host_info["cpu"]["logical_cores"] or not host_info["system"]["gpu_topology"]:
+                        failures.append("host probe returned no CPU or topology info")
+                    with watchdog.stage("host_benchmarks", 60):
+                        disk = timed(samples, "disk_benchmark", host_benchmarks.run_disk_benchmark, watchdog, 64)
+                        timed(samples, "network_bench", host_benchmarks.run_network_benchmark, watchdog, 16)
+                    if disk["seq_write_mbps"] is None or disk["rand_read"] is None:
+                        failures.append("disk benchmark results did not parse")
+                    with watchdog.stage("benchmark", args.benchmark_seconds * 2 + 60):
+                        timed(samples, "benchmark_stage", runner.run_gpu_benchmarks, watchdog, session, "full", args.gpus)
+                    if "gpu_benchmarks" not in session.benchmarks:
+                        failures.append("; ".join(session.errors) or "no benchmark results")
+                    store = artifact_store.ArtifactStore(os.path.join(tmp, "artifacts"))
+                    patterns = ["benchmarking*/benchmark_output.log", "benchmarking*/parse_output.json"]
+                    with watchdog.stage("artifacts", 60):
+                        records = timed(samples, "artifacts", artifact_collector.collect_artifacts,
+                                        watchdog, session, patterns, store, 64 * 1024 * 1024)
+                    if any(record["status"] != "stored" for record in records):
+                        failures.append(f"artifact pull failed: {[record['status'] for record in records]}")
+                except Exception as e:
+                    failures.append(str(e))
+                finally:
+                    ssh_manager.disconnect()
+
+    host.stop()
+    for stage, values in samples.items():
+        print(
+            f"[RESULT] {stage:<16} n={len(values):>3} "
+            f"p50={statistics.median(values):8.1f}ms p95={percentile(values, 95):8.1f}ms max={max(values):8.1f}ms"
+        )
+    print(f"[RESULT] commands={behaviour.commands_served} bytes_sent={behaviour.bytes_sent} failures={len(failures)}")
+    for failure in failures[:3]:
+        print(f"         failure: {failure}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import sys
+from tensorbot.cli import main
+
+sys.exit(main())
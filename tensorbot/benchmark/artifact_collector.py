@@ -0,0 +1,64 @@
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tensorbot.core.logger import Logger
+from tensorbot.core.artifact_store import ArtifactStore
+
+logger = Logger()
+
+
+def collect_artifacts(ssh_manager, session, patterns: list, store: ArtifactStore,
+                      max_bytes: int, parallelism: int = 4) -> list:
+    """
+    Pulls each remote glob (relative to the login directory) back as its own tar.gz
+    stream, several at once, into the artifact store. An archive larger than
+    max_bytes is cut off and not kept. Appends one record per pattern to session.artifacts.
+    """
+    if not patterns:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(parallelism, len(patterns)))) as executor:
+        records = list(executor.map(lambda pattern: _collect_one(ssh_manager, pattern, store, max_bytes), patterns))
+
+    session.artifacts.extend(records)
+    kept = [record for record in records if record["status"] == "stored"]
+    logger.log(f"Collected {len(kept)}/{len(records)} artifact archives "
+               f"({sum(record['bytes'] for record in kept) / 1e6:.1f} MB)")
+    return records
+
+
+def _collect_one(ssh_manager, pattern: str, store: ArtifactStore, max_bytes: int) -> dict:
+    record = {"pattern": pattern, "status": None, "sha256": None, "path": None, "bytes": 0,
+              "seconds": None, "throughput_mbps": None}
+    # Matches go into an array so paths with spaces stay whole. head stops the transfer one byte past
+    # the cap, so an oversized archive costs at most max_bytes of bandwidth; pipefail reports a tar that
+    # died partway instead of head's status
+    script = (
+        f'files=(); for f in {pattern}; do [ -e "$f" ] && files+=("$f"); done; [ ${{#files[@]}} -gt 0 ] || exit 0; '
+        f'set -o pipefail; tar -czf - --ignore-failed-read "${{files[@]}}" 2>/dev/null | head -c {max_bytes + 1}'
+    )
+    command = f"bash -c {shlex.quote(script)}"
+    writer = store.writer(suffix=".tar.gz")
+    start = time.time()
+    try:
+        stderr, exit_status = ssh_manager.run_command_streaming(command, writer.write)
+    except Exception as e:
+        writer.discard()
+        record["status"] = f"failed: {e}"
+        return record
+
+    record["seconds"] = time.time() - start
+    record["bytes"] = writer.size
+    record["throughput_mbps"] = writer.size * 8 / record["seconds"] / 1e6 if record["seconds"] else None
+    if writer.size > max_bytes:
+        # tar failing on the pipe head closed is expected here
+        writer.discard()
+        record["status"] = f"over the {max_bytes} byte cap; not kept"
+    elif exit_status != 0:
+        writer.discard()
+        record["status"] = f"failed: archive command exited with status {exit_status}"
+    elif writer.size == 0:
+        writer.discard()
+        record["status"] = "no matching files"
+    else:
+        record.update(writer.commit(), status="stored")
+    return record
@@ -0,0 +1,102 @@
+import statistics
+from datetime import datetime, timedelta, timezone
+from tensorbot.config.config import (
+    BENCHMARK_RECENT_DAYS,
+    BENCHMARK_STABLE_CV,
+    BENCHMARK_MIN_STABLE_RUNS,
+    BENCHMARK_DEVIATION_TOLERANCE,
+)
+
+# Approximate wall time of each tier; benchmarks.sh reads the tier from $BENCHMARK_TIER and
+# reports the one it ran as "benchmark_tier" in its results (see tier_confirmed)
+BENCHMARK_TIERS = {
+    "quick": {"estimated_seconds": 4 * 60},
+    "standard": {"estimated_seconds": 12 * 60},
+    "full": {"estimated_seconds": 30 * 60},
+}
+
+
+def flatten_metrics(results: dict, prefix: str = "") -> dict:
+    """Flattens nested benchmark results into {'a.b.c': number} for the numeric leaves."""
+    metrics = {}
+    for key, value in (results or {}).items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[path] = float(value)
+    return metrics
+
+
+def _baseline_runs(history: list) -> list:
+    """Deep (standard/full) runs only; quick runs verify a baseline, they don't form one."""
+    return [run for run in history if run.get("benchmark_tier") != "quick"]
+
+
+def _metric_series(runs: list) -> dict:
+    series = {}
+    for run in runs:
+        for metric, value in flatten_metrics(run.get("benchmarks", {}).get("gpu_benchmarks")).items():
+            series.setdefault(metric, []).append(value)
+    return series
+
+
+def select_benchmark_tier(history: list, now: datetime = None) -> tuple[str, str]:
+    """
+    Picks the benchmark tier for a node/model from its past sessions (newest first).
+    Returns (tier, reason).
+    """
+    if not history:
+        return "full", "node/model never benchmarked"
+
+    baseline = _baseline_runs(history)
+    if not baseline:
+        return "full", "no standard/full baseline for node/model"
+
+    now = now or datetime.now(timezone.utc)
+    last_deep = datetime.fromisoformat(baseline[0]["start_time"])
+    if now - last_deep > timedelta(days=BENCHMARK_RECENT_DAYS):
+        return "standard", f"last deep run is older than {BENCHMARK_RECENT_DAYS} days"
+
+    if len(baseline) < BENCHMARK_MIN_STABLE_RUNS:
+        return "standard", f"fewer than {BENCHMARK_MIN_STABLE_RUNS} deep runs to judge stability"
+
+    for metric, values in _metric_series(baseline[:BENCHMARK_MIN_STABLE_RUNS * 2]).items():
+        mean = statistics.fmean(values)
+        if len(values) >= 2 and mean and statistics.stdev(values) / abs(mean) > BENCHMARK_STABLE_CV:
+            return "standard", f"{metric} varies more than {BENCHMARK_STABLE_CV:.0%} between runs"
+
+    return "quick", "recent, stable results; verifying against history"
+
+
+def compare_to_history(results: dict, history: list) -> dict:
+    """Compares each metric of a run against the mean of the node's deep runs."""
+    series = _metric_series(_baseline_runs(history))
+    comparison = {"metrics": {}, "outliers": []}
+    for metric, value in flatten_metrics(results).items():
+        if metric not in series:
+            continue
+        mean = statistics.fmean(series[metric])
+        deviation = (value - mean) / abs(mean) if mean else 0.0
+        comparison["metrics"][metric] = {
+            "value": value,
+            "history_mean": mean,
+            "deviation_pct": deviation * 100,
+        }
+        if abs(deviation) > BENCHMARK_DEVIATION_TOLERANCE:
+            comparison["outliers"].append(metric)
+    return comparison
+
+
+def tier_confirmed(results: dict, tier: str) -> bool:
+    """
+    True if the suite's results say it ran at `tier`. benchmarks.sh is fetched at run
+    time, so a version that ignores $BENCHMARK_TIER would run everything; only the full
+    tier (its default) counts without being reported.
+    """
+    return tier == "full" or (results or {}).get("benchmark_tier") == tier
+
+
+def time_saved_seconds(tier: str) -> float:
+    """Benchmark time skipped compared with always running the full suite."""
+    return BENCHMARK_TIERS["full"]["estimated_seconds"] - BENCHMARK_TIERS[tier]["estimated_seconds"]
@@ -0,0 +1,188 @@
+import statistics
+import time
+from tensorbot.core.logger import Logger
+from tensorbot.core.benchmark_job import BenchmarkJob
+from tensorbot.core.metrics import QUEUE_DEPTH
+from tensorbot.config.config import INSTANCE_TIME_BUDGET_SECONDS
+from tensorbot.benchmark.benchmark_runner import run_gpu_benchmarks
+from tensorbot.benchmark.benchmark_tiers import BENCHMARK_TIERS, flatten_metrics
+
+logger = Logger()
+
+# Sampled once per interval during a telemetry soak
+SOAK_QUERY_FIELDS = ["index", "temperature.gpu", "power.draw", "clocks.sm", "clocks.mem", "utilization.gpu"]
+SOAK_SAMPLE_INTERVAL_SECONDS = 5
+
+
+def build_job_queue(spec: str, session_id: str, auto_tier: str) -> list:
+    """
+    Builds the jobs for one rental from a comma separated spec, e.g. "auto,quick*3,soak:600":
+      quick / standard / full   run the suite at that tier
+      auto                      run the suite at the tier picked from the node's history
+      soak:<seconds>            sample GPU telemetry for that long
+      <job>*<n>                 repeat a job n times (trials for variance)
+    """
+    jobs = []
+    for token in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, repeat = token.partition("*")
+        name, _, arg = name.partition(":")
+        for trial in range(1, int(repeat or 1) + 1):
+            if name == "soak":
+                jobs.append(BenchmarkJob(session_id, "soak", soak_seconds=float(arg or 300), trial=trial))
+            elif name == "auto" or name in BENCHMARK_TIERS:
+                tier = auto_tier if name == "auto" else name
+                jobs.append(BenchmarkJob(session_id, "suite", tier=tier, trial=trial))
+            else:
+                raise ValueError(f"Unknown benchmark job '{token}' in queue spec '{spec}'")
+    return jobs
+
+
+def estimated_seconds(job: BenchmarkJob) -> float:
+    return job.soak_seconds if job.kind == "soak" else BENCHMARK_TIERS[job.tier]["estimated_seconds"]
+
+
+class JobQueueRunner:
+    """
+    Runs a queue of benchmark jobs back to back on one rented instance, so boot
+    and SSH setup are paid once. Jobs that no longer fit the instance's time
+    budget are skipped; every job is saved as a child record of the session.
+    """
+
+    def __init__(self, ssh_manager, session, db_interface, gpu_count: int = 1,
+                 budget_seconds: float = INSTANCE_TIME_BUDGET_SECONDS, started_at: float = None, env: dict = None):
+        self.ssh_manager = ssh_manager
+        self.session = session
+        self.db = db_interface
+        self.gpu_count = gpu_count
+        self.deadline = (started_at or time.time()) + budget_seconds
+        self.env = env
+        self._suite_ready = False
+
+    def run(self, jobs: list) -> list:
+        queued = len(jobs)
+        QUEUE_DEPTH.inc(queued, queue="benchmark_jobs")
+        try:
+            for position, job in enumerate(jobs, start=1):
+                QUEUE_DEPTH.dec(queue="benchmark_jobs")
+                queued -= 1
+                remaining = self.deadline - time.time()
+                if estimated_seconds(job) > remaining:
+                    job.status = "skipped"
+                    job.add_error(f"Needs ~{estimated_seconds(job):.0f}s but only {max(remaining, 0):.0f}s of the instance budget is left")
+                    logger.log(f"[WARN] Skipping job {position}/{len(jobs)} ({job.kind} {job.tier or ''}): over time budget")
+                else:
+                    logger.log(f"Running job {position}/{len(jobs)}: {job.kind} {job.tier or job.soak_seconds} (trial {job.trial})")
+                    self._run_job(job, remaining)
+
+                self.session.benchmark_jobs.append(job.summary())
+                try:
+                    self.db.save_benchmark_job(job.to_dict())
+                except Exception as e:
+                    self.session.add_error(f"Saving job {job.job_id} failed: {str(e)}")
+        finally:
+            QUEUE_DEPTH.dec(queued, queue="benchmark_jobs")  # jobs never reached after a timeout
+
+        try:
+            self._promote_primary_result(jobs)
+            variance = trial_variance(jobs)
+            if variance:
+                self.session.benchmarks["trial_variance"] = variance
+        except Exception as e:
+            self.session.add_error(f"Summarising benchmark jobs failed: {str(e)}")
+        return jobs
+
+    def _run_job(self, job: BenchmarkJob, remaining: float):
+        job.start_time = job.now()
+        start = time.time()
+        try:
+            if job.kind == "soak":
+                job.benchmarks["telemetry_soak"] = run_telemetry_soak(self.ssh_manager, job.soak_seconds)
+                done = bool(job.benchmarks["telemetry_soak"]["per_gpu"])
+            else:
+                # The suite is cloned once and reused by every later job on this instance; a failed setup is retried
+                self._suite_ready = run_gpu_benchmarks(self.ssh_manager, job, job.tier, self.gpu_count,
+                                                       setup=not self._suite_ready, timeout=remaining, env=self.env)
+                done = "gpu_benchmarks" in job.benchmarks
+            job.status = "completed" if done else "failed"
+        except Exception as e:
+            job.status = "failed"
+            job.add_error(f"{job.kind} job failed: {str(e)}")
+        job.end_time = job.now()
+        job.duration_seconds = time.time() - start
+        for error in job.errors:
+            self.session.add_error(f"Job {job.job_id}: {error}")
+
+    def _promote_primary_result(self, jobs: list):
+        """The first completed suite job stands in for the session's own result (history, cache, tiers)."""
+        if "gpu_benchmarks" in self.session.benchmarks:
+            return
+        for job in jobs:
+            if job.kind == "suite" and job.status == "completed":
+                self.session.benchmarks.update(job.benchmarks)
+                self.session.benchmark_tier = job.tier
+                return
+
+
+def trial_variance(jobs: list) -> dict:
+    """Per-tier spread of each metric across repeated suite trials: {tier: [{metric, mean, stdev, cv_pct, trials}]}."""
+    by_tier = {}
+    for job in jobs:
+        if job.kind == "suite" and job.status == "completed":
+            by_tier.setdefault(job.tier, []).append(flatten_metrics(job.benchmarks["gpu_benchmarks"]))
+
+    variance = {}
+    for tier, runs in by_tier.items():
+        if len(runs) < 2:
+            continue
+        variance[tier] = []
+        for metric in runs[0]:
+            values = [run[metric] for run in runs if metric in run]
+            if len(values) < 2:
+                continue
+            mean = statistics.fmean(values)
+            stdev = statistics.stdev(values)
+            variance[tier].append({
+                "metric": metric,
+                "mean": mean,
+                "stdev": stdev,
+                "cv_pct": stdev / abs(mean) * 100 if mean else 0.0,
+                "trials": len(values),
+            })
+    return variance
+
+
+def run_telemetry_soak(ssh_manager, seconds: float, interval: int = SOAK_SAMPLE_INTERVAL_SECONDS) -> dict:
+    """Samples per-GPU telemetry for `seconds` and returns min/mean/max of each field per GPU."""
+    command = (
+        f"timeout {int(seconds)} nvidia-smi --query-gpu={','.join(SOAK_QUERY_FIELDS)} "
+        f"--format=csv,noheader,nounits -l {interval}"
+    )
+    output_chunks = []
+    stderr, exit_status = ssh_manager.run_command_streaming(command, output_chunks.append, timeout=seconds + 60)
+    if exit_status not in (0, 124):  # 124: stopped by timeout, which is how a soak normally ends
+        raise Exception(f"Telemetry soak exited with status {exit_status}: {stderr.strip()}")
+
+    samples = {}
+    for line in b"".join(output_chunks).decode(errors="replace").splitlines():
+        values = [value.strip() for value in line.split(",")]
+        if len(values) != len(SOAK_QUERY_FIELDS):
+            continue
+        row = dict(zip(SOAK_QUERY_FIELDS, values))
+        for field in SOAK_QUERY_FIELDS[1:]:
+            try:
+                samples.setdefault(row["index"], {}).setdefault(field, []).append(float(row[field]))
+            except ValueError:
+                continue  # "[N/A]" or "[Not Supported]"
+
+    per_gpu = []
+    for index, fields in samples.items():
+        summary = {"gpu_index": int(index)}
+        for field, values in fields.items():
+            summary[field.replace(".", "_")] = {
+                "min": min(values),
+                "mean": statistics.fmean(values),
+                "max": max(values),
+                "samples": len(values),
+            }
+        per_gpu.append(summary)
+    return {"seconds": seconds, "interval_seconds": interval, "per_gpu": per_gpu}
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import math
+
+# Framing for results sent back over stdout:
+#   @@QCI-RESULT-BEGIN v1 <payload bytes> <sha256 hex>@@\n<payload>\n@@QCI-RESULT-END@@\n
+FRAME_BEGIN = b"@@QCI-RESULT-BEGIN"
+FRAME_HEADER_END = b"@@\n"
+FRAME_END = b"\n@@QCI-RESULT-END@@"
+FRAME_VERSION = "v1"
+MAX_RESULT_BYTES = 16 * 1024 * 1024
+
+
+def framed_result_command(result_path: str) -> str:
+    """Shell snippet that prints result_path wrapped in a checksummed result frame."""
+    begin = FRAME_BEGIN.decode()
+    end = FRAME_END.decode().lstrip("\n")
+    return (
+        f"printf '\\n{begin} {FRAME_VERSION} %s %s@@\\n' "
+        f"\"$(wc -c < {result_path} | tr -d ' ')\" "
+        f"\"$(sha256sum {result_path} | cut -d' ' -f1)\" && "
+        f"cat {result_path} && "
+        f"printf '\\n{end}\\n'"
+    )
+
+
+class ResultFrameParser:
+    """
+    Incremental parser for a framed result embedded in a command's stdout.
+
+    feed() takes raw stdout chunks as they arrive and keeps only a bounded
+    tail while scanning, so the full output never has to be held or split.
+    """
+
+    def __init__(self, max_payload_bytes: int = MAX_RESULT_BYTES):
+        self.max_payload_bytes = max_payload_bytes
+        self.payload = None  # raw verified payload bytes once complete
+        self.errors = []
+        self._buffer = bytearray()
+        self._length = None
+        self._checksum = None
+
+    @property
+    def complete(self) -> bool:
+        return self.payload is not None
+
+    def feed(self, data: bytes) -> bool:
+        """Consumes a chunk of stdout. Returns True once a valid frame has been read."""
+        if self.complete:
+            return True
+        self._buffer += data
+
+        while not self.complete:
+            if self._length is None:
+                if not self._read_header():
+                    break
+            elif not self._read_payload():
+                break
+        return self.complete
+
+    def _read_header(self) -> bool:
+        start = self._buffer.find(FRAME_BEGIN)
+        if start == -1:
+            # Keep just enough to match a marker split across chunks
+            del self._buffer[:max(0, len(self._buffer) - len(FRAME_BEGIN) + 1)]
+            return False
+
+        header_end = self._buffer.find(FRAME_HEADER_END, start)
+        if header_end == -1:
+            del self._buffer[:start]
+            return False
+
+        header = bytes(self._buffer[start + len(FRAME_BEGIN):header_end]).decode(errors="replace").split()
+        del self._buffer[:header_end + len(FRAME_HEADER_END)]
+        try:
+            version, length, checksum = header
+            length = int(length)
+        except ValueError:
+            self.errors.append(f"Malformed result frame header: {header}")
+            return True
+        if version != FRAME_VERSION or length > self.max_payload_bytes:
+            self.errors.append(f"Rejected result frame (version={version}, length={length})")
+            return True
+
+        self._length, self._checksum = length, checksum
+        return True
+
+    def _read_payload(self) -> bool:
+        if len(self._buffer) < self._length + len(FRAME_END):
+            return False
+
+        payload = bytes(self._buffer[:self._length])
+        trailer = bytes(self._buffer[self._length:self._length + len(FRAME_END)])
+        del self._buffer[:self._length + len(FRAME_END)]
+        length, checksum = self._length, self._checksum
+        self._length = self._checksum = None
+
+        if trailer != FRAME_END:
+            self.errors.append(f"Result frame of {length} bytes is missing its end marker")
+        elif hashlib.sha256(payload).hexdigest() != checksum:
+            self.errors.append("Result frame checksum mismatch")
+        else:
+            self.payload = payload
+        return True
+
+
+def validate_benchmark_results(results) -> dict:
+    """
+    Checks parsed benchmark results before they are stored on the session.
+    Raises ValueError describing the first problem found.
+    """
+    if not isinstance(results, dict):
+        raise ValueError(f"Benchmark results must be a JSON object, got {type(results).__name__}")
+    if not results:
+        raise ValueError("Benchmark results are empty")
+
+    def check(value, path):
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return
+        if isinstance(value, (int, float)):
+            if not math.isfinite(value):
+                raise ValueError(f"Benchmark result {path} is not a finite number: {value}")
+            return
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                check(item, f"{path}[{index}]")
+            return
+        if isinstance(value, dict):
+            for key, item in value.items():
+                check(item, f"{path}.{key}" if path else key)
+            return
+        raise ValueError(f"Benchmark result {path} has unsupported type {type(value).__name__}")
+
+    check(results, "")
+    return results
+
+
+def parse_benchmark_payload(payload: bytes) -> dict:
+    """Decodes and validates a result payload (frame contents or parse_output.json)."""
+    return validate_benchmark_results(json.loads(payload.decode()))
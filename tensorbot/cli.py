@@ -0,0 +1,191 @@
+"""
+Command line entry point: python -m tensorbot <command>
+
+Only config and the standard library are imported up front. Each command imports
+what it needs (requests, pymongo, paramiko, the pipeline) when it runs, and only
+`run`, `watch`, `reap --terminate` and `report --db` connect to MongoDB, so `offers`, `report` and
+`replay` start quickly enough for cron jobs and health checks.
+"""
+import argparse
+import json
+import sys
+import time
+
+COLLECTION_NAME = "tensordock"
+DEFAULT_GPU_FILTER = ""
+
+
+def cmd_offers(args) -> int:
+    from tensorbot.clients.marketplace_client import MarketplaceClient
+
+    offers = MarketplaceClient().list_available_gpus(gpu_name_filter=args.gpu or None)
+    if args.stale_only:
+        from tensorbot.core.node_cache import NodeResultCache
+        offers = NodeResultCache().filter_stale(offers)
+    if args.json:
+        print(json.dumps(offers, indent=2))
+        return 0
+    for offer in sorted(offers, key=lambda offer: (offer["gpu_model"], offer.get("price_per_hour") or 0)):
+        print(f"{offer['node_id']:<40} {offer['gpu_model']:<28} x{offer.get('available_count') or '?':<3} "
+              f"${offer.get('price_per_hour') or 0:>6.2f}/h  {offer.get('region') or ''}")
+    print(f"{len(offers)} offer(s)")
+    return 0
+
+
+def cmd_run(args) -> int:
+    from tensorbot import main as bot
+    from tensorbot.core.profiler import PROFILER
+
+    if args.profile:
+        PROFILER.enable()
+    bot.main(iterations=args.iterations)
+    return 0
+
+
+def cmd_history(args) -> int:
+    from tensorbot.core.market_history import MarketHistory
+
+    history = MarketHistory()
+    if args.at is not None:
+        polled_at, offers = history.state_at(args.at)
+        offers = [offer for offer in offers.values() if not args.model or args.model.lower() in offer["gpu_model"].lower()]
+        print(json.dumps({"polled_at": polled_at, "offers": offers}, indent=2))
+        return 0
+    end = args.until or time.time()
+    start = args.since if args.since is not None else end - args.hours * 3600
+    for event in history.model_history(args.model or "", start, end):
+        print(json.dumps(event))
+    return 0
+
+
+def cmd_watch(args) -> int:
+    from tensorbot import main as bot
+
+    bot.main(watch=True, watch_seconds=args.duration)
+    return 0
+
+
+def cmd_reap(args) -> int:
+    from tensorbot.clients.marketplace_client import MarketplaceClient
+    from tensorbot.core.instance_ledger import InstanceLedger
+    from tensorbot.core.instance_reaper import InstanceReaper
+    from tensorbot.core.session_registry import SessionRegistry
+
+    # Only instances in this machine's ledger whose renting bot process has exited; nothing else is a candidate
+    reaper = InstanceReaper(MarketplaceClient(), SessionRegistry(InstanceLedger()), grace_seconds=0)
+    orphans = reaper.find_orphans(reaper.marketplace_client.list_user_instances(), time.time())
+    for orphan in orphans:
+        print(f"{orphan['instance_id']:<40} {orphan['instance_name'] or '':<40} {orphan['status']}")
+    if not args.terminate or not orphans:
+        print(f"{len(orphans)} orphaned instance(s){'; pass --terminate to terminate them' if orphans else ''}")
+        return 0
+
+    from tensorbot.clients.db_interface import DatabaseInterface
+    from tensorbot.config.config import MONGODB_URI
+    reaper.db_interface = DatabaseInterface(db_uri=MONGODB_URI, collection_name=COLLECTION_NAME)
+    records = reaper.reap_once()
+    failed = [record for record in records if not record["reaped"]]
+    print(f"Terminated {len(records) - len(failed)}/{len(records)} instance(s)")
+    return 1 if failed else 0
+
+
+def cmd_report(args) -> int:
+    from tensorbot.core.node_cache import NodeResultCache
+
+    cache = NodeResultCache()
+    models = {}
+    for key in cache.fresh_entries():
+        gpu_model = key.split("|", 1)[1]
+        models[gpu_model] = models.get(gpu_model, 0) + 1
+    report = {"node_cache": {"path": cache.path, "fresh_nodes": sum(models.values()), "by_gpu_model": models}}
+
+    if args.db:
+        from datetime import datetime, timezone
+        from tensorbot.clients.db_interface import DatabaseInterface
+        from tensorbot.config.config import MONGODB_URI
+
+        db_interface = DatabaseInterface(db_uri=MONGODB_URI, collection_name=COLLECTION_NAME)
+        since = datetime.fromtimestamp(time.time() - args.days * 86400, timezone.utc).isoformat()
+        report["boot_time_by_profile"] = db_interface.get_boot_time_by_profile()
+        report["benchmarked_nodes"] = len(db_interface.get_recent_benchmarked_nodes(since))
+        report["days"] = args.days
+        db_interface.close()
+
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+def cmd_replay(args) -> int:
+    """Feeds a stored raw benchmark log back through the result frame parser, as if it were arriving over SSH."""
+    import gzip
+    from tensorbot.benchmark.result_protocol import ResultFrameParser, parse_benchmark_payload
+
+    frame_parser = ResultFrameParser()
+    lines = 0
+    with gzip.open(args.log, "rb") as f:
+        for chunk in iter(lambda: f.read(32768), b""):
+            lines += chunk.count(b"\n")
+            if args.print:
+                sys.stdout.write(chunk.decode(errors="replace"))
+            frame_parser.feed(chunk)
+
+    if not frame_parser.complete:
+        for error in frame_parser.errors:
+            print(f"[WARN] {error}", file=sys.stderr)
+        print(f"[ERROR] No complete result frame in {args.log} ({lines} lines)", file=sys.stderr)
+        return 1
+    try:
+        results = parse_benchmark_payload(frame_parser.payload)
+    except ValueError as e:
+        print(f"[ERROR] Result frame failed validation: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m tensorbot", description="Rents, benchmarks and releases GPU instances.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    offers = commands.add_parser("offers", help="list available offers (no database connection)")
+    offers.add_argument("--gpu", default=DEFAULT_GPU_FILTER, help="GPU model substring; empty for all models")
+    offers.add_argument("--stale-only", action="store_true", help="hide nodes with fresh results in the local node cache")
+    offers.add_argument("--json", action="store_true", help="print the offers as JSON")
+    offers.set_defaults(handler=cmd_offers)
+
+    run = commands.add_parser("run", help="run the rent/benchmark loop")
+    run.add_argument("--iterations", type=int, default=100)
+    run.add_argument("--profile", action="store_true", help="profile each pipeline stage (same as PROFILING_ENABLED=1)")
+    run.set_defaults(handler=cmd_run)
+
+    watch = commands.add_parser("watch", help="rent WATCH_GPU_MODELS offers within seconds of them appearing")
+    watch.add_argument("--duration", type=float, help="stop after this many seconds (default: run until interrupted)")
+    watch.set_defaults(handler=cmd_watch)
+
+    history = commands.add_parser("history", help="query the recorded offer price/availability history")
+    history.add_argument("--model", help="GPU model substring (default: all models)")
+    history.add_argument("--at", type=float, help="print the market as of this epoch time instead of events")
+    history.add_argument("--since", type=float, help="events from this epoch time (default: --hours ago)")
+    history.add_argument("--until", type=float, help="events up to this epoch time (default: now)")
+    history.add_argument("--hours", type=float, default=24)
+    history.set_defaults(handler=cmd_history)
+
+    reap = commands.add_parser("reap", help="list instances this bot rented whose bot process has exited")
+    reap.add_argument("--terminate", action="store_true", help="terminate the listed instances")
+    reap.set_defaults(handler=cmd_reap)
+
+    report = commands.add_parser("report", help="summarise the local node cache, and MongoDB stats with --db")
+    report.add_argument("--db", action="store_true", help="include boot times and benchmarked nodes from MongoDB")
+    report.add_argument("--days", type=float, default=7, help="window for --db stats")
+    report.set_defaults(handler=cmd_report)
+
+    replay = commands.add_parser("replay", help="re-parse a stored raw benchmark log (.log.gz from the artifact store)")
+    replay.add_argument("log", help="path to the stored log")
+    replay.add_argument("--print", action="store_true", help="also print the log")
+    replay.set_defaults(handler=cmd_replay)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
@@ -1,11 +1,37 @@
 from pymongo import MongoClient
+from pymongo import monitoring
 from pymongo.errors import ConnectionFailure, OperationFailure
 from tensorbot.config.config import MONGODB_URI
+from tensorbot.core.metrics import DB_SECONDS, SESSIONS
+
+
+class _CommandTimer(monitoring.CommandListener):
+    """Feeds the latency of every MongoDB command (as measured by the driver) into DB_SECONDS."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        DB_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, result="ok")
+
+    def failed(self, event):
+        DB_SECONDS.observe(event.duration_micros / 1e6, command=event.command_name, result="failed")
+
+
+def _session_outcome(session_data: dict) -> str:
+    if session_data.get("termination_status"):
+        return session_data["termination_status"]
+    if session_data.get("boot_success") is False:
+        return "boot_failed"
+    if session_data.get("ssh_success") is False:
+        return "ssh_unreachable"
+    return "completed"
+
 
 class DatabaseInterface:
     def __init__(self, db_uri: str, collection_name: str):
         try: 
-            self.client = MongoClient(db_uri)
+            self.client = MongoClient(db_uri, event_listeners=[_CommandTimer()])
             self.client.server_info()  # Force connection on init
             print("[INFO] Connected successfully to MongoDB.")
         except ConnectionFailure as e:
@@ -13,15 +39,86 @@ class DatabaseInterface:
 
         self.db = self.client["QCP"]
         self.collection = self.db[collection_name]  
+        self.reaped_collection = self.db[f"{collection_name}-reaped"]
+        self.jobs_collection = self.db[f"{collection_name}-jobs"]
 
     def save_rental_session(self, session_data: dict):
         """Save a rental session document to the database."""
         try:
             self.collection.insert_one(session_data)
+            SESSIONS.inc(outcome=_session_outcome(session_data))
             print(f"[INFO] Rental session {session_data.get('session_id')} saved to MongoDB.")
         except OperationFailure as e:
             print(f"[ERROR] Failed to save rental session: {e}")
 
+    def get_benchmark_history(self, client_id: str, gpu_model: str, limit: int = 10) -> list:
+        """Returns the most recent sessions with benchmark results for a node/model, newest first."""
+        try:
+            cursor = self.collection.find(
+                {
+                    "client_id": client_id,
+                    "gpu_model": gpu_model,
+                    "benchmarks.gpu_benchmarks": {"$exists": True},
+                },
+                {"start_time": 1, "benchmark_tier": 1, "benchmarks.gpu_benchmarks": 1},
+            ).sort("start_time", -1).limit(limit)
+            return list(cursor)
+        except OperationFailure as e:
+            print(f"[ERROR] Failed to load benchmark history: {e}")
+            return []
+
+    def get_boot_time_by_profile(self) -> list:
+        """
+        Boot time per rental profile over successful boots:
+        [{_id: profile, avg_boot_time_ms, min_boot_time_ms, avg_time_to_gpu_ready_ms, count}]
+        """
+        try:
+            return list(self.collection.aggregate([
+                {"$match": {"boot_success": True, "rental_profile": {"$ne": None}}},
+                {"$group": {
+                    "_id": "$rental_profile",
+                    "avg_boot_time_ms": {"$avg": "$boot_time_ms"},
+                    "min_boot_time_ms": {"$min": "$boot_time_ms"},
+                    "avg_time_to_gpu_ready_ms": {"$avg": "$time_to_gpu_ready_ms"},
+                    "count": {"$sum": 1},
+                }},
+            ]))
+        except OperationFailure as e:
+            print(f"[ERROR] Failed to load boot times by profile: {e}")
+            return []
+
+    def get_recent_benchmarked_nodes(self, since: str) -> list:
+        """Latest benchmarked session per node/model started at or after `since` (ISO timestamp)."""
+        try:
+            return list(self.collection.aggregate([
+                {"$match": {"benchmarks.gpu_benchmarks": {"$exists": True}, "start_time": {"$gte": since}}},
+                {"$sort": {"start_time": -1}},
+                {"$group": {
+                    "_id": {"client_id": "$client_id", "gpu_model": "$gpu_model"},
+                    "start_time": {"$first": "$start_time"},
+                    "gpu_benchmarks": {"$first": "$benchmarks.gpu_benchmarks"},
+                }},
+            ]))
+        except OperationFailure as e:
+            print(f"[ERROR] Failed to load recently benchmarked nodes: {e}")
+            return []
+
+    def save_benchmark_job(self, job_data: dict):
+        """Save a benchmark job run on a rental; linked to its session by session_id."""
+        try:
+            self.jobs_collection.insert_one(dict(job_data))
+            print(f"[INFO] Benchmark job {job_data.get('job_id')} saved to MongoDB.")
+        except OperationFailure as e:
+            print(f"[ERROR] Failed to save benchmark job: {e}")
+
+    def save_reaped_instance(self, record: dict):
+        """Save a record of an orphaned instance the reaper tried to terminate."""
+        try:
+            self.reaped_collection.insert_one(dict(record))
+            print(f"[INFO] Reaped instance {record.get('instance_id')} recorded in MongoDB.")
+        except OperationFailure as e:
+            print(f"[ERROR] Failed to save reaped instance: {e}")
+
     def close(self):
         self.client.close()
         print("[INFO] MongoDB connection closed.")
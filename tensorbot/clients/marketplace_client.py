@@ -1,19 +1,53 @@
 import requests
 import time
-from tensorbot.config.config import TENSORDOCK_API_KEY
+from tensorbot.config.config import TENSORDOCK_API_KEY, TENSORDOCK_API_URL
+from tensorbot.config.config import API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST, API_MAX_RETRIES
+from tensorbot.clients.rate_limiter import get_rate_limiter, retry_after_seconds, RETRYABLE_STATUS_CODES
+from tensorbot.clients.rental_profiles import RENTAL_PROFILES, DEFAULT_RENTAL_PROFILE
+from tensorbot.core.metrics import API_REQUESTS, API_SECONDS
+
+# Per-endpoint budgets; background endpoints can't drain the shared bucket below its reserve
+ENDPOINT_BUDGETS = {
+    "offers": {"rate_per_second": 0.5, "burst": 2, "background": True},
+    "instances": {"rate_per_second": 1.0, "burst": 3, "background": True},
+    "create": {"rate_per_second": 1.0, "burst": 2},
+    "terminate": {"rate_per_second": 1.0, "burst": 4},
+}
 
 class MarketplaceClient:
     def __init__(self):
-        self.base_url = "https://api.tensordock.com/api/v2"
+        self.base_url = TENSORDOCK_API_URL
         self.headers = {
             "Authorization": f"Bearer {TENSORDOCK_API_KEY}",
             "Content-Type": "application/json"
         }
+        self.rate_limiter = get_rate_limiter(
+            "TensorDock", API_RATE_LIMIT_PER_SECOND, API_RATE_LIMIT_BURST, ENDPOINT_BUDGETS
+        )
+
+    def _request(self, endpoint: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends a rate-limited request, backing off on 429/503 and honouring Retry-After."""
+        with API_SECONDS.time(endpoint=endpoint):
+            for attempt in range(API_MAX_RETRIES + 1):
+                self.rate_limiter.acquire(endpoint)
+                try:
+                    response = requests.request(method, url, headers=self.headers, **kwargs)
+                except requests.RequestException:
+                    API_REQUESTS.inc(endpoint=endpoint, status="error")
+                    raise
+                API_REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == API_MAX_RETRIES:
+                    break
+                delay = retry_after_seconds(response, attempt)
+                print(f"[WARN] {endpoint} returned {response.status_code}, backing off {delay:.1f}s (attempt {attempt+1})")
+                self.rate_limiter.back_off(delay)
+
+        response.raise_for_status()
+        return response
 
     def list_available_gpus(self, filters: dict = None, gpu_name_filter: str = None) -> list:
         """Lists available GPUs from TensorDock hostnodes"""
-        response = requests.get(f"{self.base_url}/hostnodes", headers=self.headers)
-        response.raise_for_status()
+        response = self._request("offers", "GET", f"{self.base_url}/hostnodes")
         
         hostnodes = response.json().get("data", {}).get("hostnodes", [])
         available_instances = []
@@ -29,28 +63,33 @@ class MarketplaceClient:
                             "region": f"{node['location']['city']}, {node['location']['country']}",
                             "available_count": gpu["availableCount"],
                             "max_vcpus_per_gpu": node["available_resources"].get("max_vcpus_per_gpu"),
-                            "max_ram_per_gpu": node["available_resources"].get("max_ram_per_gpu")
+                            "max_ram_per_gpu": node["available_resources"].get("max_ram_per_gpu"),
+                            "network_speed_gbps": node["location"].get("network_speed_gbps"),
+                            "network_speed_upload_gbps": node["location"].get("network_speed_upload_gbps")
                         })
         
         return available_instances
 
     def rent_gpu(self, hostnode_id: str, gpu_model: str, gpu_count: int = 1, 
                  vcpus: int = 8, ram_gb: int = 32, storage_gb: int = 100,
-                 ssh_key_id: str = None, ssh_key: str = None) -> dict:
+                 ssh_key_id: str = None, ssh_key: str = None, instance_name: str = None,
+                 profile: dict = None) -> dict:
         """
         Rent a GPU on TensorDock
         Either ssh_key_id or ssh_key must be provided
+        profile picks the image and cloud-init setup (see rental_profiles.py)
         """
         if not (ssh_key_id or ssh_key) or (ssh_key_id and ssh_key):
             raise ValueError("Either ssh_key_id or ssh_key must be provided (but not both)")
+        profile = profile or RENTAL_PROFILES[DEFAULT_RENTAL_PROFILE]
 
         payload = {
             "data": {
                 "type": "virtualmachine",
                 "attributes": {
-                    "name": f"tensorbot-instance-{int(time.time())}",
+                    "name": instance_name or f"tensorbot-instance-{int(time.time())}",
                     "type": "virtualmachine",
-                    "image": "ubuntu2404",
+                    "image": profile["image"],
                     "hostnode_id": hostnode_id,
                     "resources": {
                         "vcpu_count": vcpus,
@@ -67,14 +106,12 @@ class MarketplaceClient:
                             "internal_port": 22,
                             "external_port": 20000  # This will be automatically assigned if unavailable
                         }
-                    ],
-                    "cloud_init": {
-                        "package_update": True,
-                        "packages": ["nvidia-driver-535", "nvidia-utils-535"]
-                    }
+                    ]
                 }
             }
         }
+        if profile["cloud_init"]:
+            payload["data"]["attributes"]["cloud_init"] = profile["cloud_init"]
 
         # Add either ssh_key_id or ssh_key
         if ssh_key_id:
@@ -82,14 +119,12 @@ class MarketplaceClient:
         else:
             payload["data"]["attributes"]["ssh_key"] = ssh_key
 
-        response = requests.post(f"{self.base_url}/instances", json=payload, headers=self.headers)
-        response.raise_for_status()
+        response = self._request("create", "POST", f"{self.base_url}/instances", json=payload)
         return response.json()
 
     def list_user_instances(self) -> list:
         """List all instances for the current user"""
-        response = requests.get(f"{self.base_url}/instances", headers=self.headers)
-        response.raise_for_status()
+        response = self._request("instances", "GET", f"{self.base_url}/instances")
         return response.json().get("data", [])
 
     def poll_instance_until_ready(self, instance_id: str, max_attempts: int = 25, wait_seconds: int = 5) -> dict:
@@ -97,8 +132,7 @@ class MarketplaceClient:
         print("Starting polling...")
 
         while attempts < max_attempts:
-            response = requests.get(f"{self.base_url}/instances/{instance_id}", headers=self.headers)
-            response.raise_for_status()
+            response = self._request("instances", "GET", f"{self.base_url}/instances/{instance_id}")
             instance_data = response.json().get("data", {})
             
             status = instance_data.get("status", "").lower()
@@ -114,12 +148,10 @@ class MarketplaceClient:
 
     def terminate_instance(self, instance_id: str):
         """Terminate a specific instance"""
-        response = requests.delete(f"{self.base_url}/instances/{instance_id}", headers=self.headers)
-        response.raise_for_status()
+        response = self._request("terminate", "DELETE", f"{self.base_url}/instances/{instance_id}")
         return response.json()
 
     def get_hostnode_details(self, hostnode_id: str) -> dict:
         """Get detailed information about a specific hostnode"""
-        response = requests.get(f"{self.base_url}/hostnodes/{hostnode_id}", headers=self.headers)
-        response.raise_for_status()
+        response = self._request("offers", "GET", f"{self.base_url}/hostnodes/{hostnode_id}")
         return response.json().get("data", {})
\ No newline at end of file
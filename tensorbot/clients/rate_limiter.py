@@ -0,0 +1,121 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Status codes that mean "slow down and try again" rather than a hard failure
+RETRYABLE_STATUS_CODES = {429, 503}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_second up to capacity."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        """
+        Takes tokens if at least `reserve` would remain afterwards.
+        Returns 0 on success, otherwise the number of seconds to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            if self.tokens - tokens >= reserve:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens + reserve - self.tokens) / self.rate
+
+    def refund(self, tokens: float = 1.0):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+    def block_for(self, seconds: float):
+        """Drains the bucket and refuses tokens for `seconds` (server asked us to back off)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+            self.updated = self.blocked_until
+
+
+class RateLimiter:
+    """
+    Per-marketplace limiter shared by every worker in the process.
+
+    Each call takes a token from its endpoint's bucket and from the shared
+    marketplace bucket. Background endpoints (listing, polling) must leave
+    `reserve` tokens in the shared bucket, so they can never starve rent or
+    terminate calls.
+    """
+
+    def __init__(self, marketplace: str, rate_per_second: float, burst: float,
+                 endpoint_budgets: dict, reserve: float = 2.0):
+        self.marketplace = marketplace
+        self.shared = TokenBucket(rate_per_second, burst)
+        self.reserve = min(reserve, burst - 1)
+        self.endpoints = {}
+        self.background = set()
+        for endpoint, budget in endpoint_budgets.items():
+            self.endpoints[endpoint] = TokenBucket(budget["rate_per_second"], budget["burst"])
+            if budget.get("background"):
+                self.background.add(endpoint)
+
+    def acquire(self, endpoint: str) -> float:
+        """Blocks until a call to `endpoint` is allowed. Returns the seconds spent waiting."""
+        bucket = self.endpoints.get(endpoint)
+        reserve = self.reserve if endpoint in self.background else 0.0
+        waited = 0.0
+        while True:
+            wait = bucket.try_acquire() if bucket else 0.0
+            if wait == 0.0:
+                wait = self.shared.try_acquire(reserve=reserve)
+                if wait == 0.0:
+                    return waited
+                if bucket:
+                    bucket.refund()
+            time.sleep(wait)
+            waited += wait
+
+    def back_off(self, seconds: float):
+        """Pauses every endpoint of this marketplace, not just the caller."""
+        self.shared.block_for(seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(marketplace: str, rate_per_second: float, burst: float,
+                     endpoint_budgets: dict) -> RateLimiter:
+    """Returns the process-wide limiter for a marketplace, creating it on first use."""
+    with _limiters_lock:
+        if marketplace not in _limiters:
+            _limiters[marketplace] = RateLimiter(marketplace, rate_per_second, burst, endpoint_budgets)
+        return _limiters[marketplace]
+
+
+def retry_after_seconds(response, attempt: int, max_backoff: float = 60.0) -> float:
+    """Seconds to wait after a 429/503: the Retry-After header if present, else jittered exponential backoff."""
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return min(max_backoff, max(0.0, float(header)))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(header)
+                return min(max_backoff, max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+            except (TypeError, ValueError):
+                pass
+    return min(max_backoff, (2 ** attempt) + random.uniform(0, 1))
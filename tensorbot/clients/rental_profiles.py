@@ -0,0 +1,60 @@
+from tensorbot.config.config import RENTAL_PROFILE, RENTAL_PROFILE_MIN_SAMPLES, RENTAL_PREBAKED_IMAGE
+
+# Named images / cloud-init setups to rent with. "benchmark_env" is passed to
+# benchmarks.sh, e.g. to skip installing dependencies an image already ships with.
+RENTAL_PROFILES = {
+    "driver-install": {
+        "description": "Stock Ubuntu; apt update and install the 535 driver on every boot",
+        "image": "ubuntu2404",
+        "cloud_init": {
+            "package_update": True,
+            "packages": ["nvidia-driver-535", "nvidia-utils-535"]
+        },
+        "benchmark_env": {},
+    },
+    "driver-install-no-update": {
+        "description": "Stock Ubuntu; install the 535 driver without refreshing the package index first",
+        "image": "ubuntu2404",
+        "cloud_init": {
+            "package_update": False,
+            "packages": ["nvidia-driver-535", "nvidia-utils-535"]
+        },
+        "benchmark_env": {},
+    },
+}
+
+# Our own image with the driver and the suite's dependencies installed; needs no cloud-init
+if RENTAL_PREBAKED_IMAGE:
+    RENTAL_PROFILES["prebaked"] = {
+        "description": "Pre-baked image with the driver and the suite's dependencies already installed",
+        "image": RENTAL_PREBAKED_IMAGE,
+        "cloud_init": None,
+        "benchmark_env": {"BENCHMARK_SKIP_DEPS": "1"},
+    }
+
+DEFAULT_RENTAL_PROFILE = "driver-install"
+
+
+def select_rental_profile(requested: str = RENTAL_PROFILE, boot_stats: list = None) -> tuple[str, dict]:
+    """
+    Resolves RENTAL_PROFILE to (name, profile). "fastest" picks the profile with the
+    lowest average boot time among those with enough sessions in boot_stats
+    (docs of {_id: profile, avg_boot_time_ms, count}); unknown names fall back to the default.
+    """
+    requested = requested or DEFAULT_RENTAL_PROFILE
+    if requested == "fastest":
+        candidates = [
+            stat for stat in boot_stats or []
+            if stat["_id"] in RENTAL_PROFILES and stat["count"] >= RENTAL_PROFILE_MIN_SAMPLES
+        ]
+        # Profiles without enough samples yet get tried before settling on one
+        untried = [name for name in RENTAL_PROFILES if name not in {stat["_id"] for stat in candidates}]
+        if untried:
+            requested = untried[0]
+        elif candidates:
+            requested = min(candidates, key=lambda stat: stat["avg_boot_time_ms"])["_id"]
+
+    if requested not in RENTAL_PROFILES:
+        print(f"[WARN] Unknown rental profile '{requested}', using '{DEFAULT_RENTAL_PROFILE}'")
+        requested = DEFAULT_RENTAL_PROFILE
+    return requested, RENTAL_PROFILES[requested]
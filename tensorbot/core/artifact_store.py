@@ -0,0 +1,56 @@
+import hashlib
+import os
+import tempfile
+from tensorbot.config.config import ARTIFACT_STORE_DIR
+
+
+class ArtifactStore:
+    """
+    Local content-addressed store for files pulled off instances before they are
+    terminated. Blobs live at <root>/<sha256[:2]>/<sha256><suffix>, so identical
+    artifacts from different sessions are stored once and sessions link to them
+    by digest.
+    """
+
+    def __init__(self, root: str = ARTIFACT_STORE_DIR):
+        self.root = root
+
+    def path_for(self, digest: str, suffix: str = "") -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}")
+
+    def writer(self, suffix: str = "") -> "BlobWriter":
+        """A writer that blobs can be streamed into chunk by chunk; commit() files it under its digest."""
+        os.makedirs(self.root, exist_ok=True)
+        return BlobWriter(self, suffix)
+
+
+class BlobWriter:
+    def __init__(self, store: ArtifactStore, suffix: str):
+        self.store = store
+        self.suffix = suffix
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, self._temp_path = tempfile.mkstemp(dir=store.root, prefix=".incoming-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> dict:
+        """Moves the blob into place (or drops it if the store already has it). Returns {"sha256", "path", "bytes"}."""
+        self._file.close()
+        digest = self._hash.hexdigest()
+        path = self.store.path_for(digest, self.suffix)
+        if os.path.exists(path):
+            os.remove(self._temp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._temp_path, path)
+        return {"sha256": digest, "path": path, "bytes": self.size}
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
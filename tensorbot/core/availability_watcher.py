@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def offer_key(offer: dict) -> str:
+    return f"{offer['node_id']}|{offer['gpu_model']}"
+
+
+def diff_offers(previous: dict, current: dict) -> tuple[list, list, list]:
+    """
+    Compares two {offer_key: offer} snapshots. Returns (appeared, disappeared, changed) as
+    lists of keys; changed covers offers present in both whose price or free GPU count moved.
+    """
+    appeared = [key for key in current if key not in previous]
+    disappeared = [key for key in previous if key not in current]
+    changed = [
+        key for key, offer in current.items()
+        if key in previous and (
+            offer.get("price_per_hour") != previous[key].get("price_per_hour")
+            or offer.get("available_count") != previous[key].get("available_count")
+        )
+    ]
+    return appeared, disappeared, changed
+
+
+class AvailabilityWatcher:
+    """
+    Polls list_available_gpus on a tight interval and fires on_match(offer, detected_at)
+    on a worker thread as soon as an offer matching the targets shows up (or, for an
+    offer already listed, when its free GPU count rises from nothing). Offers listed on
+    the first poll count as new, so a watcher started while capacity is up rents it
+    straight away.
+
+    Polls go through the marketplace client's shared rate limiter; failed polls back
+    off exponentially up to max_backoff_seconds. Only max_rentals callbacks run at
+    once; matches seen while every slot is busy are left for a later appearance.
+    """
+
+    def __init__(self, list_offers, on_match, gpu_models: list, regions: list = None,
+                 accept=None, poll_seconds: float = 2.0, max_rentals: int = 1, max_backoff_seconds: float = 60.0):
+        self.list_offers = list_offers
+        self.on_match = on_match
+        self.accept = accept  # extra per-offer check (node cache, circuit breaker) before a slot is taken
+        self.gpu_models = [model.lower() for model in gpu_models]
+        self.regions = [region.lower() for region in regions or []]
+        self.poll_seconds = poll_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.snapshot = {}
+        self.polls = 0
+        self.fired = 0
+        self._slots = threading.Semaphore(max_rentals)
+        self._executor = ThreadPoolExecutor(max_workers=max_rentals, thread_name_prefix="watch-rental")
+        self._stop = threading.Event()
+
+    def matches(self, offer: dict) -> bool:
+        model = (offer.get("gpu_model") or "").lower()
+        region = (offer.get("region") or "").lower()
+        return (not self.gpu_models or any(target in model for target in self.gpu_models)) and \
+            (not self.regions or any(target in region for target in self.regions))
+
+    def poll_once(self) -> list:
+        """One poll: diffs against the previous snapshot and fires for new matches. Returns the offers fired for."""
+        offers = self.list_offers()
+        detected_at = time.time()
+        current = {offer_key(offer): offer for offer in offers}
+        appeared, _, changed = diff_offers(self.snapshot, current)
+        refilled = [key for key in changed if not self.snapshot[key].get("available_count") and current[key].get("available_count")]
+        self.snapshot = current
+        self.polls += 1
+
+        fired, busy = [], 0
+        for key in appeared + refilled:
+            offer = current[key]
+            if not self.matches(offer) or (self.accept and not self.accept(offer)):
+                continue
+            if not self._slots.acquire(blocking=False):
+                busy += 1
+                continue
+            print(f"[INFO] Watcher: {key} appeared ({offer.get('available_count')} free, ${offer.get('price_per_hour')}/h), renting")
+            self._executor.submit(self._fire, offer, detected_at)
+            fired.append(offer)
+        if busy:
+            print(f"[WARN] Watcher: {busy} matching offer(s) appeared while every rental slot was busy")
+        self.fired += len(fired)
+        return fired
+
+    def _fire(self, offer: dict, detected_at: float):
+        try:
+            self.on_match(offer, detected_at)
+        except Exception as e:
+            print(f"[ERROR] Watcher rental for {offer_key(offer)} failed: {e}")
+        finally:
+            self._slots.release()
+
+    def run(self, duration_seconds: float = None):
+        """Polls until stop() is called or duration_seconds have passed, then waits for running rentals."""
+        deadline = time.time() + duration_seconds if duration_seconds else None
+        failures = 0
+        print(f"[INFO] Watching for {self.gpu_models or 'any model'} in {self.regions or 'any region'} "
+              f"every {self.poll_seconds:.1f}s")
+        while not self._stop.is_set() and (deadline is None or time.time() < deadline):
+            started = time.time()
+            try:
+                self.poll_once()
+                failures = 0
+                delay = self.poll_seconds - (time.time() - started)
+            except Exception as e:
+                failures += 1
+                delay = min(self.max_backoff_seconds, self.poll_seconds * 2 ** failures)
+                print(f"[WARN] Watcher poll failed ({e}); retrying in {delay:.0f}s")
+            self._stop.wait(max(0.0, delay))
+        self._executor.shutdown(wait=True)
+
+    def stop(self):
+        self._stop.set()
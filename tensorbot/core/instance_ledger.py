@@ -0,0 +1,94 @@
+import json
+import os
+import socket
+import time
+from tensorbot.config.config import INSTANCE_LEDGER_DIR
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # exists, owned by another user
+    return True
+
+
+class InstanceLedger:
+    """
+    On-disk record of every instance this bot rented and has not yet seen terminated.
+
+    One small JSON file per rental session, holding the instance keys (name, id)
+    and the pid/host of the process that rented it. Files are written and removed
+    whole, so several bot processes on one machine can share the directory without
+    locking. The reaper only ever terminates instances listed here: anything else
+    on the account (another bot, an operator's own rental) is not ours to touch.
+    """
+
+    def __init__(self, directory: str = INSTANCE_LEDGER_DIR):
+        self.directory = directory
+        self.host = socket.gethostname()
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json")
+
+    def record(self, session_id: str, *instance_keys: str):
+        """Adds instance keys to the session's entry, creating it on first use."""
+        entry = self._read(self._path(session_id)) or {
+            "session_id": session_id, "keys": [], "pid": os.getpid(), "host": self.host, "created_at": time.time(),
+        }
+        entry["keys"] = sorted(set(entry["keys"]) | {key for key in instance_keys if key})
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(session_id)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(session_id))
+        except OSError as e:
+            print(f"[WARN] Could not record instance {instance_keys} in the ledger: {e}")
+
+    @staticmethod
+    def _read(path: str):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable instance ledger entry {path}: {e}")
+            return None
+
+    def entries(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = (self._read(os.path.join(self.directory, name)) for name in os.listdir(self.directory)
+                   if name.endswith(".json"))
+        return [entry for entry in entries if entry]
+
+    def owners(self) -> dict:
+        """{instance key: ledger entry} for every instance this bot rented and hasn't seen terminated."""
+        return {key: entry for entry in self.entries() for key in entry["keys"]}
+
+    def owner(self, *instance_keys: str):
+        """The ledger entry of the session that rented any of these keys, or None if this bot didn't."""
+        owners = self.owners()
+        return next((owners[key] for key in instance_keys if key in owners), None)
+
+    def owned_by_other_live_process(self, entry: dict) -> bool:
+        """True while the renting process (another bot run on this host, or any host we can't check) may still be using it."""
+        if entry.get("host") != self.host:
+            return True
+        return entry["pid"] != os.getpid() and _process_alive(entry["pid"])
+
+    def forget(self, *instance_keys: str):
+        """Drops the entry of the session that rented these keys, once the instance is known to be terminated."""
+        entry = self.owner(*instance_keys)
+        if entry is None:
+            return
+        try:
+            os.remove(self._path(entry["session_id"]))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[WARN] Could not remove instance ledger entry for {instance_keys}: {e}")
@@ -0,0 +1,148 @@
+import bisect
+import json
+import os
+import threading
+import time
+from tensorbot.core.availability_watcher import offer_key, diff_offers
+from tensorbot.config.config import MARKET_HISTORY_DIR, MARKET_HISTORY_KEYFRAME_EVERY
+
+# Offer fields kept in the history; the rest of the marketplace response is dropped
+HISTORY_FIELDS = ("node_id", "gpu_model", "price_per_hour", "available_count", "region", "cluster_name")
+# Fields whose changes are recorded as deltas (see diff_offers)
+CHANGE_FIELDS = ("price_per_hour", "available_count")
+
+
+def _compact(offer: dict) -> dict:
+    return {field: offer[field] for field in HISTORY_FIELDS if offer.get(field) is not None}
+
+
+def _apply(state: dict, entry: dict) -> dict:
+    if "snapshot" in entry:
+        return dict(entry["snapshot"])
+    state = dict(state)
+    state.update(entry.get("add", {}))
+    for key in entry.get("remove", []):
+        state.pop(key, None)
+    for key, fields in entry.get("change", {}).items():
+        state[key] = dict(state.get(key, {}), **fields)
+    return state
+
+
+class MarketHistory:
+    """
+    Price and availability history of every list_available_gpus poll, delta encoded.
+
+    The history is split into segments, one JSON-lines file each, named after the
+    time (ms) of its first entry. A segment starts with a full snapshot of the
+    compacted offers, and every later poll that changed anything appends only the
+    offers that appeared or disappeared and the prices / free counts that moved.
+    A new segment (and snapshot) starts every keyframe_every entries and whenever
+    the process restarts, so rebuilding the market at a timestamp means replaying
+    at most one segment.
+    """
+
+    def __init__(self, directory: str = MARKET_HISTORY_DIR, keyframe_every: int = MARKET_HISTORY_KEYFRAME_EVERY):
+        self.directory = directory
+        self.keyframe_every = keyframe_every
+        self._state = None  # offers as of the last recorded poll
+        self._segment_path = None
+        self._entries_in_segment = 0
+        self._lock = threading.Lock()
+
+    def record(self, offers: list, polled_at: float = None):
+        """Appends one poll's offers (the full, unfiltered list, so disappearances are real)."""
+        polled_at = round(polled_at or time.time(), 3)
+        current = {offer_key(offer): _compact(offer) for offer in offers}
+        with self._lock:
+            if self._state is None or self._entries_in_segment >= self.keyframe_every:
+                os.makedirs(self.directory, exist_ok=True)
+                self._segment_path = os.path.join(self.directory, f"{int(polled_at * 1000):015d}.jsonl")
+                self._entries_in_segment = 0
+                entry = {"t": polled_at, "snapshot": current}
+            else:
+                appeared, disappeared, changed = diff_offers(self._state, current)
+                if not (appeared or disappeared or changed):
+                    return
+                entry = {"t": polled_at}
+                if appeared:
+                    entry["add"] = {key: current[key] for key in appeared}
+                if disappeared:
+                    entry["remove"] = disappeared
+                if changed:
+                    entry["change"] = {
+                        key: {field: current[key].get(field) for field in CHANGE_FIELDS
+                              if current[key].get(field) != self._state[key].get(field)}
+                        for key in changed
+                    }
+            try:
+                with open(self._segment_path, "a") as f:
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            except OSError as e:
+                print(f"[WARN] Could not record market history: {e}")
+                return
+            self._state = current
+            self._entries_in_segment += 1
+
+    def _segments(self) -> list:
+        """[(start ms, path)] sorted by start."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            (int(name[:-len(".jsonl")]), os.path.join(self.directory, name))
+            for name in os.listdir(self.directory) if name.endswith(".jsonl") and name[:-len(".jsonl")].isdigit()
+        )
+
+    @staticmethod
+    def _entries(path: str):
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+
+    def state_at(self, at: float) -> tuple:
+        """Returns (time of the last poll at or before `at`, {offer_key: offer}), or (None, {}) before the history starts."""
+        segments = self._segments()
+        index = bisect.bisect_right([start for start, _ in segments], at * 1000) - 1
+        if index < 0:
+            return None, {}
+        state, polled_at = {}, None
+        for entry in self._entries(segments[index][1]):
+            if entry["t"] > at:
+                break
+            state, polled_at = _apply(state, entry), entry["t"]
+        return polled_at, state
+
+    def model_history(self, gpu_model: str, start: float, end: float = None) -> list:
+        """
+        Events for offers whose model contains gpu_model (case-insensitive) between start and end:
+        one "present" event per offer listed at start, then "appear" / "disappear" / "change".
+        """
+        end = end or time.time()
+        target = gpu_model.lower()
+
+        def for_model(offers: dict) -> dict:
+            return {key: offer for key, offer in offers.items() if target in (offer.get("gpu_model") or "").lower()}
+
+        _, state = self.state_at(start)
+        state = for_model(state)
+        events = [dict(offer, t=start, event="present") for offer in state.values()]
+        segments = self._segments()
+        first = max(0, bisect.bisect_right([segment_start for segment_start, _ in segments], start * 1000) - 1)
+        for segment_start, path in segments[first:]:
+            if segment_start > end * 1000:
+                break
+            for entry in self._entries(path):
+                if entry["t"] <= start:
+                    continue
+                if entry["t"] > end:
+                    break
+                # Applying deltas to just this model's slice is enough; filtering drops the other models' entries
+                current = for_model(_apply(state, entry))
+                appeared, disappeared, changed = diff_offers(state, current)
+                events.extend(dict(current[key], t=entry["t"], event="appear") for key in appeared)
+                events.extend(dict(state[key], t=entry["t"], event="disappear") for key in disappeared)
+                events.extend(dict(current[key], t=entry["t"], event="change") for key in changed)
+                state = current
+        return events
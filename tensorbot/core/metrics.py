@@ -0,0 +1,231 @@
+import bisect
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from API calls (~0.1s) up to full benchmark runs (~1h)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class _Metric:
+    """
+    Base for counters and histograms. Every thread updates its own shard (a plain
+    dict only that thread writes to), so the hot path takes no lock; shards are
+    summed when the endpoint is scraped. The registry lock is only taken the
+    first time a thread touches a metric, and when the thread exits and its shard
+    is folded into a base shard, so short-lived pool threads don't pile up shards.
+    """
+
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._shards = []
+        self._base = {}  # totals of shards whose threads have exited
+        self._local = threading.local()
+        self._lock = threading.RLock()  # _retire can run from a collector in whatever thread drops the last reference
+        REGISTRY.register(self)
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            # The owner lives only in this thread's local storage, so it is collected when the thread exits
+            self._local.owner = _ShardOwner()
+            weakref.finalize(self._local.owner, self._retire, shard)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _retire(self, shard: dict):
+        with self._lock:
+            self._shards = [live for live in self._shards if live is not shard]
+            for key, value in shard.items():
+                self._base[key] = self._merge(self._base.get(key), value)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _merged(self) -> dict:
+        with self._lock:
+            shards = list(self._shards)
+            merged = dict(self._base)  # merge() never mutates its inputs, so a shallow copy is enough
+        for shard in shards:
+            for key, value in list(shard.items()):
+                merged[key] = self._merge(merged.get(key), value)
+        return merged
+
+    def _label_text(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._merged().items()):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+
+class _ShardOwner:
+    """Weak-referenceable stand-in for a thread's shard (plain dicts can't be weakly referenced)."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    @staticmethod
+    def _merge(total, value):
+        return (total or 0) + value
+
+    def _render_value(self, key, value):
+        return [f"{self.name}{self._label_text(key)} {value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]  # per-bucket counts, sum, count
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def _merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def _render_value(self, key, value):
+        counts, total, count = value
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(float(bound))
+            labels = self._label_text(key, 'le="' + le + '"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {total}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class Gauge(Counter):
+    """
+    A value that goes up and down (per-thread deltas, summed on scrape), or one read
+    from a callback at scrape time (e.g. in-flight rentals) so nothing is updated on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self._functions = {}
+        super().__init__(name, help_text, labelnames)
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function, **labels):
+        self._functions[self._key(labels)] = function
+
+    def _merged(self) -> dict:
+        values = super()._merged()
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = function()
+            except Exception:
+                continue  # a failing callback shouldn't break the scrape
+        return values
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would drown the bot's own output
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves /metrics on a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    print(f"[INFO] Metrics endpoint on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+# Metrics shared by the whole bot
+API_REQUESTS = Counter("qci_api_requests_total", "Marketplace API responses by endpoint and status", ("endpoint", "status"))
+API_SECONDS = Histogram("qci_api_request_seconds", "Marketplace API call latency, including rate limiting and retries", ("endpoint",))
+SSH_CONNECT_SECONDS = Histogram("qci_ssh_connect_seconds", "SSH connection setup time", ("result",))
+SSH_COMMANDS = Counter("qci_ssh_commands_total", "Remote commands started over SSH exec channels", ("kind",))
+SSH_RECONNECTS = Counter("qci_ssh_reconnects_total", "Reconnects after a dropped SSH connection", ("result",))
+DB_SECONDS = Histogram("qci_db_operation_seconds", "MongoDB command latency", ("command", "result"))
+STAGE_SECONDS = Histogram("qci_stage_seconds", "Pipeline stage duration", ("stage",))
+STAGE_TIMEOUTS = Counter("qci_stage_timeouts_total", "Watchdog expiries by stage and reason", ("stage", "reason"))
+DETECTION_TO_RENT_SECONDS = Histogram("qci_detection_to_rent_seconds", "Watcher mode: offer first seen until the rent call returned", ("gpu_model",))
+BOOT_SECONDS = Histogram("qci_boot_seconds", "Rental creation until the instance reports ready", ("profile",))
+SESSIONS = Counter("qci_sessions_total", "Finished rental sessions by outcome", ("outcome",))
+IN_FLIGHT_RENTALS = Gauge("qci_in_flight_rentals", "Instances currently owned by a rental session")
+QUEUE_DEPTH = Gauge("qci_queue_depth", "Work waiting to run: queued benchmark jobs, prefetched rentals", ("queue",))
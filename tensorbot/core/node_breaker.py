@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+import time
+from tensorbot.config.config import NODE_BREAKER_PATH, NODE_BREAKER_FAILURES, NODE_BREAKER_GROUP_FAILURES
+from tensorbot.config.config import NODE_BREAKER_COOLDOWN_SECONDS, NODE_BREAKER_MAX_COOLDOWN_SECONDS
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class NodeCircuitBreaker:
+    """
+    Keeps failing capacity out of offer selection. Boot and SSH failures are counted
+    per node_id and per cluster/region; after enough consecutive failures a key opens
+    and every offer under it is skipped for a cool-down that doubles each time it
+    re-opens. Once the cool-down has passed the key is half-open: one rental is let
+    through as a probe, and its outcome either closes the key or opens it again.
+
+    State is persisted as JSON, so a restart doesn't forget which nodes were failing.
+    """
+
+    def __init__(self, path: str = NODE_BREAKER_PATH, node_failures: int = NODE_BREAKER_FAILURES,
+                 group_failures: int = NODE_BREAKER_GROUP_FAILURES,
+                 cooldown_seconds: float = NODE_BREAKER_COOLDOWN_SECONDS,
+                 max_cooldown_seconds: float = NODE_BREAKER_MAX_COOLDOWN_SECONDS):
+        self.path = path
+        self.node_failures = node_failures
+        self.group_failures = group_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        # "node:<id>" / "cluster:<name>" / "region:<name>" -> {"state", "failures", "trips", "opened_at", "cooldown_seconds", "probe_at"}
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def keys_for(offer: dict) -> list:
+        keys = [f"node:{offer['node_id']}"]
+        for scope in ("cluster_name", "region"):
+            if offer.get(scope):
+                keys.append(f"{scope.split('_')[0]}:{offer[scope]}")
+        return keys
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._breakers = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable node breaker state {self.path}: {e}")
+            self._breakers = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._breakers, f)
+        os.replace(tmp_path, self.path)
+
+    def state(self, key: str, now: float = None) -> str:
+        breaker = self._breakers.get(key)
+        if breaker is None or breaker["state"] == CLOSED:
+            return CLOSED
+        now = now or time.time()
+        if breaker["state"] == OPEN and now - breaker["opened_at"] < breaker["cooldown_seconds"]:
+            return OPEN
+        # Cool-down over; a probe that never reported back (crash, restart) stops blocking after one more cool-down
+        probe_at = breaker.get("probe_at")
+        if probe_at and now - probe_at < breaker["cooldown_seconds"]:
+            return OPEN
+        return HALF_OPEN
+
+    def allows(self, offer: dict, now: float = None) -> bool:
+        now = now or time.time()
+        with self._lock:
+            return all(self.state(key, now) != OPEN for key in self.keys_for(offer))
+
+    def filter_available(self, offers: list) -> list:
+        """Drops offers whose node, cluster or region is open (or half-open with a probe already running)."""
+        now = time.time()
+        return [offer for offer in offers if self.allows(offer, now)]
+
+    def claim(self, offer: dict):
+        """Marks the selected offer's half-open keys as being probed, so no other rental lands there meanwhile."""
+        now = time.time()
+        with self._lock:
+            for key in self.keys_for(offer):
+                if self.state(key, now) == HALF_OPEN:
+                    self._breakers[key]["probe_at"] = now
+            self._save()
+
+    def release(self, offer: dict):
+        """Drops a claim without an outcome (e.g. the rent call itself failed)."""
+        with self._lock:
+            for key in self.keys_for(offer):
+                if key in self._breakers:
+                    self._breakers[key]["probe_at"] = None
+            self._save()
+
+    def record_success(self, offer: dict):
+        with self._lock:
+            for key in self.keys_for(offer):
+                if self._breakers.pop(key, None) and key.startswith("node:"):
+                    print(f"[INFO] Circuit breaker closed for {key}")
+            self._save()
+
+    def record_failure(self, offer: dict, reason: str) -> list:
+        """Counts a boot/SSH failure against the offer's keys. Returns the keys that opened."""
+        now = time.time()
+        opened = []
+        with self._lock:
+            for key in self.keys_for(offer):
+                threshold = self.node_failures if key.startswith("node:") else self.group_failures
+                breaker = self._breakers.setdefault(
+                    key, {"state": CLOSED, "failures": 0, "trips": 0, "opened_at": None, "cooldown_seconds": 0, "probe_at": None}
+                )
+                was_probe = self.state(key, now) == HALF_OPEN or breaker.get("probe_at")
+                breaker["failures"] += 1
+                breaker["last_reason"] = reason
+                if was_probe or breaker["failures"] >= threshold:
+                    breaker.update(
+                        state=OPEN, opened_at=now, probe_at=None,
+                        cooldown_seconds=min(self.max_cooldown_seconds, self.cooldown_seconds * 2 ** breaker["trips"]),
+                    )
+                    breaker["trips"] += 1
+                    opened.append(key)
+                    print(f"[WARN] Circuit breaker open for {key} after {breaker['failures']} failure(s) "
+                          f"({reason}); cooling down {breaker['cooldown_seconds']:.0f}s")
+            self._save()
+        return opened
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from tensorbot.config.config import NODE_CACHE_PATH, NODE_CACHE_TTL_HOURS
+
+
+def result_digest(results: dict) -> str:
+    """Short stable fingerprint of a benchmark result, to spot changed results without storing them."""
+    return hashlib.sha256(json.dumps(results, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class NodeResultCache:
+    """
+    Local record of when each node_id + gpu_model was last benchmarked.
+
+    Lookups are plain dict hits, so offers can be filtered in O(1) each. The
+    cache is persisted as JSON and, when the local file is missing, can be
+    warmed from the sessions already stored in MongoDB.
+    """
+
+    def __init__(self, path: str = NODE_CACHE_PATH, ttl_seconds: float = NODE_CACHE_TTL_HOURS * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}  # "node_id|gpu_model" -> {"benchmarked_at": epoch, "digest": str}
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def _key(node_id: str, gpu_model: str) -> str:
+        return f"{node_id}|{gpu_model}"
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+            self.evict_expired()
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring unreadable node cache {self.path}: {e}")
+            self._entries = {}
+
+    def _save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, node_id: str, gpu_model: str):
+        """Returns the cache entry if it is still within the TTL, else None."""
+        key = self._key(node_id, gpu_model)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["benchmarked_at"] > self.ttl_seconds:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return entry
+
+    def is_fresh(self, node_id: str, gpu_model: str) -> bool:
+        return self.get(node_id, gpu_model) is not None
+
+    def fresh_entries(self) -> dict:
+        """Returns {"node_id|gpu_model": entry} for every entry still within the TTL."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._entries.items() if entry["benchmarked_at"] >= cutoff}
+
+    def filter_stale(self, offers: list) -> list:
+        """Keeps only offers whose node/model has no results or stale results."""
+        return [offer for offer in offers if not self.is_fresh(offer["node_id"], offer["gpu_model"])]
+
+    def record(self, node_id: str, gpu_model: str, results: dict, benchmarked_at: float = None) -> str:
+        digest = result_digest(results)
+        with self._lock:
+            self._entries[self._key(node_id, gpu_model)] = {
+                "benchmarked_at": benchmarked_at or time.time(),
+                "digest": digest,
+            }
+            self._save()
+        return digest
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry["benchmarked_at"] < cutoff]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+    def warm_from_db(self, db_interface) -> int:
+        """Fills the cache from recent sessions in MongoDB. Returns the number of entries added."""
+        cutoff = datetime.fromtimestamp(time.time() - self.ttl_seconds, timezone.utc).isoformat()
+        added = 0
+        for doc in db_interface.get_recent_benchmarked_nodes(cutoff):
+            node_id, gpu_model = doc["_id"]["client_id"], doc["_id"]["gpu_model"]
+            benchmarked_at = datetime.fromisoformat(doc["start_time"]).timestamp()
+            current = self._entries.get(self._key(node_id, gpu_model))
+            if current is None or current["benchmarked_at"] < benchmarked_at:
+                with self._lock:
+                    self._entries[self._key(node_id, gpu_model)] = {
+                        "benchmarked_at": benchmarked_at,
+                        "digest": result_digest(doc["gpu_benchmarks"]),
+                    }
+                added += 1
+        if added:
+            with self._lock:
+                self._save()
+        return added
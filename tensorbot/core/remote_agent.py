@@ -0,0 +1,310 @@
+import json
+import shlex
+import struct
+import threading
+import time
+from collections import deque
+import paramiko
+from tensorbot.core.ssh_manager import CommandTimeout, READ_FILE_TIMEOUT_SECONDS
+
+# Agent -> orchestrator messages: header (type, task id, payload length) then the payload
+MESSAGE_HEADER = struct.Struct(">BII")
+STDOUT, STDERR, EXIT, RESULT, HEARTBEAT, ERROR = range(1, 7)
+# Orchestrator -> agent requests: 4-byte length then a JSON object
+REQUEST_HEADER = struct.Struct(">I")
+
+HEARTBEAT_SECONDS = 15
+
+# Runs on the instance with the system python3 (standard library only). Every request
+# is handled on its own thread, so tasks run concurrently over the one channel.
+AGENT_SOURCE = r'''
+# qci-remote-agent v1
+import json, os, signal, struct, subprocess, sys, threading, time
+STDOUT, STDERR, EXIT, RESULT, HEARTBEAT, ERROR = range(1, 7)
+HEADER = struct.Struct(">BII")
+out, inp = sys.stdout.buffer, sys.stdin.buffer
+lock = threading.Lock()
+procs = {}
+
+def send(kind, task, payload=b""):
+    try:
+        with lock:
+            out.write(HEADER.pack(kind, task, len(payload)) + payload)
+            out.flush()
+    except (BrokenPipeError, OSError):
+        shutdown()
+
+def read_exact(n):
+    data = b""
+    while len(data) < n:
+        chunk = inp.read(n - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+def pump(task, stream, kind):
+    for chunk in iter(lambda: os.read(stream.fileno(), 32768), b""):
+        send(kind, task, chunk)
+
+def run(task, command):
+    try:
+        proc = subprocess.Popen(["bash", "-c", command], stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, start_new_session=True)
+    except OSError as e:
+        send(ERROR, task, str(e).encode())
+        send(EXIT, task, b'{"status": 127}')
+        return
+    procs[task] = proc
+    stderr = threading.Thread(target=pump, args=(task, proc.stderr, STDERR))
+    stderr.start()
+    pump(task, proc.stdout, STDOUT)
+    stderr.join()
+    status = proc.wait()
+    procs.pop(task, None)
+    send(EXIT, task, json.dumps({"status": status if status >= 0 else 128 - status}).encode())
+
+def read_file(task, path):
+    try:
+        with open(os.path.expanduser(path), "rb") as f:
+            send(RESULT, task, f.read())
+        send(EXIT, task, b'{"status": 0}')
+    except OSError as e:
+        send(ERROR, task, str(e).encode())
+        send(EXIT, task, b'{"status": 1}')
+
+def cancel(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+def heartbeat(interval):
+    while True:
+        sample = {"time": time.time(), "loadavg": os.getloadavg()}
+        try:
+            with open("/proc/meminfo") as f:
+                meminfo = dict(line.split(":", 1) for line in f)
+            sample["mem_available_mb"] = int(meminfo["MemAvailable"].split()[0]) / 1024
+        except (OSError, KeyError, ValueError):
+            pass
+        send(HEARTBEAT, 0, json.dumps(sample).encode())
+        time.sleep(interval)
+
+def shutdown():
+    for proc in list(procs.values()):
+        cancel(proc.pid)
+    os._exit(0)
+
+threading.Thread(target=heartbeat, args=(float(sys.argv[1]),), daemon=True).start()
+while True:
+    header = read_exact(4)
+    if header is None:
+        shutdown()  # orchestrator went away: don't leave its commands running
+    request = json.loads(read_exact(struct.unpack(">I", header)[0]))
+    op, task = request.get("op"), request.get("task", 0)
+    if op == "exec":
+        threading.Thread(target=run, args=(task, request["command"]), daemon=True).start()
+    elif op == "read":
+        threading.Thread(target=read_file, args=(task, request["path"]), daemon=True).start()
+    elif op == "cancel" and request["target"] in procs:
+        cancel(procs[request["target"]].pid)
+    elif op == "exit":
+        shutdown()
+'''
+
+
+class AgentTask:
+    """One request sent to the agent; filled in by the reader thread as its messages arrive."""
+
+    def __init__(self, task_id: int, channel, on_output=None):
+        self.task_id = task_id
+        self.channel = channel  # the agent instance it was sent to; a restarted agent gets a new channel
+        self.on_output = on_output
+        self.stderr_chunks = []
+        self.result = None
+        self.error = None
+        self.exit_status = None
+        self.last_activity = time.time()
+        self.done = threading.Event()
+
+
+class RemoteAgent:
+    """
+    A small Python agent started on the instance over one long-lived SSH channel.
+    Commands are sent as requests and their output comes back as typed,
+    length-prefixed messages, so each command costs a message instead of a new
+    exec channel, and any number of them can run at once.
+
+    Exposes the same run_command / run_command_streaming / read_remote_file calls
+    as SSHManager (and passes everything else through to it), so it can be handed
+    to the collectors, the benchmark runner or a CommandWatchdog unchanged.
+    Heartbeats carry a small host health sample (load, free memory).
+    """
+
+    def __init__(self, ssh_manager, heartbeat_seconds: float = HEARTBEAT_SECONDS, max_health_samples: int = 240):
+        self.ssh_manager = ssh_manager
+        self.heartbeat_seconds = heartbeat_seconds
+        self.health_samples = deque(maxlen=max_health_samples)
+        self.last_heartbeat = None
+        self.channel = None
+        self._tasks = {}
+        self._next_task = 1
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._started = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.ssh_manager, name)
+
+    def start(self, timeout: float = 30) -> "RemoteAgent":
+        """Launches the agent and waits for its first heartbeat."""
+        self._started.clear()
+        self.channel = self.ssh_manager.client.get_transport().open_session()
+        self.channel.exec_command(f"python3 -u -c {shlex.quote(AGENT_SOURCE)} {self.heartbeat_seconds}")
+        threading.Thread(target=self._read_loop, args=(self.channel,), daemon=True, name="remote-agent").start()
+        if not self._started.wait(timeout):
+            stderr = self.channel.recv_stderr(4096).decode(errors="replace") if self.channel.recv_stderr_ready() else ""
+            self.channel.close()
+            raise Exception(f"Remote agent did not start: {stderr.strip() or 'no heartbeat'}")
+        print("[INFO] Remote agent started")
+        return self
+
+    def is_connected(self) -> bool:
+        return self.ssh_manager.is_connected() and self.channel is not None and not self.channel.closed
+
+    def reconnect(self, *args, **kwargs) -> bool:
+        """Reconnects SSH if needed and restarts the agent; safe to call from several threads."""
+        with self._restart_lock:
+            if self.is_connected():
+                return True
+            if not self.ssh_manager.reconnect(*args, **kwargs):
+                return False
+            try:
+                self.start()
+                return True
+            except Exception as e:
+                print(f"[ERROR] Could not restart remote agent: {e}")
+                return False
+
+    def close(self):
+        if self.channel is not None and not self.channel.closed:
+            try:
+                self._send({"op": "exit"})
+            except (OSError, EOFError, paramiko.ssh_exception.SSHException):
+                pass
+            self.channel.close()
+
+    def run_command_streaming(self, command: str, on_output, timeout: float = None,
+                              chunk_size: int = 32768, idle_timeout: float = None) -> tuple[str, int]:
+        """Same contract as SSHManager.run_command_streaming: returns (stderr, exit_status)."""
+        task = self._submit({"op": "exec", "command": command}, on_output)
+        started = time.time()
+        while not task.done.wait(0.05):
+            now = time.time()
+            if timeout and now - started > timeout:
+                self._cancel(task)
+                raise CommandTimeout(f"Command timed out after {timeout:.0f}s", "deadline", now - started)
+            if idle_timeout and now - task.last_activity > idle_timeout:
+                self._cancel(task)
+                raise CommandTimeout(f"Command produced no output for {idle_timeout:.0f}s", "silence", now - started)
+        if task.exit_status is None:
+            raise paramiko.ssh_exception.SSHException("SSH connection dropped before the command finished")
+        return b"".join(task.stderr_chunks).decode(errors="replace"), task.exit_status
+
+    def run_command(self, command: str, timeout: float = None) -> tuple[str, str]:
+        stdout_chunks = []
+        stderr, _ = self.run_command_streaming(command, stdout_chunks.append, timeout=timeout)
+        return b"".join(stdout_chunks).decode(errors="replace"), stderr
+
+    def read_remote_file(self, remote_path: str, timeout: float = None) -> bytes:
+        timeout = timeout or READ_FILE_TIMEOUT_SECONDS
+        task = self._submit({"op": "read", "path": remote_path})
+        if not task.done.wait(timeout):
+            self._cancel(task)  # the agent's read can't be interrupted, but its late result is dropped
+            raise CommandTimeout(f"Reading {remote_path} timed out after {timeout:.0f}s", "deadline", timeout)
+        if task.result is None:
+            raise OSError(task.error or f"Could not read {remote_path} through the remote agent")
+        return task.result
+
+    def _submit(self, request: dict, on_output=None) -> AgentTask:
+        if not self.is_connected():
+            raise paramiko.ssh_exception.SSHException("Remote agent is not running")
+        with self._lock:
+            task = AgentTask(self._next_task, self.channel, on_output)
+            self._next_task += 1
+            self._tasks[task.task_id] = task
+        self._send(dict(request, task=task.task_id))
+        return task
+
+    def _cancel(self, task: AgentTask):
+        try:
+            self._send({"op": "cancel", "target": task.task_id})
+        except (OSError, EOFError, paramiko.ssh_exception.SSHException):
+            pass
+        with self._lock:
+            self._tasks.pop(task.task_id, None)
+
+    def _send(self, request: dict):
+        payload = json.dumps(request).encode()
+        with self._send_lock:
+            self.channel.sendall(REQUEST_HEADER.pack(len(payload)) + payload)
+
+    def _read_loop(self, channel):
+        try:
+            while True:
+                header = self._recv_exact(channel, MESSAGE_HEADER.size)
+                if header is None:
+                    break
+                kind, task_id, length = MESSAGE_HEADER.unpack(header)
+                payload = self._recv_exact(channel, length) if length else b""
+                if payload is None:
+                    break
+                self._dispatch(kind, task_id, payload)
+        except (OSError, EOFError, paramiko.ssh_exception.SSHException):
+            pass
+        finally:
+            channel.close()
+            # Anything still waiting on this agent gets exit_status None, which callers treat as a dropped connection
+            with self._lock:
+                pending = [task for task in self._tasks.values() if task.channel is channel]
+                for task in pending:
+                    del self._tasks[task.task_id]
+            for task in pending:
+                task.done.set()
+
+    def _dispatch(self, kind: int, task_id: int, payload: bytes):
+        if kind == HEARTBEAT:
+            self.last_heartbeat = time.time()
+            self.health_samples.append(json.loads(payload))
+            self._started.set()
+            return
+        with self._lock:
+            task = self._tasks.get(task_id)
+        if task is None:
+            return  # cancelled or timed out
+        task.last_activity = time.time()
+        if kind == STDOUT and task.on_output:
+            task.on_output(payload)
+        elif kind == STDERR:
+            task.stderr_chunks.append(payload)
+        elif kind == RESULT:
+            task.result = payload
+        elif kind == ERROR:
+            task.error = payload.decode(errors="replace")
+        elif kind == EXIT:
+            task.exit_status = json.loads(payload)["status"]
+            with self._lock:
+                self._tasks.pop(task_id, None)
+            task.done.set()
+
+    @staticmethod
+    def _recv_exact(channel, size: int):
+        data = b""
+        while len(data) < size:
+            chunk = channel.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
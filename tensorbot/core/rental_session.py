@@ -10,17 +10,32 @@ class RentalSession:
         self.start_time = datetime.now(timezone.utc).isoformat()
         self.marketplace = marketplace
         self.gpu_model = model
+        self.gpu_count = 1
         # Optional fields that will be populated over time
+        self.rental_profile: Optional[str] = None  # image / cloud-init profile, see clients/rental_profiles.py
+        self.prefetched: Optional[bool] = None  # rented ahead of time while the previous benchmark ran
+        self.detection_to_rent_ms: Optional[float] = None  # watcher mode: offer first seen until the rent call returned
         self.boot_success: Optional[bool] = None
         self.boot_time_ms: Optional[float] = None
+        self.time_to_gpu_ready_ms: Optional[float] = None  # boot until nvidia-smi answers
         self.ssh_success: Optional[bool] = None
         self.ssh_latency_ms: Optional[float] = None
         self.gpu_info: Optional[Dict[str, Any]] = None
         self.cpu_info: Optional[Dict[str, Any]] = None
         self.ram_info: Optional[Dict[str, Any]] = None
         self.storage_info: Optional[Dict[str, Any]] = None
+        self.system_info: Optional[Dict[str, Any]] = None  # kernel, OS, driver, GPU topology
+        self.network_info: Optional[Dict[str, Any]] = None  # "advertised" by the marketplace vs "measured"
+        self.health_gate: Optional[Dict[str, Any]] = None
+        self.benchmark_tier: Optional[str] = None
+        self.benchmark_time_saved_seconds: Optional[float] = None  # only claimed once the suite confirms the tier
+        self.benchmark_tier_confirmed: Optional[bool] = None
         self.benchmarks = {}
+        self.benchmark_jobs: List[Dict[str, Any]] = []  # summaries; full records live in the jobs collection
+        self.artifacts: List[Dict[str, Any]] = []  # archives pulled off the instance, by digest in the artifact store
+        self.raw_logs: List[Dict[str, Any]] = []  # compressed benchmark output: store path, line index, head/tail excerpt
         self.errors: List[str] = []
+        self.timeouts: List[Dict[str, Any]] = []  # watchdog expiries: stage, reason, elapsed_seconds
         self.termination_time: Optional[str] = None
         self.termination_status: Optional[str] = None
 
@@ -33,19 +48,34 @@ class RentalSession:
             "session_id": self.session_id,
             "marketplace": self.marketplace, 
             "gpu_model": self.gpu_model,
+            "gpu_count": self.gpu_count,
             "client_id": self.client_id,
             "cluster_name": self.cluster_name,
             "start_time": self.start_time,
+            "rental_profile": self.rental_profile,
+            "prefetched": self.prefetched,
+            "detection_to_rent_ms": self.detection_to_rent_ms,
             "boot_success": self.boot_success,
             "boot_time_ms": self.boot_time_ms,
+            "time_to_gpu_ready_ms": self.time_to_gpu_ready_ms,
             "ssh_success": self.ssh_success,
             "ssh_latency_ms": self.ssh_latency_ms,
             "gpu_info": self.gpu_info,
             "cpu_info": self.cpu_info,
             "ram_info": self.ram_info,
             "storage_info": self.storage_info,
+            "system_info": self.system_info,
+            "network_info": self.network_info,
+            "health_gate": self.health_gate,
+            "benchmark_tier": self.benchmark_tier,
+            "benchmark_time_saved_seconds": self.benchmark_time_saved_seconds,
+            "benchmark_tier_confirmed": self.benchmark_tier_confirmed,
             "benchmarks": self.benchmarks,
+            "benchmark_jobs": self.benchmark_jobs,
+            "artifacts": self.artifacts,
+            "raw_logs": self.raw_logs,
             "errors": self.errors,
+            "timeouts": self.timeouts,
             "termination_time": self.termination_time,
             "termination_status": self.termination_status,
         }
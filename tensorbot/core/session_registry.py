@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class SessionRegistry:
+    """
+    Thread-safe record of which marketplace instances belong to a live rental session.
+
+    With a ledger (InstanceLedger), registered instances are also written to disk and
+    stay there after release() until forget() confirms they were terminated, so the
+    reaper can tell this bot's leftovers from instances it didn't rent.
+    """
+
+    def __init__(self, ledger=None):
+        self.ledger = ledger
+        self._lock = threading.Lock()
+        self._owners = {}  # instance key -> session_id
+        self._registered_at = {}  # session_id -> epoch seconds
+
+    def register(self, session_id: str, *instance_keys: str):
+        """Marks one or more instance keys (name, id, ...) as owned by a live session."""
+        with self._lock:
+            self._registered_at.setdefault(session_id, time.time())
+            for key in instance_keys:
+                if key:
+                    self._owners[key] = session_id
+        if self.ledger:
+            self.ledger.record(session_id, *instance_keys)
+
+    def release(self, instance_key: str):
+        """Drops every key of the session that owns instance_key."""
+        with self._lock:
+            session_id = self._owners.get(instance_key)
+            if session_id is None:
+                return
+            self._owners = {k: s for k, s in self._owners.items() if s != session_id}
+            self._registered_at.pop(session_id, None)
+
+    def forget(self, *instance_keys: str):
+        """Releases the instance and drops it from the ledger; call once it is terminated."""
+        for key in instance_keys:
+            if key:
+                self.release(key)
+        if self.ledger:
+            self.ledger.forget(*instance_keys)
+
+    def is_live(self, *instance_keys: str) -> bool:
+        with self._lock:
+            return any(key in self._owners for key in instance_keys if key)
+
+    def live_sessions(self) -> dict:
+        """Returns {session_id: registered_at} for every live session."""
+        with self._lock:
+            return dict(self._registered_at)
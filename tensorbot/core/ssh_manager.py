@@ -2,6 +2,19 @@ import paramiko
 import time
 import os 
 import socket
+import threading
+from tensorbot.core.metrics import SSH_COMMANDS, SSH_CONNECT_SECONDS, SSH_RECONNECTS
+
+# Cap on a single remote file read when the caller gives no deadline (a stalled transfer, a FIFO)
+READ_FILE_TIMEOUT_SECONDS = 300
+
+class CommandTimeout(socket.timeout):
+    """A command ran past its deadline ("deadline") or produced no output for too long ("silence")."""
+    def __init__(self, message: str, reason: str = "deadline", elapsed_seconds: float = None):
+        super().__init__(message)
+        self.reason = reason
+        self.elapsed_seconds = elapsed_seconds
+
 class SSHManager:
     def __init__(self, ip: str, username: str, private_key_path: str, port: int = 22):
         self.ip = ip
@@ -9,6 +22,7 @@ class SSHManager:
         self.private_key_path = private_key_path
         self.port = port
         self.client = None
+        self._reconnect_lock = threading.Lock()
 
     def _load_private_key(self):
         """Loads a private key file and logs the key type."""
@@ -43,18 +57,45 @@ class SSHManager:
             )
         except (paramiko.ssh_exception.SSHException, socket.error, TimeoutError) as e:
             print(f"[ERROR] SSH connection failed: {e}")
+            SSH_CONNECT_SECONDS.observe(time.time() - start_time, result="failed")
             return -1  # Special value indicating SSH failure
 
         end_time = time.time()
+        SSH_CONNECT_SECONDS.observe(end_time - start_time, result="ok")
 
         latency_ms = (end_time - start_time) * 1000
         return latency_ms
         
+    def is_connected(self) -> bool:
+        transport = self.client.get_transport() if self.client else None
+        return transport is not None and transport.is_active()
+
+    def reconnect(self, max_attempts: int = 5, base_delay: float = 2.0, max_delay: float = 60.0) -> bool:
+        """
+        Re-establishes a dropped connection, backing off exponentially between attempts.
+        Safe to call from several threads; only one reconnects, the rest reuse its connection.
+        """
+        with self._reconnect_lock:
+            for attempt in range(max_attempts):
+                if self.is_connected():
+                    return True
+                if attempt:
+                    time.sleep(min(max_delay, base_delay * 2 ** (attempt - 1)))
+                print(f"[WARN] SSH connection lost, reconnecting (attempt {attempt + 1}/{max_attempts})")
+                if self.client:
+                    self.client.close()
+                if self.connect_and_measure_latency() != -1:
+                    SSH_RECONNECTS.inc(result="ok")
+                    return True
+            SSH_RECONNECTS.inc(result="ok" if self.is_connected() else "failed")
+            return self.is_connected()
+
     def run_command(self, command: str, timeout: int = None) -> tuple[str, str]:
         """Runs a command over SSH and returns (stdout, stderr) as strings."""
         if self.client is None:
             raise Exception("SSH connection not established. Cannot run command.")
 
+        SSH_COMMANDS.inc(kind="run")
         stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
 
         out = stdout.read().decode()
@@ -62,6 +103,134 @@ class SSHManager:
 
         return out, err
     
+    def run_command_streaming(self, command: str, on_output, timeout: int = None,
+                              chunk_size: int = 32768, idle_timeout: float = None) -> tuple[str, int]:
+        """
+        Runs a command over SSH, passing raw stdout chunks (bytes) to on_output as they arrive.
+        Returns (stderr, exit_status). Raises CommandTimeout after `timeout` seconds in total or
+        `idle_timeout` seconds without any stdout/stderr.
+        """
+        if self.client is None:
+            raise Exception("SSH connection not established. Cannot run command.")
+
+        SSH_COMMANDS.inc(kind="streaming")
+        transport = self.client.get_transport()
+        channel = transport.open_session(timeout=timeout)
+        channel.exec_command(command)
+        started = last_output = time.time()
+        deadline = started + timeout if timeout else None
+
+        stderr_chunks = []
+        while True:
+            if channel.recv_ready():
+                on_output(channel.recv(chunk_size))
+                last_output = time.time()
+            elif channel.recv_stderr_ready():
+                # Drain stderr as we go so it can't stall the channel window
+                stderr_chunks.append(channel.recv_stderr(chunk_size))
+                last_output = time.time()
+            elif channel.exit_status_ready():
+                break  # exit status arrives after all output, so the buffers are drained
+            else:
+                now = time.time()
+                if deadline and now > deadline:
+                    channel.close()
+                    raise CommandTimeout(f"Command timed out after {timeout:.0f}s", "deadline", now - started)
+                if idle_timeout and now - last_output > idle_timeout:
+                    channel.close()
+                    raise CommandTimeout(f"Command produced no output for {idle_timeout:.0f}s", "silence", now - started)
+                time.sleep(0.01)
+
+        exit_status = channel.recv_exit_status()
+        channel.close()
+        if exit_status == -1 and not transport.is_active():
+            raise paramiko.ssh_exception.SSHException("SSH connection dropped before the command finished")
+
+        return b"".join(stderr_chunks).decode(errors="replace"), exit_status
+
+    def run_command_with_input(self, command: str, data: bytes, timeout: int = None,
+                               chunk_size: int = 32768) -> tuple[str, int]:
+        """Runs a command with data written to its stdin (then EOF). Returns (stderr, exit_status)."""
+        if self.client is None:
+            raise Exception("SSH connection not established. Cannot run command.")
+
+        SSH_COMMANDS.inc(kind="with_input")
+        started = time.time()
+        channel = self.client.get_transport().open_session(timeout=timeout)
+        channel.settimeout(timeout)
+        try:
+            channel.exec_command(command)
+            view = memoryview(data)
+            for offset in range(0, len(view), chunk_size):
+                channel.sendall(view[offset:offset + chunk_size])
+                if timeout and time.time() - started > timeout:
+                    raise CommandTimeout(f"Command timed out after {timeout:.0f}s", "deadline", time.time() - started)
+            channel.shutdown_write()
+            if not channel.status_event.wait(max(0, timeout - (time.time() - started)) if timeout else None):
+                raise CommandTimeout(f"Command timed out after {timeout:.0f}s", "deadline", time.time() - started)
+            exit_status = channel.recv_exit_status()
+            stderr = b""
+            while channel.recv_stderr_ready():
+                stderr += channel.recv_stderr(chunk_size)
+            return stderr.decode(errors="replace"), exit_status
+        except CommandTimeout:
+            raise
+        except socket.timeout:
+            raise CommandTimeout(f"Command stalled for {timeout:.0f}s", "silence", time.time() - started)
+        finally:
+            channel.close()
+
+    def measure_round_trips(self, samples: int = 10) -> list:
+        """
+        Round-trip times in ms of SSH-level keepalive requests: the server answers them
+        without starting a process, so this is network latency without exec overhead.
+        """
+        if self.client is None:
+            raise Exception("SSH connection not established. Cannot measure latency.")
+
+        transport = self.client.get_transport()
+        rtts = []
+        for _ in range(samples):
+            start = time.time()
+            transport.global_request("keepalive@openssh.com", wait=True)
+            rtts.append((time.time() - start) * 1000)
+        return rtts
+
+    def kill_process_group(self, pid, grace_seconds: int = 5):
+        """Sends TERM, then KILL after grace_seconds, to the remote process group led by pid (a PID or shell expression)."""
+        kill_cmd = (
+            f"pgid={pid}; [ -n \"$pgid\" ] || exit 0; kill -TERM -- -$pgid 2>/dev/null; "
+            f"sleep {grace_seconds}; kill -KILL -- -$pgid 2>/dev/null; true"
+        )
+        try:
+            self.run_command(kill_cmd, timeout=grace_seconds + 30)
+        except Exception as e:
+            print(f"[WARN] Could not kill remote process group {pid}: {e}")
+
+    def read_remote_file(self, remote_path: str, timeout: float = None) -> bytes:
+        """Fetches a remote file over SFTP (relative paths are relative to the login directory)."""
+        if self.client is None:
+            raise Exception("SSH connection not established. Cannot read file.")
+
+        timeout = timeout or READ_FILE_TIMEOUT_SECONDS
+        started = time.time()
+        sftp = self.client.open_sftp()
+        sftp.get_channel().settimeout(timeout)
+        try:
+            with sftp.open(remote_path, "rb") as remote_file:
+                chunks = []
+                for chunk in iter(lambda: remote_file.read(32768), b""):
+                    chunks.append(chunk)
+                    if time.time() - started > timeout:
+                        raise CommandTimeout(f"Reading {remote_path} timed out after {timeout:.0f}s", "deadline", time.time() - started)
+                return b"".join(chunks)
+        except CommandTimeout:
+            raise
+        except socket.timeout:
+            raise CommandTimeout(f"Reading {remote_path} stalled for {timeout:.0f}s", "silence", time.time() - started)
+        finally:
+            sftp.close()
+
     def disconnect(self):
         if self.client:
             self.client.close()
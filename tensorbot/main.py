@@ -1,49 +1,159 @@
-from tensorbot.clients.marketplace_client import MarketplaceClient
+from tensorbot.clients.marketplace_client import MarketplaceClient, ENDPOINT_BUDGETS
 from tensorbot.clients.db_interface import DatabaseInterface
 from tensorbot.core.logger import Logger
 from tensorbot.config.config import MONGODB_URI 
 from tensorbot.config.config  import PRIVATE_KEY_PATH
+from tensorbot.config.config import HEALTH_GATE_ENABLED, GPUS_PER_RENTAL, BENCHMARK_JOB_QUEUE, PREFETCH_ENABLED
+from tensorbot.config.config import RENTAL_PROFILE, REMOTE_AGENT_ENABLED, METRICS_PORT, METRICS_HOST
+from tensorbot.config.config import WATCH_GPU_MODELS, WATCH_REGIONS, WATCH_POLL_SECONDS, WATCH_MAX_RENTALS
+from tensorbot.config.config import MARKET_HISTORY_ENABLED
+from tensorbot.config.config import ARTIFACT_PATHS, ARTIFACT_MAX_BYTES, ARTIFACT_PARALLELISM, ARTIFACT_STAGE_TIMEOUT_SECONDS
+from tensorbot.config.config import HEALTH_STAGE_TIMEOUT_SECONDS, DIAGNOSTICS_STAGE_TIMEOUT_SECONDS
+from tensorbot.config.config import BENCHMARK_SETUP_TIMEOUT_SECONDS, BENCHMARK_DEADLINE_FACTOR, BENCHMARK_SILENCE_FRACTION
+from tensorbot.config.config import WATCHDOG_SILENCE_SECONDS
+from tensorbot.config.config import HOST_BENCHMARKS_ENABLED, HOST_BENCHMARK_TIMEOUT_SECONDS
+from tensorbot.config.config import DISK_BENCHMARK_SIZE_MB, DISK_BENCHMARK_RANDOM_SECONDS, NETWORK_BENCHMARK_MB
 from tensorbot.config.config import SSH_PUBLIC_KEY
 from tensorbot.core.ssh_manager import SSHManager
+from tensorbot.core.command_watchdog import CommandWatchdog
+from tensorbot.core.remote_agent import RemoteAgent
+from tensorbot.core.artifact_store import ArtifactStore
+from tensorbot.core.metrics import BOOT_SECONDS, DETECTION_TO_RENT_SECONDS, IN_FLIGHT_RENTALS, start_metrics_server
+from tensorbot.core.profiler import PROFILER
+from tensorbot.clients.rental_profiles import select_rental_profile
+import argparse
 import random
 import time
+from datetime import datetime, timezone
 from tensorbot.core.rental_session import RentalSession
+from tensorbot.core.session_registry import SessionRegistry
+from tensorbot.core.instance_reaper import InstanceReaper
+from tensorbot.core.instance_ledger import InstanceLedger
+from tensorbot.core.node_cache import NodeResultCache
+from tensorbot.core.node_breaker import NodeCircuitBreaker
+from tensorbot.core.rental_prefetcher import RentalPrefetcher
+from tensorbot.core.availability_watcher import AvailabilityWatcher
+from tensorbot.core.market_history import MarketHistory
 from tensorbot.benchmark.gpu_info_collector import *
+from tensorbot.benchmark.host_probe import collect_host_info
+from tensorbot.benchmark.host_benchmarks import run_disk_benchmark, run_network_benchmark
+from tensorbot.benchmark.artifact_collector import collect_artifacts
+from tensorbot.benchmark.benchmark_runner import run_gpu_benchmarks
+from tensorbot.benchmark.job_queue import build_job_queue, estimated_seconds, JobQueueRunner
+from tensorbot.benchmark.health_gate import evaluate_node_health_gate, run_diagnostics
+from tensorbot.benchmark.benchmark_tiers import BENCHMARK_TIERS, select_benchmark_tier, compare_to_history, time_saved_seconds
+from tensorbot.benchmark.benchmark_tiers import tier_confirmed
 logger = Logger() # Initiate logger 
+live_sessions = SessionRegistry(InstanceLedger()) # Instances owned by an in-flight rental session, and every instance this bot rented
+node_cache = NodeResultCache() # When each node/model was last benchmarked
+node_breaker = NodeCircuitBreaker() # Nodes, clusters and regions that keep failing to boot or accept SSH
+artifact_store = ArtifactStore() # Logs and results pulled off instances, stored by content digest
+market_history = MarketHistory() if MARKET_HISTORY_ENABLED else None # Every offers poll, delta encoded
+IN_FLIGHT_RENTALS.set_function(lambda: len(live_sessions.live_sessions()))
 
-def main():
-    for i in range (100):
+def main(iterations: int = 100, watch: bool = False, watch_seconds: float = None):
+    db_interface = DatabaseInterface(db_uri=MONGODB_URI, collection_name="tensordock")
+
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT, METRICS_HOST)
+
+    # Fall back to MongoDB when this machine has no local node cache yet
+    if not len(node_cache):
+        logger.log(f"Warmed node cache with {node_cache.warm_from_db(db_interface)} recently benchmarked nodes")
+
+    # Reclaim instances left behind by crashed runs or failed terminate calls
+    reaper = InstanceReaper(MarketplaceClient(), live_sessions, db_interface)
+    reaper.start()
+
+    if watch:
+        run_watcher(watch_seconds)
+    elif PREFETCH_ENABLED:
+        run_pipelined(iterations)
+    else:
+        for i in range (iterations):
+            logger.log(f"[QUOK IT] {i} TIME!")
+            loop()
+
+    reaper.stop()
+
+def run_watcher(duration_seconds: float = None):
+    """Rents target offers the moment they appear, instead of looking once per loop iteration."""
+    marketplace_client = MarketplaceClient()
+
+    def rent_and_benchmark(offer: dict, detected_at: float):
+        rental = acquire_rental(offer=offer, detected_at=detected_at)
+        if rental is not None:
+            benchmark_rental(rental)
+
+    watcher = AvailabilityWatcher(
+        lambda: list_offers(marketplace_client), rent_and_benchmark, WATCH_GPU_MODELS, WATCH_REGIONS,
+        accept=lambda offer: node_breaker.allows(offer) and not node_cache.is_fresh(offer["node_id"], offer["gpu_model"]),
+        # No faster than the offers endpoint's own budget, so polling can't starve create/terminate calls
+        poll_seconds=max(WATCH_POLL_SECONDS, 1 / ENDPOINT_BUDGETS["offers"]["rate_per_second"]),
+        max_rentals=WATCH_MAX_RENTALS,
+    )
+    watcher.run(duration_seconds)
+    logger.log(f"Watcher stopped after {watcher.polls} polls, {watcher.fired} rental(s) fired")
+
+def run_pipelined(iterations: int):
+    """Same rounds as main()'s loop, but each next rental boots while the current one is benchmarking."""
+    prefetcher = RentalPrefetcher(acquire_rental)
+    finished_at = None
+    for i in range(iterations):
         logger.log(f"[QUOK IT] {i} TIME!")
-        loop()
+        rental = prefetcher.take()
+        if rental is not None:
+            rental["session"].prefetched = True
+        else:
+            rental = acquire_rental()
+        if rental is None:
+            continue
+        if finished_at is not None:
+            logger.log(f"Gap since previous benchmark finished: {time.time() - finished_at:.1f}s")
+        prefetcher.record_boot(rental["session"].boot_time_ms / 1000)
+
+        on_benchmark_start = None
+        if i < iterations - 1:
+            current_node = rental["session"].client_id
+            on_benchmark_start = lambda estimated: prefetcher.schedule(estimated, exclude_nodes={current_node})
+        benchmark_rental(rental, on_benchmark_start)
+        finished_at = time.time()
+
+    leftover = prefetcher.shutdown()
+    if leftover is not None:
+        leftover["session"].termination_status = "prefetch_unused"
+        leftover["session"].termination_time = datetime.now(timezone.utc).isoformat()
+        leftover["db_interface"].save_rental_session(leftover["session"].to_dict())
+        cleanup(leftover["marketplace_client"], None, leftover["instance_id"])
 
 def loop():
-    marketplace_client = MarketplaceClient()
-    db_interface = DatabaseInterface(db_uri=MONGODB_URI, collection_name="tensordock")
-    logger.log("Starting QuokBot...")
+    rental = acquire_rental()
+    if rental is not None:
+        benchmark_rental(rental)
 
-    # Get available GPUs from hostnodes
-    available_gpus = []
-    try:
-        hostnodes = marketplace_client.list_available_gpus()
-        
-        # Process each hostnode to extract GPU information
-        for node in hostnodes:
-            node_gpus = node.get("available_resources", {}).get("gpus", [])
-            for gpu in node_gpus:
-                if gpu["availableCount"] > 0:
-                    available_gpus.append({
-                        "node_id": node["id"],
-                        "gpu_model": gpu["v0Name"],
-                        "available_count": gpu["availableCount"],
-                        "price_per_hour": gpu["price_per_hr"],
-                        "location": {
-                            "city": node["location"]["city"],
-                            "country": node["location"]["country"]
-                        },
-                        "max_vcpus": node["available_resources"].get("max_vcpus_per_gpu", 8),
-                        "max_ram": node["available_resources"].get("max_ram_per_gpu", 32)
-                    })
+def acquire_rental(exclude_nodes: set = frozenset(), offer: dict = None, detected_at: float = None) -> dict:
+    """
+    Selects a stale offer (or rents the given one), rents it and waits for it to boot.
+    Returns the booted rental, or None. detected_at is when a watcher saw the offer appear.
+    """
+    with PROFILER.stage("acquire") as stage:
+        rental = _acquire_rental(exclude_nodes, offer, detected_at)
+        if rental is not None:
+            stage.session_id = rental["session"].session_id
+        return rental
+
+def list_offers(marketplace_client: MarketplaceClient) -> list:
+    """Every current offer, recorded into the market history on the way."""
+    offers = marketplace_client.list_available_gpus()
+    if market_history is not None:
+        market_history.record(offers)
+    return offers
 
+def select_offer(marketplace_client: MarketplaceClient, exclude_nodes: set = frozenset()) -> dict:
+    """Lists offers and picks a random one that isn't fresh in the node cache, busy, or behind an open circuit breaker."""
+    # Get available GPUs (one entry per hostnode GPU type with free capacity)
+    try:
+        available_gpus = list_offers(marketplace_client)
     except Exception as e:
         logger.log_error(e, context="Failed to fetch available GPUs")
         return
@@ -54,44 +164,87 @@ def loop():
     
     logger.log(f"Found {len(available_gpus)} available GPUs.")
 
+    # Skip nodes whose results are still fresh, and any node being benchmarked right now
+    available_gpus = [gpu for gpu in node_cache.filter_stale(available_gpus) if gpu["node_id"] not in exclude_nodes]
+    if not available_gpus:
+        logger.log("All available nodes were benchmarked recently. Skipping this round.")
+        return
+    allowed = node_breaker.filter_available(available_gpus)
+    if len(allowed) < len(available_gpus):
+        logger.log(f"Circuit breaker skipped {len(available_gpus) - len(allowed)} offer(s) on failing nodes/regions")
+    available_gpus = allowed
+    if not available_gpus:
+        logger.log("Every remaining offer is on a node or region whose circuit breaker is open. Skipping this round.")
+        return
+
     # Select a GPU 
-    selected_gpu = random.choice(available_gpus)
+    return random.choice(available_gpus)
+
+def _acquire_rental(exclude_nodes: set = frozenset(), offer: dict = None, detected_at: float = None) -> dict:
+    marketplace_client = MarketplaceClient()
+    db_interface = DatabaseInterface(db_uri=MONGODB_URI, collection_name="tensordock")
+    logger.log("Starting QuokBot...")
+
+    selected_gpu = offer or select_offer(marketplace_client, exclude_nodes)
+    if selected_gpu is None:
+        return
+    node_breaker.claim(selected_gpu)
     logger.log(f"Selected GPU: {selected_gpu}")
     
     # Create session with TensorDock specific information
     session = RentalSession(
         client_id=selected_gpu["node_id"],
+        cluster_name=None,
         marketplace="TensorDock", 
         model=selected_gpu["gpu_model"]
     )
 
-    # Calculate resources based on GPU limits
-    vcpu_count = min(selected_gpu["max_vcpus"], 8)  # Use 8 vCPUs or max available
-    ram_gb = min(selected_gpu["max_ram"], 32)      # Use 32GB RAM or max available
+    session.gpu_count = max(1, min(GPUS_PER_RENTAL, selected_gpu.get("available_count") or 1))
+    session.network_info = {"advertised": {
+        "download_gbps": selected_gpu.get("network_speed_gbps"),
+        "upload_gbps": selected_gpu.get("network_speed_upload_gbps"),
+    }}
+
+    # Calculate resources based on GPU limits (TensorDock caps vCPUs and RAM per GPU)
+    vcpu_count = min(selected_gpu["max_vcpus_per_gpu"] or 8, 8) * session.gpu_count  # Use 8 vCPUs per GPU or max available
+    ram_gb = min(selected_gpu["max_ram_per_gpu"] or 32, 32) * session.gpu_count      # Use 32GB RAM per GPU or max available
+
+    # Image / cloud-init profile; recorded on the session so boot times can be compared per profile
+    boot_stats = db_interface.get_boot_time_by_profile() if RENTAL_PROFILE == "fastest" else None
+    session.rental_profile, profile = select_rental_profile(RENTAL_PROFILE, boot_stats)
+    logger.log(f"Rental profile: {session.rental_profile} ({profile['description']})")
 
     # Rent GPU with TensorDock configuration
     try:
         rental_info = marketplace_client.rent_gpu(
             hostnode_id=selected_gpu["node_id"],
             gpu_model=selected_gpu["gpu_model"],
-            gpu_count=1,
+            gpu_count=session.gpu_count,
             vcpus=vcpu_count,
             ram_gb=ram_gb,
             storage_gb=100,  # Minimum required by TensorDock
             ssh_key=SSH_PUBLIC_KEY,
-            instance_name=f"quokbot-{int(time.time())}"
+            instance_name=f"quokbot-{int(time.time())}",
+            profile=profile
         )
         
         # Extract instance ID from TensorDock response
         instance_id = rental_info["data"]["id"]
+        live_sessions.register(session.session_id, instance_id)
         logger.log(f"Created instance: {instance_id}")
         
     except Exception as e:
         logger.log_error(e, context="rent_gpu() failed")
         session.add_error(f"Failed to rent GPU: {str(e)}")
+        node_breaker.release(selected_gpu)
         db_interface.save_rental_session(session.to_dict())
         return
 
+    if detected_at is not None:
+        session.detection_to_rent_ms = (time.time() - detected_at) * 1000
+        DETECTION_TO_RENT_SECONDS.observe(session.detection_to_rent_ms / 1000, gpu_model=session.gpu_model)
+        logger.log(f"Rented {session.detection_to_rent_ms:.0f} ms after the offer appeared")
+
     # Poll for instance readiness
     logger.log("Polling for instance to become ready...")
     start_boot_time = time.time()
@@ -108,8 +261,10 @@ def loop():
     except Exception as e:
         logger.log_error(e, context="poll_instance_until_ready")
         session.add_error("Machine failed to Boot after timeout")
+        node_breaker.record_failure(selected_gpu, "boot")
         session.boot_success = False
         db_interface.save_rental_session(session.to_dict())
+        cleanup(marketplace_client, None, instance_id)
         return
 
     end_rent_time = time.time()
@@ -117,6 +272,45 @@ def loop():
     logger.log(f"Instance Boot Time: {boot_time_ms:.2f} ms")
     session.boot_success = True
     session.boot_time_ms = boot_time_ms
+    BOOT_SECONDS.observe(boot_time_ms / 1000, profile=session.rental_profile)
+
+    return {
+        "session": session,
+        "instance_id": instance_id,
+        "instance_details": instance_details,
+        "start_boot_time": start_boot_time,
+        "marketplace_client": marketplace_client,
+        "db_interface": db_interface,
+        "profile": profile,
+        "offer": selected_gpu,
+    }
+
+def benchmark_rental(rental: dict, on_benchmark_start=None):
+    """
+    Connects to a booted rental, runs the health gate and benchmarks, saves the session
+    and terminates the instance. on_benchmark_start(estimated_seconds) is called as the
+    benchmark begins.
+    """
+    session = rental["session"]
+    try:
+        _benchmark_rental(rental, on_benchmark_start)
+    except Exception as e:
+        logger.log_error(e, context="benchmark_rental")
+        session.add_error(f"Benchmark pipeline failed: {str(e)}")
+    finally:
+        # Whatever happened above, the session is recorded and the billing instance goes away
+        try:
+            rental["db_interface"].save_rental_session(session.to_dict())
+        except Exception as e:
+            logger.log_error(e, context="save_rental_session")
+        cleanup(rental["marketplace_client"], rental.get("ssh_manager"), rental["instance_id"])
+
+def _benchmark_rental(rental: dict, on_benchmark_start=None):
+    session = rental["session"]
+    offer = rental["offer"]
+    instance_details = rental["instance_details"]
+    start_boot_time = rental["start_boot_time"]
+    db_interface = rental["db_interface"]
 
     # Get SSH connection details from instance
     try:
@@ -142,104 +336,145 @@ def loop():
             private_key_path=PRIVATE_KEY_PATH,
             port=ssh_port
         )
+        rental["ssh_manager"] = ssh_manager # Disconnected by benchmark_rental's cleanup
 
         # Rest of the SSH connection logic remains the same
-        ssh_latency = SSHManager.connect_and_measure_latency(ssh_manager)
+        with PROFILER.stage("ssh_connect", session.session_id):
+            ssh_latency = SSHManager.connect_and_measure_latency(ssh_manager)
         if ssh_latency == -1:
             logger.log("[WARN] SSH connection failed")
             session.ssh_success = False
             session.add_error("SSH failed after 3 attempts")
-            db_interface.save_rental_session(session.to_dict())
-            cleanup(marketplace_client, ssh_manager, instance_id)
+            node_breaker.record_failure(offer, "ssh")
             return
             
         session.ssh_success = True
+        node_breaker.record_success(offer)
         session.ssh_latency_ms = ssh_latency
+        remote = ssh_manager
+        if REMOTE_AGENT_ENABLED:
+            try:
+                remote = RemoteAgent(ssh_manager).start()
+            except Exception as e:
+                logger.log(f"[WARN] Remote agent unavailable, falling back to one exec per command: {e}")
+        watchdog = CommandWatchdog(remote, session) # Deadlines and silence limits for remote commands
         logger.log(f"SSH connection successful. Latency: {ssh_latency:.2f} ms")
         logger.log("Running health check....")
 
 
     except Exception as e:
         logger.log_error(e, context="ssh_setup")
+        if not session.ssh_success:
+            node_breaker.record_failure(offer, "ssh_setup")
         session.add_error(f"SSH setup failed: {str(e)}")
-        cleanup(marketplace_client, None, instance_id)
         return
     try:
-        gpu_health_snapshot = collect_gpu_health_snapshot(ssh_manager)
-        session.benchmarks["gpu_health_snapshot"] = gpu_health_snapshot
+        with watchdog.stage("health", HEALTH_STAGE_TIMEOUT_SECONDS):
+            gpu_health_snapshots = collect_gpu_health_snapshots(watchdog)
+        session.benchmarks["gpu_health_snapshot"] = gpu_health_snapshots[0]
+        session.benchmarks["gpu_health_snapshots"] = gpu_health_snapshots
+        # Includes anything the profile's cloud-init still had to do after the marketplace reported ready
+        session.time_to_gpu_ready_ms = (time.time() - start_boot_time) * 1000
         logger.log("Health check Completed Successfully!")
     except Exception as e:
         logger.log("GPU health snapshot failed")
         session.add_error(f"GPU health snapshot failed: {str(e)}")
         print(str(e))
-    
-    # Run benchmarking commands
-    logger.log("Starting benchmarking process...")
+
     try:
-        # Setup benchmarking environment
-        setup_commands = """
-        rm -rf benchmarking && \
-        git clone https://github.com/Quok-it/benchmarking && \
-        cd benchmarking && \
-        chmod +x benchmarks.sh
-        """
-        
-        stdout, stderr = ssh_manager.run_command(setup_commands)
-        if stderr:
-            logger.log(f"Warning during benchmark setup: {stderr}")
-        
-        # Run benchmark with output redirection and explicit shell
-        logger.log("Running benchmarks (this will take approximately 30 minutes)...")
-        benchmark_cmd = """
-        cd benchmarking && \
-        ./benchmarks.sh 2>&1 | tee benchmark_output.log && \
-        echo "=== BENCHMARK COMPLETE ===" && \
-        cat benchmark_output.log && \
-        python3 parse.py | tee parse_output.json && \
-        cat parse_output.json
-        """
-        
-        stdout, stderr = ssh_manager.run_command(benchmark_cmd)
-        logger.log("Benchmark command completed")
-        
-        # Log everything for debugging
-        logger.log("Benchmark stdout:")
-        logger.log(stdout)
-        if stderr:
-            logger.log("Benchmark stderr:")
-            logger.log(stderr)
-        
-        # Try to parse the JSON output
+        with watchdog.stage("host_probe", HEALTH_STAGE_TIMEOUT_SECONDS):
+            host_info = collect_host_info(watchdog)
+        session.cpu_info = host_info["cpu"]
+        session.ram_info = host_info["ram"]
+        session.storage_info = host_info["storage"]
+        session.system_info = host_info["system"]
+    except Exception as e:
+        logger.log("Host probe failed")
+        session.add_error(f"Host probe failed: {str(e)}")
+
+    # Pre-flight gate: don't pay for a ~30 minute benchmark on a host that is already unhealthy
+    if HEALTH_GATE_ENABLED:
+        gate_failures = evaluate_node_health_gate(
+            session.benchmarks.get("gpu_health_snapshots"), session.gpu_model, session.gpu_count
+        )
+        session.health_gate = {"passed": not gate_failures, "failures": gate_failures}
+        if gate_failures:
+            logger.log(f"[WARN] Host failed pre-flight health gate: {gate_failures}")
+            with watchdog.stage("diagnostics", DIAGNOSTICS_STAGE_TIMEOUT_SECONDS):
+                session.health_gate["diagnostics"] = run_diagnostics(watchdog)
+            session.add_error("Host failed pre-flight health gate")
+            session.termination_status = session.termination_status or "health_gate_failed"
+            session.termination_time = datetime.now(timezone.utc).isoformat()
+            return
+        logger.log("Host passed pre-flight health gate")
+    
+    # Disk and network numbers, so "identical" nodes can be told apart and checked against what was advertised
+    if HOST_BENCHMARKS_ENABLED:
         try:
-            import json
-            # Look for the last JSON object in the output
-            json_lines = [line for line in stdout.split('\n') if line.strip().startswith('{')]
-            if json_lines:
-                benchmark_results = json.loads(json_lines[-1])
-                session.benchmarks["gpu_benchmarks"] = benchmark_results
-                logger.log("Successfully stored benchmark results in session!")
+            with watchdog.stage("host_benchmarks", HOST_BENCHMARK_TIMEOUT_SECONDS):
+                logger.log("Running host disk and network benchmarks...")
+                disk = run_disk_benchmark(watchdog, DISK_BENCHMARK_SIZE_MB, DISK_BENCHMARK_RANDOM_SECONDS)
+                session.storage_info = dict(session.storage_info or {}, benchmark=disk)
+                network = run_network_benchmark(watchdog, NETWORK_BENCHMARK_MB)
+                session.network_info = dict(session.network_info or {}, measured=network)
+            logger.log(f"Host benchmarks: disk {disk}, network {network}")
+        except Exception as e:
+            logger.log("Host benchmarks failed")
+            session.add_error(f"Host benchmarks failed: {str(e)}")
+
+    # Pick benchmark depth from this node's history
+    history = db_interface.get_benchmark_history(session.client_id, session.gpu_model)
+    tier, tier_reason = select_benchmark_tier(history)
+    session.benchmark_tier = tier
+    logger.log(f"Benchmark tier: {tier} ({tier_reason})")
+
+    # Run benchmarking commands; in job-queue mode the rental runs several jobs back to back
+    jobs = build_job_queue(BENCHMARK_JOB_QUEUE, session.session_id, tier) if BENCHMARK_JOB_QUEUE else None
+    estimated = sum(map(estimated_seconds, jobs)) if jobs else BENCHMARK_TIERS[tier]["estimated_seconds"]
+    if on_benchmark_start:
+        on_benchmark_start(estimated)
+    # Hard deadline so a hung suite or clone can't hold the worker (and the billing instance) forever;
+    # the silence limit scales with the run, since a full suite can stay quiet for a long compile or step
+    silence = max(WATCHDOG_SILENCE_SECONDS, estimated * BENCHMARK_SILENCE_FRACTION) if BENCHMARK_SILENCE_FRACTION else 0
+    try:
+        with watchdog.stage("benchmark", estimated * BENCHMARK_DEADLINE_FACTOR + BENCHMARK_SETUP_TIMEOUT_SECONDS,
+                            silence_seconds=silence):
+            if jobs:
+                JobQueueRunner(
+                    watchdog, session, db_interface, session.gpu_count,
+                    started_at=start_boot_time, env=rental["profile"]["benchmark_env"]
+                ).run(jobs)
             else:
-                # Check if the output file exists and try to read it directly
-                stdout, stderr = ssh_manager.run_command("cd benchmarking && cat parse_output.json")
-                if stdout and stdout.strip().startswith('{'):
-                    benchmark_results = json.loads(stdout)
-                    session.benchmarks["gpu_benchmarks"] = benchmark_results
-                    logger.log("Successfully stored benchmark results from file!")
-                else:
-                    raise ValueError("No JSON output found in benchmark results or output file")
-                
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.log(f"Error parsing benchmark results: {e}")
-            logger.log(f"Raw output was: {stdout}")
-            session.add_error("Failed to parse benchmark results")
-            
+                run_gpu_benchmarks(watchdog, session, tier, session.gpu_count, env=rental["profile"]["benchmark_env"])
     except Exception as e:
-        logger.log("Benchmarking process failed")
-        session.add_error(f"Benchmarking failed: {str(e)}")
-        print(str(e))
+        logger.log("Benchmark run failed")
+        session.add_error(f"Benchmark run failed: {str(e)}")
+    if "gpu_benchmarks" in session.benchmarks:
+        # Time saved is only claimed for a tier the suite says it actually ran
+        session.benchmark_tier_confirmed = tier_confirmed(session.benchmarks["gpu_benchmarks"], session.benchmark_tier)
+        if session.benchmark_tier_confirmed:
+            session.benchmark_time_saved_seconds = time_saved_seconds(session.benchmark_tier)
+        else:
+            logger.log(f"[WARN] benchmarks.sh did not report running the {session.benchmark_tier} tier; "
+                       "it may have ignored BENCHMARK_TIER, so no time saved is recorded")
+        node_cache.record(session.client_id, session.gpu_model, session.benchmarks["gpu_benchmarks"])
+
+    if session.benchmark_tier == "quick" and "gpu_benchmarks" in session.benchmarks:
+        comparison = compare_to_history(session.benchmarks["gpu_benchmarks"], history)
+        session.benchmarks["history_comparison"] = comparison
+        if comparison["outliers"]:
+            session.add_error(f"Quick run deviates from node history: {comparison['outliers']}")
+
+    # Logs and results on the instance are gone once it is terminated
+    try:
+        with watchdog.stage("artifacts", ARTIFACT_STAGE_TIMEOUT_SECONDS):
+            collect_artifacts(watchdog, session, ARTIFACT_PATHS, artifact_store, ARTIFACT_MAX_BYTES, ARTIFACT_PARALLELISM)
+    except Exception as e:
+        logger.log("Artifact collection failed")
+        session.add_error(f"Artifact collection failed: {str(e)}")
 
-    db_interface.save_rental_session(session.to_dict())
-    cleanup(marketplace_client, ssh_manager, instance_id)
+    if isinstance(remote, RemoteAgent):
+        session.benchmarks["agent_health_samples"] = list(remote.health_samples)
 
 
 # TODO: Move into utils probably 
@@ -273,8 +508,16 @@ def cleanup(marketplace_client: MarketplaceClient, ssh_manager: SSHManager, inst
     try:
         marketplace_client.terminate_instance(instance_id)
         logger.log("Instance has been terminated")
+        live_sessions.forget(instance_id)
     except Exception as e:
-        logger.log(f"Error during instance termination: {str(e)}")
+        logger.log(f"Error during instance termination, leaving it to the reaper: {str(e)}")
+    finally:
+        live_sessions.release(instance_id)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each pipeline stage (same as PROFILING_ENABLED=1); see PROFILE_DIR")
+    if parser.parse_args().profile:
+        PROFILER.enable()
     main()
@@ -0,0 +1,136 @@
+import os
+
+from hypebot.benchmark.host_probe import (
+    parse_cpuinfo,
+    parse_df,
+    parse_gpu_topology,
+    parse_host_probe,
+    parse_lsblk,
+    split_probe_sections,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "loadtest", "host_probe.txt")
+
+
+def load_fixture() -> str:
+    with open(FIXTURE) as f:
+        return f.read()
+
+
+def test_fixture_cpu():
+    cpu = parse_host_probe(load_fixture())["cpu"]
+    assert cpu["model_name"] == "Intel(R) Xeon(R) Platinum 8480+"
+    assert cpu["sockets"] == 2
+    assert cpu["physical_cores"] == 104
+    assert cpu["logical_cores"] == 208
+    assert cpu["threads_per_core"] == 2
+    assert cpu["notable_flags"] == ["avx2", "avx512f", "avx512_bf16", "amx_tile", "amx_bf16", "sha_ni"]
+
+
+def test_fixture_ram():
+    ram = parse_host_probe(load_fixture())["ram"]
+    assert ram["total_mb"] == 2113492364 / 1024
+    assert ram["available_mb"] == 2083016636 / 1024
+    assert ram["swap_total_mb"] == 0
+    assert ram["hugepage_size_kb"] == 2048
+
+
+def test_fixture_disks():
+    disks = parse_host_probe(load_fixture())["storage"]["disks"]
+    assert [disk["name"] for disk in disks] == ["vda", "nvme0n1", "nvme1n1"]
+    assert disks[0] == {"name": "vda", "size_bytes": 536870912000, "rotational": False, "transport": None, "model": None}
+    assert disks[1]["transport"] == "nvme"
+    assert disks[1]["model"] == "SAMSUNG MZQL23T8HCLS-00A07"
+    assert disks[1]["size_bytes"] == 3840755982336
+
+
+def test_fixture_filesystems():
+    filesystems = parse_host_probe(load_fixture())["storage"]["filesystems"]
+    assert [fs["mount"] for fs in filesystems] == ["/", "/boot/efi", "/ephemeral"]
+    assert filesystems[2] == {
+        "filesystem": "/dev/md0",
+        "mount": "/ephemeral",
+        "size_bytes": 7681247817728,
+        "used_bytes": 56748523520,
+        "available_bytes": 7234290376704,
+    }
+
+
+def test_fixture_system():
+    system = parse_host_probe(load_fixture())["system"]
+    assert system["kernel"] == "5.15.0-119-generic"
+    assert system["os"] == "Ubuntu 22.04.4 LTS"
+    assert system["driver_version"] == "550.90.07"
+
+
+def test_fixture_gpu_topology():
+    topology = parse_host_probe(load_fixture())["system"]["gpu_topology"]
+    gpus = [f"GPU{i}" for i in range(8)]
+    assert set(topology["links"]) == set(gpus) | {"NIC0", "NIC1"}
+    for gpu in gpus:
+        assert all(topology["links"][gpu][peer] == "NV18" for peer in gpus if peer != gpu)
+        assert gpu not in topology["links"][gpu]
+    assert topology["links"]["GPU0"]["NIC0"] == "PXB"
+    assert topology["links"]["GPU0"]["NIC1"] == "SYS"
+    assert topology["affinity"]["GPU0"] == {"cpu_affinity": "0-51,104-155", "numa_affinity": "0", "gpu_numa_id": "N/A"}
+    assert topology["affinity"]["GPU7"]["cpu_affinity"] == "52-103,156-207"
+    assert topology["affinity"]["GPU7"]["numa_affinity"] == "1"
+
+
+def test_missing_tools_leave_sections_empty():
+    # No nvidia-smi and no lsblk: their markers are printed with nothing after them
+    output = "\n".join(
+        line for line in load_fixture().splitlines()
+        if not line.startswith(("NAME=", "550.", "\tGPU", "GPU", "NIC", "Legend", " X", "  "))
+    )
+    info = parse_host_probe(output)
+    assert info["storage"]["disks"] == []
+    assert info["system"]["driver_version"] is None
+    assert info["system"]["gpu_topology"] is None
+    assert info["cpu"]["logical_cores"] == 208
+    assert len(info["storage"]["filesystems"]) == 3
+
+
+def test_missing_sections():
+    info = parse_host_probe("@@QCI-PROBE kernel@@\n6.8.0\n")
+    assert info["system"]["kernel"] == "6.8.0"
+    assert info["cpu"]["logical_cores"] == 0
+    assert info["cpu"]["sockets"] == 0
+    assert info["ram"]["total_mb"] is None
+    assert info["storage"] == {"disks": [], "filesystems": []}
+    assert info["system"]["gpu_topology"] is None
+
+
+def test_split_probe_sections():
+    sections = split_probe_sections("@@QCI-PROBE a@@\none\ntwo\n@@QCI-PROBE b@@\n@@QCI-PROBE c@@\nthree\n")
+    assert sections == {"a": "one\ntwo", "b": "", "c": "three"}
+
+
+def test_cpuinfo_without_physical_ids():
+    # Some VMs omit physical id / core id: every logical CPU counts as a core on one socket
+    cpu = parse_cpuinfo("processor\t: 0\nmodel name\t: vCPU\nprocessor\t: 1\nmodel name\t: vCPU\n")
+    assert cpu["sockets"] == 1
+    assert cpu["physical_cores"] == 2
+    assert cpu["threads_per_core"] == 1
+    assert cpu["mhz_mean"] is None
+
+
+def test_lsblk_skips_partitions_and_bad_lines():
+    disks = parse_lsblk('NAME="sda" SIZE="100" ROTA="1" TYPE="disk" TRAN="sata" MODEL="HDD "\n'
+                        'NAME="sda1" SIZE="50" ROTA="1" TYPE="part" TRAN="" MODEL=""\n'
+                        'NAME="broken\n')
+    assert disks == [{"name": "sda", "size_bytes": 100, "rotational": True, "transport": "sata", "model": "HDD"}]
+
+
+def test_df_mount_with_spaces():
+    filesystems = parse_df("Filesystem 1-blocks Used Available Capacity Mounted on\n"
+                           "/dev/sdb1 1000 10 990 1% /mnt/my data\n")
+    assert filesystems[0]["mount"] == "/mnt/my data"
+
+
+def test_gpu_topology_strips_colour_codes():
+    topology = parse_gpu_topology("\t\x1b[4mGPU0\tGPU1\tCPU Affinity\x1b[0m\n"
+                                  "GPU0\t X \tNV4\t0-7\n"
+                                  "GPU1\tNV4\t X \t0-7\n")
+    assert topology["links"] == {"GPU0": {"GPU1": "NV4"}, "GPU1": {"GPU0": "NV4"}}
+    assert topology["affinity"]["GPU1"] == {"cpu_affinity": "0-7"}
@@ -0,0 +1,88 @@
+import json
+import os
+
+from hypebot.core.market_history import MarketHistory
+
+
+def offer(node_id: str, gpu_model: str, price: float, count: int) -> dict:
+    return {"node_id": node_id, "gpu_model": gpu_model, "price_per_hour": price, "available_count": count,
+            "region": "us-east", "extra": "dropped"}
+
+
+def record_polls(history: MarketHistory):
+    history.record([offer("a", "H100", 2.0, 8), offer("b", "A100", 1.0, 4)], 100)
+    history.record([offer("a", "H100", 2.0, 8), offer("b", "A100", 1.0, 4)], 101)  # unchanged: skipped
+    history.record([offer("a", "H100", 2.5, 8), offer("b", "A100", 1.0, 4)], 102)
+    history.record([offer("b", "A100", 1.0, 4)], 103)
+    history.record([offer("b", "A100", 1.0, 4), offer("c", "H100 SXM", 3.0, 1)], 104)
+    history.record([offer("c", "H100 SXM", 3.0, 2)], 105)
+
+
+def read_entries(directory: str) -> list:
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name)) as f:
+            entries.extend((name, json.loads(line)) for line in f)
+    return entries
+
+
+def test_segments_hold_a_snapshot_then_deltas(tmp_path):
+    record_polls(MarketHistory(str(tmp_path), keyframe_every=3))
+    entries = read_entries(str(tmp_path))
+    assert [name for name, _ in entries] == ["000000000100000.jsonl"] * 3 + ["000000000104000.jsonl"] * 2
+    assert set(entries[0][1]["snapshot"]) == {"a|H100", "b|A100"}
+    assert "extra" not in entries[0][1]["snapshot"]["a|H100"]
+    assert entries[1][1] == {"t": 102, "change": {"a|H100": {"price_per_hour": 2.5}}}
+    assert entries[2][1] == {"t": 103, "remove": ["a|H100"]}
+    assert "snapshot" in entries[3][1]  # keyframe
+    assert entries[4][1] == {"t": 105, "remove": ["b|A100"], "change": {"c|H100 SXM": {"available_count": 2}}}
+
+
+def test_state_at(tmp_path):
+    history = MarketHistory(str(tmp_path), keyframe_every=3)
+    record_polls(history)
+    assert history.state_at(99) == (None, {})
+    polled_at, state = history.state_at(101.5)
+    assert polled_at == 100
+    assert state["a|H100"]["price_per_hour"] == 2.0
+    polled_at, state = history.state_at(102)
+    assert polled_at == 102
+    assert state["a|H100"]["price_per_hour"] == 2.5
+    assert set(history.state_at(103.9)[1]) == {"b|A100"}
+    polled_at, state = history.state_at(1000)
+    assert polled_at == 105
+    assert state == {"c|H100 SXM": {"node_id": "c", "gpu_model": "H100 SXM", "price_per_hour": 3.0,
+                                    "available_count": 2, "region": "us-east"}}
+
+
+def test_model_history(tmp_path):
+    history = MarketHistory(str(tmp_path), keyframe_every=3)
+    record_polls(history)
+    events = [(event["t"], event["event"], event["node_id"]) for event in history.model_history("h100", 100.5, 110)]
+    assert events == [
+        (100.5, "present", "a"),
+        (102, "change", "a"),
+        (103, "disappear", "a"),
+        (104, "appear", "c"),
+        (105, "change", "c"),
+    ]
+    assert [event["event"] for event in history.model_history("A100", 100, 104.5)] == ["present"]
+    assert [event["event"] for event in history.model_history("A100", 100, 110)] == ["present", "disappear"]
+
+
+def test_restart_starts_a_new_segment(tmp_path):
+    record_polls(MarketHistory(str(tmp_path), keyframe_every=100))
+    restarted = MarketHistory(str(tmp_path), keyframe_every=100)
+    restarted.record([offer("d", "H100", 4.0, 1)], 200)
+    assert len(os.listdir(tmp_path)) == 2
+    assert set(restarted.state_at(150)[1]) == {"c|H100 SXM"}
+    assert set(restarted.state_at(200)[1]) == {"d|H100"}
+
+
+def test_truncated_line_is_ignored(tmp_path):
+    history = MarketHistory(str(tmp_path), keyframe_every=100)
+    record_polls(history)
+    (segment,) = os.listdir(tmp_path)
+    with open(os.path.join(tmp_path, segment), "a") as f:
+        f.write('{"t": 106, "remo')
+    assert history.state_at(1000)[0] == 105
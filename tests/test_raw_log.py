@@ -0,0 +1,93 @@
+import gzip
+
+from hypebot.core.artifact_store import ArtifactStore
+from hypebot.core.raw_log import RawLogWriter, read_log_lines
+
+
+def make_writer(tmp_path, **kwargs) -> RawLogWriter:
+    return RawLogWriter(ArtifactStore(str(tmp_path)), **kwargs)
+
+
+def write_lines(writer: RawLogWriter, count: int, chunk_size: int = 7):
+    data = b"".join(b"line %d\n" % i for i in range(count))
+    # Odd chunk sizes split lines across writes, as SSH reads do
+    for offset in range(0, len(data), chunk_size):
+        writer.write(data[offset:offset + chunk_size])
+    return data
+
+
+def test_blob_is_one_valid_gzip_file(tmp_path):
+    writer = make_writer(tmp_path, lines_per_member=10, excerpt_lines=3)
+    data = write_lines(writer, 95)
+    record = writer.close("run")
+    assert record["lines"] == 95
+    assert record["raw_bytes"] == len(data)
+    assert len(record["index"]) == 10
+    with gzip.open(record["path"]) as f:
+        assert f.read() == data
+
+
+def test_read_log_lines_ranges(tmp_path):
+    writer = make_writer(tmp_path, lines_per_member=10, excerpt_lines=3)
+    write_lines(writer, 95)
+    record = writer.close()
+    assert read_log_lines(record, 0, 2) == ["line 0\n", "line 1\n"]
+    assert read_log_lines(record, 9, 12) == ["line 9\n", "line 10\n", "line 11\n"]
+    assert read_log_lines(record, 93) == ["line 93\n", "line 94\n"]
+    assert read_log_lines(record, 90, 500) == [f"line {i}\n" for i in range(90, 95)]
+
+
+def test_carriage_returns_do_not_shift_line_numbers(tmp_path):
+    writer = make_writer(tmp_path, lines_per_member=4)
+    writer.write(b"line 0\nline 1 progress 10%\r50%\r100%\n")
+    write_lines(writer, 10)
+    record = writer.close()
+    assert record["lines"] == 12
+    assert read_log_lines(record, 1, 2) == ["line 1 progress 10%\r50%\r100%\n"]
+    assert read_log_lines(record, 2, 4) == ["line 0\n", "line 1\n"]
+    assert read_log_lines(record, 11) == ["line 9\n"]
+
+
+def test_excerpt_marks_omitted_lines(tmp_path):
+    writer = make_writer(tmp_path, excerpt_lines=2)
+    write_lines(writer, 10)
+    assert writer.excerpt() == "line 0\nline 1\n... [6 lines omitted] ...\nline 8\nline 9\n"
+
+
+def test_long_lines_are_clipped_in_the_excerpt_only(tmp_path):
+    writer = make_writer(tmp_path, excerpt_line_bytes=20)
+    progress = b"".join(b"\r%d%%" % (i % 100) for i in range(200000))
+    for offset in range(0, len(progress), 4096):
+        writer.write(progress[offset:offset + 4096])
+        assert len(writer._line_start) + len(writer._line_end) <= 20
+    writer.write(b" done\nnext\n")
+    record = writer.close()
+    assert record["lines"] == 2
+    omitted = len(progress) + len(b" done\n") - 20
+    assert record["head"] == f"\r0%\r1%\r2%\r ... [{omitted} bytes omitted] ... \r99% done\nnext\n"
+    with gzip.open(record["path"]) as f:
+        assert f.read() == progress + b" done\nnext\n"
+
+
+def test_unterminated_last_line_is_kept(tmp_path):
+    writer = make_writer(tmp_path)
+    writer.write(b"first\nsecond without newline")
+    record = writer.close()
+    assert record["lines"] == 2
+    assert read_log_lines(record, 1) == ["second without newline"]
+
+
+def test_identical_output_is_stored_once(tmp_path):
+    records = []
+    for _ in range(2):
+        writer = make_writer(tmp_path, lines_per_member=4)
+        write_lines(writer, 9)
+        records.append(writer.close())
+    assert records[0]["path"] == records[1]["path"]
+    assert records[0]["sha256"] == records[1]["sha256"]
+
+
+def test_empty_output_stores_nothing(tmp_path):
+    record = make_writer(tmp_path).close()
+    assert record["path"] is None
+    assert record["lines"] == 0
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import math
+import subprocess
+
+import pytest
+
+from hypebot.benchmark.result_protocol import (
+    ResultFrameParser,
+    framed_result_command,
+    parse_benchmark_payload,
+    validate_benchmark_results,
+)
+
+RESULTS = {"gemm_fp16_tflops": 742.3, "memory_bandwidth_gbps": 3012.8, "per_test": {"nccl": [1.5, 2.5]}}
+
+
+def frame(payload: bytes, checksum: str = None, version: str = "v1", end: bytes = b"\n@@QCI-RESULT-END@@\n") -> bytes:
+    checksum = checksum or hashlib.sha256(payload).hexdigest()
+    return b"\n@@QCI-RESULT-BEGIN %s %d %s@@\n" % (version.encode(), len(payload), checksum.encode()) + payload + end
+
+
+def test_frame_surrounded_by_output():
+    payload = json.dumps(RESULTS).encode()
+    parser = ResultFrameParser()
+    assert parser.feed(b"step 1\nstep 2\n" + frame(payload) + b"trailing noise\n")
+    assert parse_benchmark_payload(parser.payload) == RESULTS
+    assert parser.errors == []
+
+
+def test_frame_split_byte_by_byte():
+    stream = b"x" * 5000 + frame(json.dumps(RESULTS).encode())
+    parser = ResultFrameParser()
+    for i in range(len(stream)):
+        parser.feed(stream[i:i + 1])
+    assert parser.complete
+    assert parse_benchmark_payload(parser.payload) == RESULTS
+
+
+def test_scanning_keeps_a_bounded_buffer():
+    parser = ResultFrameParser()
+    for _ in range(1000):
+        parser.feed(b"no frame here\n" * 100)
+    assert len(parser._buffer) < len(b"@@QCI-RESULT-BEGIN")
+    assert not parser.complete
+
+
+def test_checksum_mismatch_is_rejected():
+    parser = ResultFrameParser()
+    parser.feed(frame(b'{"a": 1}', checksum="0" * 64))
+    assert not parser.complete
+    assert parser.errors == ["Result frame checksum mismatch"]
+
+
+def test_missing_end_marker_is_rejected():
+    parser = ResultFrameParser()
+    parser.feed(frame(b'{"a": 1}', end=b"\n@@TRUNCATED@@@@@@@\n"))
+    assert not parser.complete
+    assert "missing its end marker" in parser.errors[0]
+
+
+def test_wrong_version_and_oversized_frames_are_rejected():
+    parser = ResultFrameParser(max_payload_bytes=4)
+    parser.feed(frame(b'{"a": 1}', version="v2"))
+    parser.feed(frame(b'{"a": 1}'))
+    assert not parser.complete
+    assert len(parser.errors) == 2
+
+
+def test_malformed_header_then_valid_frame():
+    parser = ResultFrameParser()
+    parser.feed(b"@@QCI-RESULT-BEGIN garbage@@\n")
+    parser.feed(frame(b'{"a": 1}'))
+    assert parser.complete
+    assert parser.errors and "Malformed" in parser.errors[0]
+
+
+def test_framed_result_command_round_trip(tmp_path):
+    result_path = tmp_path / "parse_output.json"
+    result_path.write_text(json.dumps(RESULTS))
+    output = subprocess.run(["bash", "-c", framed_result_command(str(result_path))], capture_output=True, check=True).stdout
+    parser = ResultFrameParser()
+    assert parser.feed(output)
+    assert parse_benchmark_payload(parser.payload) == RESULTS
+
+
+@pytest.mark.parametrize("results, message", [
+    ([1, 2], "JSON object"),
+    ({}, "empty"),
+    ({"a": {"b": math.inf}}, "a.b is not a finite number"),
+    ({"a": [1, math.nan]}, "a[1] is not a finite number"),
+])
+def test_validation_errors(results, message):
+    with pytest.raises(ValueError, match=message.replace("[", r"\[").replace("]", r"\]")):
+        validate_benchmark_results(results)
+
+
+def test_parse_payload_rejects_invalid_json():
+    with pytest.raises(json.JSONDecodeError):
+        parse_benchmark_payload(b"{not json")